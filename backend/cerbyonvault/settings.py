@@ -49,6 +49,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'corsheaders',
     'rest_framework.authtoken',
     'certs',
@@ -121,7 +122,7 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'certs.authentication.AccessContextJWTAuthentication',
     ),
 }
 
@@ -157,6 +158,9 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# nginx internal location aliased to MEDIA_ROOT; when set, stored-file downloads are handed
+# to nginx with X-Accel-Redirect after the access check (empty = Django sends the bytes)
+X_ACCEL_REDIRECT_PREFIX = os.getenv("X_ACCEL_REDIRECT_PREFIX", "")
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -185,10 +189,88 @@ X509_ENCODING = serialization.Encoding.PEM
 KEY_FORMAT = serialization.PrivateFormat.PKCS8
 KEY_ENCRYPTION_ALGO = serialization.NoEncryption()
 
+# Parsed certificate cache (process-local LRU, optionally backed by a shared Redis tier)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+CERTIFICATE_CACHE_SIZE = int(os.getenv("CERTIFICATE_CACHE_SIZE", "1024"))
+CERTIFICATE_CACHE_REDIS_URL = os.getenv("CERTIFICATE_CACHE_REDIS_URL")
+if CERTIFICATE_CACHE_REDIS_URL:
+    CACHES['certificates'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': CERTIFICATE_CACHE_REDIS_URL,
+        'TIMEOUT': None,
+        'KEY_PREFIX': 'certcache',
+    }
+
+# Access tokens carry the user's team ids, trusted while their membership version is current.
+# Versions are cached in the stack's Redis, shared by every worker so that a membership change
+# is seen at once. With ACCESS_CONTEXT_REDIS_URL="" they are read from the database instead.
+MEMBERSHIP_VERSION_CACHE_TIMEOUT = int(os.getenv("MEMBERSHIP_VERSION_CACHE_TIMEOUT", "30"))
+ACCESS_CONTEXT_REDIS_URL = os.getenv("ACCESS_CONTEXT_REDIS_URL", "redis://redis:6379/1")
+if ACCESS_CONTEXT_REDIS_URL:
+    CACHES['access'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': ACCESS_CONTEXT_REDIS_URL,
+        'KEY_PREFIX': 'access',
+    }
+
+# Dashboard snapshots per visibility scope, refreshed by Celery and dropped on certificate writes.
+# They must be shared by the gunicorn and Celery workers, so they default to the stack's Redis.
+# With DASHBOARD_CACHE_REDIS_URL="" each process keeps its own copy for DASHBOARD_SNAPSHOT_TIMEOUT
+# seconds, writes made by another process are not seen before that, and the Celery refresh is off.
+DASHBOARD_SNAPSHOT_TIMEOUT = int(os.getenv("DASHBOARD_SNAPSHOT_TIMEOUT", "300"))
+DASHBOARD_SNAPSHOT_DAYS = [7, 30]
+DASHBOARD_CACHE_REDIS_URL = os.getenv("DASHBOARD_CACHE_REDIS_URL", "redis://redis:6379/1")
+if DASHBOARD_CACHE_REDIS_URL:
+    CACHES['dashboard'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': DASHBOARD_CACHE_REDIS_URL,
+        'KEY_PREFIX': 'dashboard',
+    }
+
+# Keep certificate DER and encrypted key bytes in the database instead of reading them from MEDIA_ROOT
+INLINE_OBJECT_STORAGE = os.getenv("INLINE_OBJECT_STORAGE", "False").lower() == "true"
+
+# Isolated worker processes for upload parsing and PKCS12 decryption (0 workers = parse inline)
+CRYPTO_POOL_WORKERS = int(os.getenv("CRYPTO_POOL_WORKERS", "2"))
+CRYPTO_POOL_MAX_PENDING = int(os.getenv("CRYPTO_POOL_MAX_PENDING", "8"))
+CRYPTO_JOB_TIMEOUT = float(os.getenv("CRYPTO_JOB_TIMEOUT", "15"))
+CRYPTO_JOB_CPU_SECONDS = int(os.getenv("CRYPTO_JOB_CPU_SECONDS", "10"))
+CRYPTO_JOB_MEMORY_MB = int(os.getenv("CRYPTO_JOB_MEMORY_MB", "1024"))
+# Celery workers cannot use the pool (daemonic processes), upload jobs parse under these limits instead
+UPLOAD_JOB_PARSE_CPU_SECONDS = int(os.getenv("UPLOAD_JOB_PARSE_CPU_SECONDS", "60"))
+
+# Parsed uploads are staged in the UploadPreview table until imported or expired
+UPLOAD_PREVIEW_TTL = int(os.getenv("UPLOAD_PREVIEW_TTL", "600"))
+
+# Progress of running upload jobs. The import is one transaction, so the Celery worker reports the
+# processed count through this cache, shared with the web workers (the stack's Redis by default).
+UPLOAD_JOB_CACHE_REDIS_URL = os.getenv("UPLOAD_JOB_CACHE_REDIS_URL", "redis://redis:6379/1")
+if UPLOAD_JOB_CACHE_REDIS_URL:
+    CACHES['upload_jobs'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': UPLOAD_JOB_CACHE_REDIS_URL,
+        'KEY_PREFIX': 'uploadjobs',
+    }
+
 # Celery Configuration
 CELERY_BROKER_URL = 'redis://redis:6379/0'
 CELERY_RESULT_BACKEND = 'redis://redis:6379/0'
 CELERY_TIMEZONE = 'UTC'
+CELERY_BEAT_SCHEDULE = {
+    'purge-expired-upload-previews': {
+        'task': 'certs.tasks.purge_expired_upload_previews',
+        'schedule': 600.0,
+    },
+}
+if DASHBOARD_CACHE_REDIS_URL:
+    CELERY_BEAT_SCHEDULE['refresh-dashboard-snapshots'] = {
+        'task': 'certs.tasks.refresh_dashboard_snapshots',
+        'schedule': float(DASHBOARD_SNAPSHOT_TIMEOUT),
+    }
 
 # SMTP config for password reset function
 EMAIL_BACKEND = os.getenv("EMAIL_BACKEND", "django.core.mail.backends.console.EmailBackend")
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import Team, Certificate, PrivateKey,CustomUser,UploadedFile,Website
+from .models import Team, Certificate, PrivateKey,CustomUser,UploadedFile,Website,Blob
 from django.contrib import admin
 from django.contrib.sessions.models import Session
 
@@ -22,6 +22,12 @@ class UploadFileAdmin(admin.ModelAdmin):
     list_display = ("id", "file", "uploaded_at", "uploaded_by")
     search_fields = ("file", "uploaded_by")
 
+@admin.register(Blob)
+class BlobAdmin(admin.ModelAdmin):
+    """Admin interface for inspecting content-addressed blobs."""
+    list_display = ("sha256", "file", "size", "ref_count", "created_at")
+    search_fields = ("sha256",)
+
 @admin.register(PrivateKey)
 class PrivateKeyAdmin(admin.ModelAdmin):
     """Admin interface for managing private keys."""
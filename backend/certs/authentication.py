@@ -1,11 +1,56 @@
+from django.contrib.auth import get_user_model
+from django.utils.functional import SimpleLazyObject
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import AuthenticationFailed,TokenError
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.response import Response
 from rest_framework import status
 
+TEAMS_CLAIM = "teams"
+MEMBERSHIP_VERSION_CLAIM = "membership_version"
 
-class CookieJWTAutentication(JWTAuthentication):
+
+def set_access_claims(token, user):
+    """Add the team ids and the membership version of a user to a token."""
+    token[TEAMS_CLAIM] = sorted(user.teams.values_list("id", flat=True))
+    token[MEMBERSHIP_VERSION_CLAIM] = user.membership_version
+    return token
+
+
+class TokenUser(SimpleLazyObject):
+    """Request-scoped access context built from the claims of a current access token.
+    The id and the team ids come from the token, so access filtering needs neither a user nor
+    a team query. The CustomUser row is only loaded when another attribute is used.
+    """
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, user_id, team_ids):
+        super().__init__(lambda: get_user_model().objects.get(pk=user_id))
+        self.__dict__["id"] = self.__dict__["pk"] = user_id
+        self.__dict__["_access_team_ids"] = list(team_ids)
+
+    def __bool__(self):
+        return True
+
+
+class AccessContextJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication trusting the team claims of tokens whose membership version is current.
+    Tokens without the claims, or issued before a membership change of the user (see
+    CustomUser.membership_version), fall back to loading the user from the database.
+    """
+    def get_user(self, validated_token):
+        team_ids = validated_token.get(TEAMS_CLAIM)
+        version = validated_token.get(MEMBERSHIP_VERSION_CLAIM)
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if team_ids is not None and version is not None and user_id is not None:
+            if get_user_model().objects.membership_version(user_id) == version:
+                return TokenUser(int(user_id), team_ids)
+        return super().get_user(validated_token)
+
+
+class CookieJWTAutentication(AccessContextJWTAuthentication):
     """Custom JWT Authentication class that retrieves tokens from cookies.
     If the access token is expired, it attempts to refresh it using the refresh token.
     If both tokens are missing or invalid, it raises an AuthenticationFailed exception.
@@ -0,0 +1,248 @@
+"""Bounded process pool for crypto-heavy work on uploaded files.
+
+Parsing untrusted ASN.1 and deriving PKCS12 keys is CPU bound and can be arbitrarily slow
+on malformed or hostile input. Running it in the request worker lets a handful of uploads
+stall every other API call, so the work is shipped to a small pool of worker processes,
+each limited in address space and CPU time per job.
+
+This module is imported by the worker processes before Django is set up, so it must not
+import models or certs.utils at module level.
+"""
+import io
+import multiprocessing
+import os
+import resource
+import signal
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from django.conf import settings
+
+
+class CryptoJobError(Exception):
+    """Raised when a job could not be completed by the crypto pool."""
+
+
+class CryptoPoolBusy(CryptoJobError):
+    """Raised when too many jobs are already waiting for a worker."""
+
+
+class CryptoJobTimeout(CryptoJobError):
+    """Raised when a job did not finish within CRYPTO_JOB_TIMEOUT."""
+
+
+def _init_worker(memory_mb):
+    import django
+    django.setup()
+    if memory_mb:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _limit_cpu(cpu_seconds):
+    """Allow the current job cpu_seconds of CPU time on top of what the worker already used.
+    When the soft limit is hit the kernel sends SIGXCPU and the worker dies, which the pool
+    reports as a broken pool.
+    """
+    if not cpu_seconds:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    soft = int(usage.ru_utime + usage.ru_stime) + cpu_seconds
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _address_space():
+    """Current virtual memory size of this process in bytes, or None when unknown."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def _raise_cpu_exceeded(signum, frame):
+    raise CryptoJobTimeout("Processing the file exceeded the allowed CPU time.")
+
+
+@contextmanager
+def resource_limits(cpu_seconds, memory_mb):
+    """Limit the CPU time and extra memory of the current process for the duration of the block.
+    For callers that cannot use the pool: Celery prefork workers are daemonic processes and may
+    not start children. Exceeding the CPU budget raises CryptoJobTimeout (SIGXCPU), exceeding the
+    memory budget raises MemoryError. The previous soft limits are restored afterwards.
+    The CPU limit needs the main thread, where signal handlers run; it is skipped elsewhere.
+    """
+    previous = {}
+    handler = None
+    try:
+        base = _address_space()
+        if memory_mb and base is not None:
+            previous[resource.RLIMIT_AS] = resource.getrlimit(resource.RLIMIT_AS)
+            soft, hard = previous[resource.RLIMIT_AS]
+            limit = base + memory_mb * 1024 * 1024
+            if hard != resource.RLIM_INFINITY:
+                limit = min(limit, hard)
+            resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+        if cpu_seconds and threading.current_thread() is threading.main_thread():
+            handler = signal.signal(signal.SIGXCPU, _raise_cpu_exceeded)
+            previous[resource.RLIMIT_CPU] = resource.getrlimit(resource.RLIMIT_CPU)
+            _limit_cpu(cpu_seconds)
+        yield
+    finally:
+        for kind, limits in previous.items():
+            resource.setrlimit(kind, limits)
+        if handler is not None:
+            signal.signal(signal.SIGXCPU, handler)
+
+
+def _parse_upload_job(source, name, password, cpu_seconds):
+    """Worker side of parse_upload: parse the file and return only picklable values.
+    source is the path of the uploaded temporary file, or the bytes of a small in-memory upload.
+    """
+    from cryptography.hazmat.primitives import serialization
+    from django.core.files import File
+    from certs.utils.parserCert import parse_uploaded_content
+
+    _limit_cpu(cpu_seconds)
+    if isinstance(source, bytes):
+        stream = io.BytesIO(source)
+        stream.name = name
+        parsed = parse_uploaded_content(stream, password=password)
+    else:
+        with open(source, "rb") as handle:
+            parsed = parse_uploaded_content(File(handle, name=name), password=password)
+
+    key = parsed["key"]
+    parsed["certs"] = [cert.public_bytes(serialization.Encoding.DER) for cert in parsed["certs"]]
+    parsed["key"] = key.private_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    ) if key else None
+    return parsed
+
+
+class CryptoPool:
+    """A lazily started ProcessPoolExecutor with a bounded number of pending jobs.
+    Jobs beyond workers + max_pending are rejected with CryptoPoolBusy instead of queueing
+    without limit. A job keeps its slot until it actually finishes, even after its caller
+    timed out; its CPU limit bounds how long that can be. If a worker dies (memory or CPU
+    limit exceeded) the pool is recreated.
+    """
+
+    def __init__(self, workers, max_pending, timeout, cpu_seconds, memory_mb):
+        self.workers = workers
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("forkserver"),
+                    initializer=_init_worker,
+                    initargs=(self.memory_mb,),
+                )
+            return self._executor
+
+    def _reset(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, fn, *args, timeout=None):
+        """Run fn(*args, cpu_seconds) in a worker process and wait for its result.
+        Args:
+            fn (callable): A module-level function taking the job CPU budget as last argument.
+            timeout (float, optional): Seconds to wait for the result. Defaults to the pool timeout.
+        Returns:
+            The value returned by fn.
+        Raises:
+            CryptoPoolBusy: If no slot is available.
+            CryptoJobTimeout: If the result is not available in time.
+            CryptoJobError: If the worker process died while running the job.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise CryptoPoolBusy("Too many uploads are being processed, please retry shortly.")
+        executor = self._get_executor()
+        try:
+            future = executor.submit(fn, *args, self.cpu_seconds)
+        except BaseException:
+            self._slots.release()
+            raise
+        # cancel() cannot stop a running job, so the slot is only freed once the job is done.
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=timeout or self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise CryptoJobTimeout("Processing the file took too long.")
+        except BrokenProcessPool:
+            self._reset(executor)
+            raise CryptoJobError("Processing the file exceeded the allowed resources.")
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_crypto_pool():
+    """Return the process-wide crypto pool, or None when CRYPTO_POOL_WORKERS is 0."""
+    global _pool
+    if settings.CRYPTO_POOL_WORKERS <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = CryptoPool(
+                workers=settings.CRYPTO_POOL_WORKERS,
+                max_pending=settings.CRYPTO_POOL_MAX_PENDING,
+                timeout=settings.CRYPTO_JOB_TIMEOUT,
+                cpu_seconds=settings.CRYPTO_JOB_CPU_SECONDS,
+                memory_mb=settings.CRYPTO_JOB_MEMORY_MB,
+            )
+        return _pool
+
+
+def parse_upload(file, password=None):
+    """Parse an uploaded certificate/key file in the crypto pool.
+    Same result as parse_uploaded_content, but the parsing and PKCS12 decryption happen in a
+    resource-limited worker process; the request worker only reloads the resulting DER.
+    Uploads spooled to disk are read by the worker from their temporary file, only small
+    in-memory uploads are sent as bytes.
+    Args:
+        file (File): The uploaded file object.
+        password (str, optional): Password for encrypted files (if applicable).
+    Returns:
+        dict: The parse_uploaded_content result with x509.Certificate and key objects.
+    Raises:
+        CryptoJobError: If the pool is busy, the job timed out or exceeded its limits.
+    """
+    from cryptography import x509
+    from cryptography.hazmat.primitives.serialization import load_der_private_key
+    from certs.utils.parserCert import parse_uploaded_content
+
+    pool = get_crypto_pool()
+    if pool is None:
+        return parse_uploaded_content(file, password=password)
+
+    if hasattr(file, "temporary_file_path"):
+        source = file.temporary_file_path()
+    else:
+        file.seek(0)
+        source = file.read()
+        file.seek(0)
+    parsed = pool.run(_parse_upload_job, source, file.name, password)
+    parsed["certs"] = [x509.load_der_x509_certificate(der) for der in parsed["certs"]]
+    if parsed["key"]:
+        parsed["key"] = load_der_private_key(parsed["key"], password=None)
+    return parsed
@@ -0,0 +1,70 @@
+from collections import Counter
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+from certs.models import Blob, UploadedFile
+from certs.utils import content_hash, read_fieldfile_bytes
+
+
+class Command(BaseCommand):
+    """Move files stored before the blob store existed into content-addressed blobs.
+    The first file seen for a key is adopted as the blob file without being rewritten; every
+    later file with the same content is pointed at that blob and deleted from storage.
+    Every file is keyed by the SHA-256 of its content, certificate files included.
+    """
+    help = "Deduplicate stored files into reference-counted content-addressed blobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        storage = UploadedFile._meta.get_field("file").storage
+        queryset = UploadedFile.objects.filter(blob__isnull=True).exclude(file="").order_by("id")
+
+        adopted = deduplicated = failed = 0
+        last_id = 0
+        while True:
+            batch = list(queryset.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            keys = {}
+            for uploaded_file in batch:
+                try:
+                    content = read_fieldfile_bytes(uploaded_file.file)
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"UploadedFile {uploaded_file.id}: {e}")
+                    continue
+                keys[uploaded_file.id] = (content_hash(content), len(content))
+
+            with transaction.atomic():
+                blobs = Blob.objects.select_for_update().in_bulk({key for key, _ in keys.values()})
+                refs = Counter()
+                duplicates = []
+                for uploaded_file in batch:
+                    if uploaded_file.id not in keys:
+                        continue
+                    key, size = keys[uploaded_file.id]
+                    blob = blobs.get(key)
+                    if blob is None:
+                        blob = blobs[key] = Blob.objects.create(sha256=key, file=uploaded_file.file.name, size=size)
+                        adopted += 1
+                    elif blob.file.name != uploaded_file.file.name:
+                        duplicates.append(uploaded_file.file.name)
+                        deduplicated += 1
+                    uploaded_file.blob = blob
+                    uploaded_file.file.name = blob.file.name
+                    refs[key] += 1
+
+                UploadedFile.objects.bulk_update([f for f in batch if f.id in keys], ["blob", "file"])
+                for key, count in refs.items():
+                    Blob.objects.filter(sha256=key).update(ref_count=F("ref_count") + count)
+                for name in duplicates:
+                    transaction.on_commit(lambda name=name: storage.delete(name))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Adopted {adopted} files as blobs, removed {deduplicated} duplicates ({failed} unreadable)."
+        ))
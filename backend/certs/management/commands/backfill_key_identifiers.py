@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand
+from certs.models import Certificate
+from certs.utils import (
+    compute_authority_key_id,
+    compute_subject_key_id,
+    load_certificate_from_bytes,
+    read_fieldfile_bytes,
+    resolve_certificate_chains,
+)
+
+
+class Command(BaseCommand):
+    """Fill subject_key_id/authority_key_id for certificates stored before these columns existed.
+    Certificates are read from their stored file in batches and written back with bulk_update.
+    With --relink, each batch is passed through the chain resolver again so that children that
+    were linked to the wrong generation of a CA by name only move to their real issuer.
+    """
+    help = "Backfill Subject/Authority Key Identifiers on existing certificates."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--relink", action="store_true", help="Re-resolve chain links after the backfill.")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        queryset = (
+            Certificate.objects
+            .filter(subject_key_id__isnull=True, authority_key_id__isnull=True, file__isnull=False)
+            .select_related("file")
+            .order_by("id")
+        )
+
+        updated = failed = 0
+        last_id = 0
+        while True:
+            batch = list(queryset.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            changed = []
+            for cert in batch:
+                try:
+                    cert_obj = load_certificate_from_bytes(read_fieldfile_bytes(cert.file.file))
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"Certificate {cert.id}: {e}")
+                    continue
+                cert.subject_key_id = compute_subject_key_id(cert_obj)
+                cert.authority_key_id = compute_authority_key_id(cert_obj)
+                if cert.subject_key_id or cert.authority_key_id:
+                    changed.append(cert)
+
+            Certificate.objects.bulk_update(changed, ["subject_key_id", "authority_key_id"])
+            updated += len(changed)
+
+            if options["relink"]:
+                resolve_certificate_chains(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {updated} certificates ({failed} unreadable)."))
@@ -0,0 +1,111 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from certs.models import Certificate, CustomUser, Team
+from certs.utils import get_accessible_certificates
+
+
+def legacy_accessible_certificates(user):
+    """The JOIN + DISTINCT access filter replaced by the is_public flag, kept for comparison."""
+    return Certificate.objects.filter(
+        Q(access_teams__in=user.teams.all()) | Q(access_teams__isnull=True)
+    ).defer("der").distinct()
+
+
+class Command(BaseCommand):
+    """Benchmark the team-based access filter.
+    Creates synthetic certificate rows spread over teams (some public), then times the list
+    page, count and dashboard queries of a user member of a few teams, with the legacy
+    JOIN + DISTINCT filter and with the is_public flag + EXISTS filter. Everything runs in a
+    transaction that is rolled back, so the command leaves no data behind.
+    """
+    help = "Compare the legacy and the is_public/EXISTS access filters on a large inventory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--certificates", type=int, default=100_000)
+        parser.add_argument("--teams", type=int, default=200)
+        parser.add_argument("--user-teams", type=int, default=3, help="Teams the measured user belongs to.")
+        parser.add_argument("--public-ratio", type=float, default=0.1, help="Share of certificates without team.")
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--explain", action="store_true", help="Print the query plans.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        with transaction.atomic():
+            user = self._populate(rng, options)
+            self.stdout.write(f"{'query':<12} {'legacy ms':>10} {'exists ms':>10} {'rows':>8}")
+            for name, run in self._queries().items():
+                legacy, legacy_rows = self._time(run, legacy_accessible_certificates(user), options["repeat"])
+                current, rows = self._time(run, get_accessible_certificates(user), options["repeat"])
+                if legacy_rows != rows:
+                    self.stderr.write(f"{name}: result mismatch ({legacy_rows} != {rows})")
+                self.stdout.write(f"{name:<12} {legacy:>10.1f} {current:>10.1f} {rows:>8}")
+                if options["explain"]:
+                    for label, queryset in (("legacy", legacy_accessible_certificates(user)), ("exists", get_accessible_certificates(user))):
+                        self.stdout.write(f"--- {name} / {label}\n{run(queryset, explain=True)}")
+            transaction.set_rollback(True)
+
+    def _populate(self, rng, options):
+        now = timezone.now()
+        teams = Team.objects.bulk_create([Team(name=f"bench-access-{i}") for i in range(options["teams"])])
+        user = CustomUser.objects.create_user(email="bench-access@bench.local")
+        user.teams.add(*rng.sample(teams, min(options["user_teams"], len(teams))))
+
+        through = Certificate.access_teams.through
+        for start in range(0, options["certificates"], 5000):
+            size = min(5000, options["certificates"] - start)
+            public = [rng.random() < options["public_ratio"] for _ in range(size)]
+            certificates = Certificate.objects.bulk_create([
+                Certificate(
+                    name=f"bench-{start + i}.example.com",
+                    subject=f"CN=bench-{start + i}.example.com",
+                    issuer="CN=Bench CA",
+                    serial_number=format(start + i, "x"),
+                    not_before=now - timedelta(days=30),
+                    not_after=now + timedelta(days=rng.randint(-60, 400)),
+                    is_expired=False,
+                    signature_algorithm="ecdsa-with-SHA256",
+                    is_public=public[i],
+                )
+                for i in range(size)
+            ])
+            through.objects.bulk_create([
+                through(certificate_id=certificate.id, team_id=team.id)
+                for certificate, is_public in zip(certificates, public)
+                if not is_public
+                for team in rng.sample(teams, rng.randint(1, 2))
+            ])
+        Certificate.objects.filter(not_after__lt=now).update(is_expired=True)
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("ANALYZE certs_certificate, certs_certificate_access_teams, certs_team_members")
+        return user
+
+    def _queries(self):
+        now = timezone.now()
+
+        def page(queryset, explain=False):
+            queryset = queryset.order_by("not_after", "id")[:100]
+            return queryset.explain() if explain else len(list(queryset))
+
+        def count(queryset, explain=False):
+            return queryset.order_by().explain() if explain else queryset.count()
+
+        def expiring(queryset, explain=False):
+            queryset = queryset.filter(is_expired=False, not_after__lte=now + timedelta(days=30))
+            return queryset.order_by().explain() if explain else queryset.count()
+
+        return {"page": page, "count": count, "expiring": expiring}
+
+    def _time(self, run, queryset, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = run(queryset.all())
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings), result
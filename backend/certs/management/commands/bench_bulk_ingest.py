@@ -0,0 +1,42 @@
+import tempfile
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from certs.models import CustomUser, Team
+from certs.utils import bulk_create_certificates
+from ._synthetic import generate_certificates
+
+
+class Command(BaseCommand):
+    """Benchmark the bulk ingestion path.
+    Imports synthetic batches of growing size and reports the number of queries and the
+    elapsed time for each. Every batch runs in a transaction that is rolled back and files
+    are written to a temporary media root, so the command leaves no data behind.
+    """
+    help = "Show that bulk certificate ingestion uses a constant number of queries."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 2000])
+        parser.add_argument("--teams", type=int, default=3)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'batch':>8} {'queries':>8} {'seconds':>9}")
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            for size in options["sizes"]:
+                certs = generate_certificates(size, prefix=f"bulk{size}")
+                with transaction.atomic():
+                    user = CustomUser.objects.create_user(email=f"bench-{size}@bench.local")
+                    teams = [Team.objects.create(name=f"bench-{size}-{i}") for i in range(options["teams"])]
+                    entries = [
+                        {"cert": cert, "teams": [t.id for t in teams], "urls": [f"https://host{i}.example.com"]}
+                        for i, cert in enumerate(certs)
+                    ]
+
+                    start = time.perf_counter()
+                    with CaptureQueriesContext(connection) as ctx:
+                        bulk_create_certificates(entries, user=user)
+                    elapsed = time.perf_counter() - start
+
+                    transaction.set_rollback(True)
+                self.stdout.write(f"{len(certs):>8} {len(ctx.captured_queries):>8} {elapsed:>9.3f}")
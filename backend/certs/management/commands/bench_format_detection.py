@@ -0,0 +1,91 @@
+import io
+import time
+from django.core.management.base import BaseCommand, CommandError
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from cryptography.hazmat.primitives.serialization import pkcs12
+from certs.utils import detect_file_format, parse_uploaded_content
+from ._synthetic import generate_certificates
+
+PASSWORD = b"bench-password"
+
+
+def build_corpus():
+    """Build one sample per supported upload format.
+    File names deliberately do not match the content so the extension cannot be relied on
+    (it is only a fallback for unrecognised content, so the UNKNOWN samples use neutral ones).
+    Returns:
+        list: (name, content, expected format) tuples.
+    """
+    root, leaf = generate_certificates(1, prefix="sniff")
+    rsa_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    ec_key = ec.generate_private_key(ec.SECP256R1())
+    pem, der = serialization.Encoding.PEM, serialization.Encoding.DER
+    pkcs8, pkcs1 = serialization.PrivateFormat.PKCS8, serialization.PrivateFormat.TraditionalOpenSSL
+    no_encryption = serialization.NoEncryption()
+    encryption = serialization.BestAvailableEncryption(PASSWORD)
+
+    bundle = leaf.public_bytes(pem) + root.public_bytes(pem)
+    # Like curl's cacert.pem: a license / provenance comment well past the first SNIFF_SIZE bytes.
+    preamble = b"".join(b"## Trust store extracted from the bench CA list, line %d of the header\n" % i for i in range(40))
+    return [
+        ("cert.bin", leaf.public_bytes(pem), "PEM"),
+        ("bundle.txt", b"# Trust bundle\n# generated for tests\n\n" + bundle, "PEM"),
+        ("cacert.txt", preamble + b"\nBench Root CA\n=============\n" + bundle, "PEM"),
+        ("bundle-crlf.crt", bundle.replace(b"\n", b"\r\n"), "PEM"),
+        ("bom.key", b"\xef\xbb\xbf" + rsa_key.private_bytes(pem, pkcs8, no_encryption), "PEM"),
+        ("encrypted.pem", rsa_key.private_bytes(pem, pkcs8, encryption), "PEM"),
+        ("cert.pem", leaf.public_bytes(der), "CRT"),
+        ("root.der", root.public_bytes(der), "CRT"),
+        ("pkcs8-rsa.crt", rsa_key.private_bytes(der, pkcs8, no_encryption), "KEY"),
+        ("pkcs8-ec.der", ec_key.private_bytes(der, pkcs8, no_encryption), "KEY"),
+        ("pkcs8-encrypted.der", rsa_key.private_bytes(der, pkcs8, encryption), "KEY"),
+        ("pkcs1-rsa.der", rsa_key.private_bytes(der, pkcs1, no_encryption), "KEY"),
+        ("sec1-ec.der", ec_key.private_bytes(der, pkcs1, no_encryption), "KEY"),
+        (
+            "bundle.pem",
+            pkcs12.serialize_key_and_certificates(b"bench", None, leaf, [root], no_encryption),
+            "PKCS12",
+        ),
+        (
+            "protected.crt",
+            pkcs12.serialize_key_and_certificates(b"bench", None, leaf, [root], encryption),
+            "PKCS12",
+        ),
+        ("notes.txt", b"just some text, no armor here\n" * 40, "UNKNOWN"),
+        ("random.bin", bytes(range(256)) * 4, "UNKNOWN"),
+        ("empty.pem", b"", "UNKNOWN"),
+    ]
+
+
+class Command(BaseCommand):
+    """Check and benchmark upload format detection against a generated corpus.
+    Each sample is detected from its content only, then parsed end to end to make sure the
+    detected format leads to a successful parse. The command fails on the first mismatch.
+    """
+    help = "Verify content-based upload format detection and report its cost per format."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        self.stdout.write(f"{'sample':<22} {'size':>7} {'format':<8} {'us/detect':>10}")
+        for name, content, expected in build_corpus():
+            stream = io.BytesIO(content)
+            stream.name = name
+
+            detected = detect_file_format(stream)
+            if detected != expected:
+                raise CommandError(f"{name}: detected {detected}, expected {expected}")
+            if expected != "UNKNOWN":
+                encrypted = name.startswith(("encrypted", "pkcs8-encrypted", "protected"))
+                parsed = parse_uploaded_content(stream, password=PASSWORD.decode() if encrypted else None)
+                if parsed["error"] or not (parsed["certs"] or parsed["key"]):
+                    raise CommandError(f"{name}: detected as {detected} but failed to parse: {parsed['error']}")
+
+            start = time.perf_counter()
+            for _ in range(iterations):
+                detect_file_format(stream)
+            elapsed = (time.perf_counter() - start) / iterations * 1e6
+            self.stdout.write(f"{name:<22} {len(content):>7} {detected:<8} {elapsed:>10.2f}")
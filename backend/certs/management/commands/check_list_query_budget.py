@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+from certs.models import CustomUser
+from certs.views import CertificateListView, PrivateKeyListView
+
+# Queries per page: ETag version (2) + page + prefetches
+QUERY_BUDGET = {
+    "certificates": (CertificateListView, 5),
+    "keys": (PrivateKeyListView, 4),
+}
+
+
+class Command(BaseCommand):
+    """Check that the certificate and key list endpoints stay within their query budget.
+    Every endpoint is requested for the given user with several page sizes; the command fails
+    if a page needs more queries than its budget or if the count changes with the page size.
+    """
+    help = "Verify the fixed per-page query budget of the list endpoints."
+
+    def add_arguments(self, parser):
+        parser.add_argument("email", help="User whose view of the inventory is measured.")
+        parser.add_argument("--limits", default="1,10,100,500", help="Comma separated page sizes.")
+
+    def handle(self, *args, **options):
+        user = CustomUser.objects.filter(email=options["email"]).first()
+        if user is None:
+            raise CommandError(f"No user with email {options['email']}.")
+        limits = [int(limit) for limit in options["limits"].split(",")]
+        factory = APIRequestFactory()
+
+        failures = []
+        for name, (view_class, budget) in QUERY_BUDGET.items():
+            view = view_class.as_view()
+            counts = {}
+            for limit in limits:
+                request = factory.get(f"/api/{name}/", {"limit": limit})
+                # A fresh instance per request: team ids are memoized on the user object.
+                force_authenticate(request, user=CustomUser.objects.get(pk=user.pk))
+                with CaptureQueriesContext(connection) as queries:
+                    response = view(request)
+                    response.render()
+                if response.status_code != 200:
+                    raise CommandError(f"{name}: HTTP {response.status_code}")
+                counts[limit] = (len(queries), len(response.data["results"]))
+
+            summary = ", ".join(f"limit={l}: {q} queries / {n} rows" for l, (q, n) in counts.items())
+            self.stdout.write(f"{name}: {summary} (budget {budget})")
+            if max(q for q, _ in counts.values()) > budget or len({q for q, _ in counts.values()}) > 1:
+                failures.append(name)
+
+        if failures:
+            raise CommandError(f"Query budget exceeded or not constant for: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS("All list endpoints are within their query budget."))
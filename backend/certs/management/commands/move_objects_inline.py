@@ -0,0 +1,83 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from cryptography.hazmat.primitives.serialization import Encoding
+from certs.models import Certificate, PrivateKey
+from certs.utils import load_certificate_from_bytes, read_fieldfile_bytes
+
+
+def _read_certificate_der(cert):
+    return load_certificate_from_bytes(read_fieldfile_bytes(cert.file.file)).public_bytes(Encoding.DER)
+
+
+def _read_key_file(key):
+    return read_fieldfile_bytes(key.encrypted_key_file)
+
+
+class Command(BaseCommand):
+    """Copy certificate DER and encrypted key bytes from MEDIA_ROOT into the inline columns.
+    Each batch is read from storage by a thread pool and written back with a single bulk_update.
+    Certificate files stay in place because they are shared blobs; key files are only removed
+    with --delete-key-files, after the batch holding their bytes has been committed.
+    """
+    help = "Move certificate DER and encrypted private keys into the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--workers", type=int, default=8, help="Parallel file reads per batch.")
+        parser.add_argument("--delete-key-files", action="store_true", help="Remove key files once stored inline.")
+
+    def handle(self, *args, **options):
+        with ThreadPoolExecutor(max_workers=max(1, options["workers"])) as executor:
+            certificates = Certificate.objects.filter(der__isnull=True, file__isnull=False).select_related("file")
+            moved_certs, failed_certs = self._move(
+                executor, certificates, options["batch_size"], _read_certificate_der, "der"
+            )
+
+            keys = PrivateKey.objects.filter(encrypted_key__isnull=True).exclude(encrypted_key_file="")
+            moved_keys, failed_keys = self._move(
+                executor, keys, options["batch_size"], _read_key_file, "encrypted_key",
+                delete_files=options["delete_key_files"],
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Moved {moved_certs} certificates and {moved_keys} keys inline "
+            f"({failed_certs + failed_keys} unreadable)."
+        ))
+
+    def _move(self, executor, queryset, batch_size, read, column, delete_files=False):
+        model = queryset.model
+        moved = failed = 0
+        last_id = 0
+        while True:
+            batch = list(queryset.filter(id__gt=last_id).order_by("id")[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            def read_one(obj):
+                try:
+                    return obj, read(obj), None
+                except Exception as e:
+                    return obj, None, e
+
+            changed = []
+            for obj, data, error in executor.map(read_one, batch):
+                if error is not None:
+                    failed += 1
+                    self.stderr.write(f"{model.__name__} {obj.id}: {error}")
+                    continue
+                setattr(obj, column, data)
+                changed.append(obj)
+
+            with transaction.atomic():
+                model.objects.bulk_update(changed, [column])
+                if delete_files:
+                    for obj in changed:
+                        name = obj.encrypted_key_file.name
+                        obj.encrypted_key_file.name = ""
+                        storage = obj.encrypted_key_file.storage
+                        transaction.on_commit(lambda name=name, storage=storage: storage.delete(name))
+                    model.objects.bulk_update(changed, ["encrypted_key_file"])
+            moved += len(changed)
+        return moved, failed
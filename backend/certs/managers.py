@@ -1,4 +1,14 @@
+from django.conf import settings
 from django.contrib.auth.models import BaseUserManager
+from django.core.cache import caches
+from django.db import models, transaction
+from django.utils import timezone
+
+
+def _access_cache():
+    """The shared access cache, or None when it is not configured: a process-local cache could
+    not see the version bumps made by other workers, so versions are then read from the DB."""
+    return caches["access"] if "access" in settings.CACHES else None
 
 class CustomUserManager (BaseUserManager):
     """Custom user manager for handling user creation and management.
@@ -24,4 +34,186 @@ class CustomUserManager (BaseUserManager):
         if not extra_fields.get("is_superuser"):
             raise ValueError("Superuser must have is_superuser=True")
         return self.create_user(email, password, **extra_fields)
-    
\ No newline at end of file
+
+    def membership_version(self, user_id):
+        """Return the current membership_version of a user (None if the user does not exist).
+        With the shared access cache, versions are cached for MEMBERSHIP_VERSION_CACHE_TIMEOUT
+        seconds, so validating the team claims of an access token usually needs no query.
+        Otherwise this is one primary key lookup.
+        """
+        cache = _access_cache()
+        key = f"membership-version:{user_id}"
+        version = cache.get(key) if cache is not None else None
+        if version is None:
+            version = self.filter(pk=user_id, is_active=True).values_list("membership_version", flat=True).first()
+            if version is not None and cache is not None:
+                cache.set(key, version, settings.MEMBERSHIP_VERSION_CACHE_TIMEOUT)
+        return version
+
+    def bump_membership_version(self, user_ids):
+        """Invalidate the team claims of the tokens issued to these users."""
+        user_ids = set(user_ids)
+        if not user_ids:
+            return
+        self.filter(pk__in=user_ids).update(membership_version=models.F("membership_version") + 1)
+        cache = _access_cache()
+        if cache is not None:
+            keys = [f"membership-version:{user_id}" for user_id in user_ids]
+            cache.delete_many(keys)
+            # Also after commit: a request may have cached the old version in the meantime.
+            transaction.on_commit(lambda: cache.delete_many(keys))
+    
+
+class CertificateClosureManager(models.Manager):
+    """Manager maintaining the transitive closure of the Certificate.parent hierarchy.
+    Every certificate has one row per ancestor (itself included, at depth 0), so ancestor and
+    descendant lookups are a single indexed query instead of a walk over `parent`.
+    """
+    use_in_migrations = True
+
+    def refresh(self, certificate_ids):
+        """Recompute the closure rows of the given certificates and of everything below them.
+        Call it with the certificates whose parent changed (or that were just created). The
+        number of queries does not depend on how many certificates are refreshed.
+        Args:
+            certificate_ids (Iterable[int]): IDs of the certificates to refresh.
+        """
+        ids = set(certificate_ids)
+        if not ids:
+            return
+
+        certificate_model = self.model._meta.get_field("descendant").related_model
+        affected = ids | set(self.filter(ancestor_id__in=ids).values_list("descendant_id", flat=True))
+        parents = dict(certificate_model.objects.filter(id__in=affected).values_list("id", "parent_id"))
+
+        external = {p for p in parents.values() if p is not None and p not in parents}
+        external_ancestors = {}
+        for descendant_id, ancestor_id, depth in self.filter(descendant_id__in=external).values_list(
+            "descendant_id", "ancestor_id", "depth"
+        ):
+            external_ancestors.setdefault(descendant_id, []).append((ancestor_id, depth))
+
+        resolved = {}
+        for node in parents:
+            path = []
+            seen = set()
+            current = node
+            while current in parents and current not in resolved and current not in seen:
+                seen.add(current)
+                path.append(current)
+                current = parents[current]
+
+            if current in resolved:
+                base = resolved[current]
+            elif current is None or current in seen:
+                base = []  # top of the hierarchy, or a parent loop
+            else:
+                base = external_ancestors.get(current, [(current, 0)])
+
+            for item in reversed(path):
+                base = [(item, 0)] + [(ancestor_id, depth + 1) for ancestor_id, depth in base]
+                resolved[item] = base
+
+        previous = {}
+        for descendant_id, ancestor_id, depth in self.filter(descendant_id__in=affected).values_list(
+            "descendant_id", "ancestor_id", "depth"
+        ):
+            previous.setdefault(descendant_id, set()).add((ancestor_id, depth))
+        changed = [node for node, ancestors in resolved.items() if previous.get(node) != set(ancestors)]
+
+        with transaction.atomic():
+            self._ancestry_changed(certificate_model, changed)
+            self.filter(descendant_id__in=affected).delete()
+            self.bulk_create(
+                [
+                    self.model(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=depth)
+                    for descendant_id, ancestors in resolved.items()
+                    for ancestor_id, depth in ancestors
+                ],
+                batch_size=5000,
+            )
+
+    def _ancestry_changed(self, certificate_model, certificate_ids):
+        """Bump chain_version and drop the export bundles of certificates whose ancestry changed."""
+        if not certificate_ids:
+            return
+        field_names = {field.name for field in certificate_model._meta.get_fields()}
+        if "chain_version" in field_names:  # absent from historical models of older migrations
+            certificate_model.objects.filter(id__in=certificate_ids).update(
+                chain_version=models.F("chain_version") + 1,
+                updated_at=timezone.now(),
+            )
+        try:
+            bundle_model = self.model._meta.apps.get_model("certs", "CertificateBundle")
+        except LookupError:
+            return
+        bundle_model.objects.filter(certificate_id__in=certificate_ids).delete()
+
+
+def reverse_hostname(name):
+    """Return the reversed-label form of a DNS name and whether it is a wildcard.
+    "api.eu.example.com" gives ("com.example.eu.api", False), "*.example.com" gives ("com.example", True).
+    """
+    name = name.strip().rstrip(".").lower()
+    wildcard = name.startswith("*.")
+    if wildcard:
+        name = name[2:]
+    return ".".join(reversed(name.split("."))), wildcard
+
+
+class CertificateHostnameManager(models.Manager):
+    """Manager of the SAN DNS names of certificates, stored in reversed-label form.
+    A hostname is covered by its exact entry and by the wildcard entry of its parent domain,
+    so "which certificates cover X" is at most two keys of the (reversed_name, is_wildcard,
+    certificate) index, answered by an index-only scan.
+    """
+    use_in_migrations = True
+
+    def index(self, certificates):
+        """Add the SAN DNS names of certificates to the index (names already indexed are kept).
+        Args:
+            certificates (Iterable[tuple]): (certificate_id, san list) pairs.
+        """
+        rows = {}
+        for certificate_id, san in certificates:
+            for name in san or []:
+                reversed_name, wildcard = reverse_hostname(name)
+                if reversed_name and len(reversed_name) <= 255:
+                    rows[(certificate_id, reversed_name, wildcard)] = self.model(
+                        certificate_id=certificate_id, reversed_name=reversed_name, is_wildcard=wildcard
+                    )
+        self.bulk_create(list(rows.values()), ignore_conflicts=True, batch_size=5000)
+
+    def covering(self, hostnames):
+        """Find the certificates whose SAN covers each hostname, with one query.
+        Args:
+            hostnames (Iterable[str]): Hostnames to look up. A wildcard ("*.example.com") only
+                matches the same wildcard entry.
+        Returns:
+            dict: {hostname: [(certificate_id, is_wildcard), ...]}, exact matches first.
+        """
+        wanted = {}
+        for hostname in hostnames:
+            reversed_name, wildcard = reverse_hostname(hostname)
+            if not reversed_name:
+                continue
+            keys = [(reversed_name, wildcard)]
+            if not wildcard and "." in reversed_name:
+                keys.append((reversed_name.rsplit(".", 1)[0], True))
+            wanted[hostname] = keys
+
+        found = {}
+        names = {name for keys in wanted.values() for name, _ in keys}
+        for reversed_name, wildcard, certificate_id in self.filter(reversed_name__in=names).values_list(
+            "reversed_name", "is_wildcard", "certificate_id"
+        ):
+            found.setdefault((reversed_name, wildcard), []).append(certificate_id)
+
+        matches = {}
+        for hostname, keys in wanted.items():
+            matches[hostname] = [
+                (certificate_id, wildcard)
+                for reversed_name, wildcard in keys
+                for certificate_id in found.get((reversed_name, wildcard), [])
+            ]
+        return matches
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:49
+
+import certs.managers
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_closure(apps, schema_editor):
+    Certificate = apps.get_model('certs', 'Certificate')
+    CertificateClosure = apps.get_model('certs', 'CertificateClosure')
+    CertificateClosure.objects.refresh(Certificate.objects.values_list('id', flat=True))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certs', '0016_alter_team_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CertificateClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveIntegerField()),
+                ('ancestor', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links', to='certs.certificate')),
+                ('descendant', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links', to='certs.certificate')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['ancestor', 'depth'], name='certclosure_ancestor_depth'), models.Index(fields=['descendant', 'depth'], name='certclosure_descendant_depth')],
+                'constraints': [models.UniqueConstraint(fields=('ancestor', 'descendant'), name='unique_certificate_closure')],
+            },
+            managers=[
+                ('objects', certs.managers.CertificateClosureManager()),
+            ],
+        ),
+        migrations.RunPython(build_closure, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certs', '0017_certificateclosure'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificate',
+            name='authority_key_id',
+            field=models.CharField(blank=True, max_length=128, null=True),
+        ),
+        migrations.AddField(
+            model_name='certificate',
+            name='subject_key_id',
+            field=models.CharField(blank=True, max_length=128, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='certificate',
+            index=models.Index(fields=['subject_hash', 'subject_key_id'], name='cert_subject_ski_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='certificate',
+            index=models.Index(fields=['issuer_hash', 'authority_key_id'], name='cert_issuer_aki_idx'),
+        ),
+    ]
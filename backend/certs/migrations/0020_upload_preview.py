@@ -0,0 +1,38 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:58
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certs', '0019_upload_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadPreview',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_previews', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UploadPreviewEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('temp_id', models.CharField(max_length=64)),
+                ('kind', models.CharField(choices=[('cert', 'Certificate'), ('key', 'Private key')], max_length=4)),
+                ('data', models.BinaryField()),
+                ('preview', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='certs.uploadpreview')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('preview', 'temp_id'), name='unique_upload_preview_entry')],
+            },
+        ),
+    ]
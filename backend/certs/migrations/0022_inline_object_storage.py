@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certs', '0021_blob_store'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificate',
+            name='der',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='privatekey',
+            name='encrypted_key',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certs', '0022_inline_object_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CertificateBundle',
+            fields=[
+                ('certificate', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='bundle', serialize=False, to='certs.certificate')),
+                ('leaf_pem', models.BinaryField()),
+                ('chain_pem', models.BinaryField()),
+                ('fullchain_pem', models.BinaryField()),
+                ('leaf_der', models.BinaryField()),
+                ('fullchain_der', models.BinaryField()),
+                ('built_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
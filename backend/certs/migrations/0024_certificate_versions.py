@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certs', '0023_certificate_bundle'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificate',
+            name='chain_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='certificate',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='privatekey',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
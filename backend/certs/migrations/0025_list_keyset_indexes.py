@@ -0,0 +1,21 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certs', '0024_certificate_versions'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='certificate',
+            index=models.Index(fields=['not_after', 'id'], name='cert_not_after_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='privatekey',
+            index=models.Index(fields=['created_at', 'id'], name='key_created_at_id_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:12
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certs', '0025_list_keyset_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='certificate',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='cert_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='certificate',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['subject'], name='cert_subject_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='certificate',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['issuer'], name='cert_issuer_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='certificate',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['san'], name='cert_san_gin_idx', opclasses=['jsonb_path_ops']),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:14
+
+import certs.managers
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_hostname_index(apps, schema_editor):
+    Certificate = apps.get_model('certs', 'Certificate')
+    CertificateHostname = apps.get_model('certs', 'CertificateHostname')
+    CertificateHostname.objects.index(Certificate.objects.values_list('id', 'san').iterator(chunk_size=2000))
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certs', '0026_certificate_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CertificateHostname',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reversed_name', models.CharField(max_length=255)),
+                ('is_wildcard', models.BooleanField(default=False)),
+                ('certificate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hostnames', to='certs.certificate')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('reversed_name', 'is_wildcard', 'certificate'), name='unique_certificate_hostname')],
+            },
+            managers=[
+                ('objects', certs.managers.CertificateHostnameManager()),
+            ],
+        ),
+        migrations.RunPython(build_hostname_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:16
+
+from django.db import migrations, models
+
+
+def compute_public_flag(apps, schema_editor):
+    for model_name in ('Certificate', 'PrivateKey'):
+        model = apps.get_model('certs', model_name)
+        model.objects.filter(access_teams__isnull=False).update(is_public=False)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certs', '0027_certificate_hostname_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificate',
+            name='is_public',
+            field=models.BooleanField(db_index=True, default=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='privatekey',
+            name='is_public',
+            field=models.BooleanField(db_index=True, default=True, editable=False),
+        ),
+        migrations.RunPython(compute_public_flag, migrations.RunPython.noop),
+    ]
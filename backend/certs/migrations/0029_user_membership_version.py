@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certs', '0028_access_public_flag'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='membership_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
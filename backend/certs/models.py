@@ -1,23 +1,36 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import timedelta
 import uuid
 from urllib.parse import urlparse
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Exists, OuterRef
+from django.contrib.postgres.indexes import GinIndex
 from django.contrib.auth.models import User,AbstractUser
-from django.db.models.signals import post_delete, post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
-from .managers import CustomUserManager
+from .managers import CustomUserManager, CertificateClosureManager, CertificateHostnameManager
 from django.utils import timezone
 
 def default_invite_expiry():
     return timezone.now() + timedelta(days=7)
 
+def extract_domain(url):
+    """Return the host part of a URL without a leading "www."."""
+    domain = urlparse(url).netloc
+    if domain.startswith("www."):
+        domain = domain[4:]
+    return domain
+
 class CustomUser(AbstractUser):
     email = models.EmailField(unique=True)
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
 
     username = models.CharField(max_length=150, blank=True, null=True, unique=False)
+    # Bumped whenever team membership (or the account) changes, invalidating the team claims of issued tokens.
+    membership_version = models.PositiveIntegerField(default=0, editable=False)
 
     objects=CustomUserManager()
 
@@ -62,6 +75,15 @@ class Certificate(models.Model):
     cert_hash = models.CharField(max_length=255,unique=True,blank=True,null=True)
     issuer_hash = models.CharField(max_length=255, null=True, blank=True)
     subject_hash = models.CharField(max_length=255, null=True, blank=True)
+    subject_key_id = models.CharField(max_length=128, null=True, blank=True)
+    authority_key_id = models.CharField(max_length=128, null=True, blank=True)
+    # DER bytes kept inline when INLINE_OBJECT_STORAGE is enabled (read before the file).
+    der = models.BinaryField(null=True, blank=True, editable=False)
+    # Bumped by CertificateClosure.objects.refresh whenever the issuer chain changes.
+    chain_version = models.PositiveIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+    # True while access_teams is empty, maintained by the access_teams m2m_changed signal.
+    is_public = models.BooleanField(default=True, db_index=True, editable=False)
     certificate_type=models.CharField(
         max_length=20,
         choices=[
@@ -72,6 +94,19 @@ class Certificate(models.Model):
         null=True,
         blank=True
     )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['subject_hash', 'subject_key_id'], name='cert_subject_ski_idx'),
+            models.Index(fields=['issuer_hash', 'authority_key_id'], name='cert_issuer_aki_idx'),
+            models.Index(fields=['not_after', 'id'], name='cert_not_after_id_idx'),
+            # Search: trigram matching (regex, word similarity) and SAN containment (@>)
+            GinIndex(fields=['name'], name='cert_name_trgm_idx', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['subject'], name='cert_subject_trgm_idx', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['issuer'], name='cert_issuer_trgm_idx', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['san'], name='cert_san_gin_idx', opclasses=['jsonb_path_ops']),
+        ]
+
     @property
     def has_private_key(self):
         return getattr(self, 'private_key', None) is not None
@@ -79,6 +114,65 @@ class Certificate(models.Model):
     def __str__(self):
         return f"{self.name} ({self.subject})"
     
+class CertificateClosure(models.Model):
+    """One row per (ancestor, descendant) pair of the Certificate.parent hierarchy.
+    Each certificate is its own ancestor at depth 0, its issuer at depth 1 and so on.
+    """
+    ancestor = models.ForeignKey(Certificate, on_delete=models.CASCADE, related_name='descendant_links', db_index=False)
+    descendant = models.ForeignKey(Certificate, on_delete=models.CASCADE, related_name='ancestor_links', db_index=False)
+    depth = models.PositiveIntegerField()
+
+    objects = CertificateClosureManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['ancestor', 'descendant'], name='unique_certificate_closure'),
+        ]
+        indexes = [
+            models.Index(fields=['ancestor', 'depth'], name='certclosure_ancestor_depth'),
+            models.Index(fields=['descendant', 'depth'], name='certclosure_descendant_depth'),
+        ]
+
+    def __str__(self):
+        return f"{self.ancestor_id} -> {self.descendant_id} ({self.depth})"
+
+class CertificateHostname(models.Model):
+    """One row per SAN DNS name of a certificate, labels reversed ("com.example.api").
+    Wildcard names ("*.example.com") are stored without their "*." label and flagged, so they
+    sit next to the exact names of the same domain in the index.
+    """
+    certificate = models.ForeignKey(Certificate, on_delete=models.CASCADE, related_name='hostnames')
+    reversed_name = models.CharField(max_length=255)
+    is_wildcard = models.BooleanField(default=False)
+
+    objects = CertificateHostnameManager()
+
+    class Meta:
+        constraints = [
+            # Also the lookup index: covers every column read by CertificateHostname.objects.covering
+            models.UniqueConstraint(fields=['reversed_name', 'is_wildcard', 'certificate'], name='unique_certificate_hostname'),
+        ]
+
+    def __str__(self):
+        prefix = "*." if self.is_wildcard else ""
+        return f"{prefix}{'.'.join(reversed(self.reversed_name.split('.')))} -> {self.certificate_id}"
+
+class CertificateBundle(models.Model):
+    """Ready-to-serve encodings of a certificate and of its issuer chain (leaf → root).
+    Built on first export and dropped by CertificateClosure.objects.refresh when the ancestry
+    of the certificate changes, so exports can return the stored bytes as they are.
+    """
+    certificate = models.OneToOneField(Certificate, on_delete=models.CASCADE, primary_key=True, related_name='bundle')
+    leaf_pem = models.BinaryField()
+    chain_pem = models.BinaryField()
+    fullchain_pem = models.BinaryField()
+    leaf_der = models.BinaryField()
+    fullchain_der = models.BinaryField()
+    built_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Bundle of certificate {self.certificate_id}"
+
 class PrivateKey(models.Model):
     name = models.CharField(max_length=255)
     comment = models.TextField(null=True, blank=True)
@@ -91,12 +185,38 @@ class PrivateKey(models.Model):
     original_filename = models.CharField(max_length=255, null=True, blank=True)
     access_teams = models.ManyToManyField(Team, related_name='private_key',blank=True)
     key_hash = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    # Fernet-encrypted key bytes kept inline when INLINE_OBJECT_STORAGE is enabled (read before the file).
+    encrypted_key = models.BinaryField(null=True, blank=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+    # True while access_teams is empty, maintained by the access_teams m2m_changed signal.
+    is_public = models.BooleanField(default=True, db_index=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='key_created_at_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name}"
     
+class Blob(models.Model):
+    """Content-addressed file shared by every UploadedFile with the same content.
+    Blobs are keyed by the SHA-256 of the bytes actually stored (the PEM encoding for
+    certificate files), so one key never maps to two different contents. ref_count is the number of UploadedFile rows using the blob;
+    the row and its file are deleted when it drops to zero.
+    """
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    file = models.FileField(upload_to='blobs/')
+    size = models.PositiveIntegerField(default=0)
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.sha256} ({self.ref_count} refs)"
+
 class UploadedFile(models.Model):
     file = models.FileField(upload_to='certificates/',null=True, blank=True)
+    blob = models.ForeignKey(Blob, on_delete=models.PROTECT, null=True, blank=True, related_name='uploaded_files')
     uploaded_at = models.DateTimeField(auto_now_add=True)
     uploaded_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
     content_type = models.CharField(max_length=50, blank=True, null=True)
@@ -112,10 +232,7 @@ class Website(models.Model):
 
     def save(self, *args, **kwargs):
         if self.url:
-            parsed_url = urlparse(self.url)
-            self.domain = parsed_url.netloc
-            if self.domain.startswith("www."):
-                self.domain = self.domain[4:] 
+            self.domain = extract_domain(self.url)
         super().save(*args, **kwargs)
         
     def __str__(self):
@@ -134,12 +251,268 @@ class InviteToken(models.Model):
     def __str__(self):
         return f"{self.email} - {'used' if self.is_used else 'active'}"
 
+class UploadPreview(models.Model):
+    """Short-lived staging area for a parsed upload, between the preview and the import."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='upload_previews')
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"Upload preview {self.id} (expires {self.expires_at})"
+
+class UploadPreviewEntry(models.Model):
+    KIND_CERTIFICATE = 'cert'
+    KIND_KEY = 'key'
+    KIND_CHOICES = [
+        (KIND_CERTIFICATE, 'Certificate'),
+        (KIND_KEY, 'Private key'),
+    ]
+
+    preview = models.ForeignKey(UploadPreview, on_delete=models.CASCADE, related_name='entries')
+    temp_id = models.CharField(max_length=64)
+    kind = models.CharField(max_length=4, choices=KIND_CHOICES)
+    # DER certificate, or Fernet-encrypted PKCS8 DER private key
+    data = models.BinaryField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['preview', 'temp_id'], name='unique_upload_preview_entry'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.temp_id}"
+
+class UploadJob(models.Model):
+    KIND_FILE = 'file'
+    KIND_IMPORT = 'import'
+    KIND_CHOICES = [
+        (KIND_FILE, 'Uploaded file'),
+        (KIND_IMPORT, 'Preview import'),
+    ]
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='upload_jobs')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    uploaded_file = models.ForeignKey(UploadedFile, on_delete=models.SET_NULL, null=True, blank=True)
+    # Job input; passwords and key material are stored Fernet-encrypted and cleared once the job ran.
+    payload = models.JSONField(default=dict, blank=True)
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    results = models.JSONField(default=list, blank=True)
+    error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_SUCCEEDED, self.STATUS_FAILED)
+
+    def __str__(self):
+        return f"{self.kind} job {self.id} ({self.status})"
+
+_batched_delete = ContextVar('batched_delete', default=False)
+
+
+@contextmanager
+def batched_delete():
+    """Skip the per-row side effects of the delete signals below (file cleanup, closure refresh,
+    updated_at touches). The caller applies them once for the whole batch, see certs.utils.bulk_delete.
+    """
+    token = _batched_delete.set(True)
+    try:
+        yield
+    finally:
+        _batched_delete.reset(token)
+
+
 @receiver(post_delete, sender=Certificate)
 def delete_cert_file(sender, instance, **kwargs):
+    if _batched_delete.get():
+        return
     if instance.file:
         instance.file.delete()
 
 
+@receiver(pre_delete, sender=Certificate)
+def remember_cert_children(sender, instance, **kwargs):
+    if _batched_delete.get():
+        return
+    instance._closure_children = list(instance.p_certificate.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Certificate)
+def refresh_children_closure(sender, instance, **kwargs):
+    # Children were detached (parent SET_NULL), so their subtrees lose the deleted ancestors.
+    CertificateClosure.objects.refresh(getattr(instance, '_closure_children', []))
+
+
+# updated_at drives ETag/Last-Modified, so changes to serialized relations touch their owner.
+@receiver(post_save, sender=Certificate)
+def touch_certificate_key(sender, instance, created, **kwargs):
+    if not created:
+        PrivateKey.objects.filter(certificate=instance).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=PrivateKey)
+@receiver(post_delete, sender=PrivateKey)
+@receiver(post_save, sender=Website)
+@receiver(post_delete, sender=Website)
+def touch_related_certificate(sender, instance, **kwargs):
+    if instance.certificate_id and not _batched_delete.get():
+        Certificate.objects.filter(pk=instance.certificate_id).update(updated_at=timezone.now())
+
+
+@receiver(m2m_changed, sender=Certificate.access_teams.through)
+@receiver(m2m_changed, sender=PrivateKey.access_teams.through)
+def touch_on_access_change(sender, instance, action, pk_set, model, **kwargs):
+    now = timezone.now()
+    if isinstance(instance, Team):
+        # Reverse side: team.certificates / team.private_key changed
+        if action == "pre_clear":
+            _touch_team(instance)
+        elif action in ("post_add", "post_remove") and pk_set:
+            model.objects.filter(pk__in=pk_set).update(updated_at=now)
+    elif action in ("post_add", "post_remove", "post_clear"):
+        type(instance).objects.filter(pk=instance.pk).update(updated_at=now)
+
+
+def refresh_public_flag(model, ids):
+    """Recompute is_public of the given certificates or private keys from their access_teams."""
+    if not ids:
+        return
+    through = model.access_teams.through
+    owner_column = model.access_teams.field.m2m_column_name()
+    model.objects.filter(pk__in=ids).update(
+        is_public=~Exists(through.objects.filter(**{owner_column: OuterRef("pk")}))
+    )
+
+
+@receiver(m2m_changed, sender=Certificate.access_teams.through)
+@receiver(m2m_changed, sender=PrivateKey.access_teams.through)
+def update_public_flag(sender, instance, action, pk_set, model, **kwargs):
+    if isinstance(instance, Team):
+        # Reverse side: team.certificates / team.private_key changed
+        if action == "pre_clear":
+            instance._cleared_access_ids = list(model.objects.filter(access_teams=instance).values_list("pk", flat=True))
+        elif action == "post_clear":
+            refresh_public_flag(model, instance.__dict__.pop("_cleared_access_ids", []))
+        elif action in ("post_add", "post_remove"):
+            refresh_public_flag(model, pk_set)
+    elif action in ("post_add", "post_remove", "post_clear"):
+        refresh_public_flag(type(instance), [instance.pk])
+
+
+@receiver(pre_delete, sender=Team)
+def remember_team_objects(sender, instance, **kwargs):
+    # Deleting the team drops its access rows without m2m_changed.
+    instance._access_ids = {
+        Certificate: list(instance.certificates.values_list("pk", flat=True)),
+        PrivateKey: list(instance.private_key.values_list("pk", flat=True)),
+    }
+
+
+@receiver(post_delete, sender=Team)
+def refresh_deleted_team_objects(sender, instance, **kwargs):
+    for model, ids in getattr(instance, "_access_ids", {}).items():
+        refresh_public_flag(model, ids)
+
+
+@receiver(post_save, sender=Certificate)
+@receiver(post_delete, sender=Certificate)
+@receiver(m2m_changed, sender=Certificate.access_teams.through)
+@receiver(post_save, sender=Team)
+@receiver(post_delete, sender=Team)
+def invalidate_dashboard(sender, **kwargs):
+    if _batched_delete.get() or kwargs.get("action", "post_").startswith("pre_"):
+        return
+    from .utils.dashboard import invalidate_dashboard_snapshots
+    transaction.on_commit(invalidate_dashboard_snapshots)
+
+
+@receiver(post_save, sender=Team)
+def touch_team_objects(sender, instance, created, **kwargs):
+    if not created:
+        _touch_team(instance)
+
+
+@receiver(pre_delete, sender=Team)
+def touch_deleted_team_objects(sender, instance, **kwargs):
+    _touch_team(instance)
+
+
+@receiver(m2m_changed, sender=Team.members.through)
+def bump_membership_version(sender, instance, action, pk_set, **kwargs):
+    if not isinstance(instance, Team):
+        if action in ("post_add", "post_remove", "post_clear"):
+            CustomUser.objects.bump_membership_version([instance.pk])
+    elif action == "pre_clear":
+        instance._cleared_member_ids = list(instance.members.values_list("pk", flat=True))
+    elif action == "post_clear":
+        CustomUser.objects.bump_membership_version(instance.__dict__.pop("_cleared_member_ids", []))
+    elif action in ("post_add", "post_remove"):
+        CustomUser.objects.bump_membership_version(pk_set or [])
+
+
+@receiver(pre_delete, sender=Team)
+def remember_team_members(sender, instance, **kwargs):
+    instance._member_ids = list(instance.members.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Team)
+def bump_deleted_team_members(sender, instance, **kwargs):
+    CustomUser.objects.bump_membership_version(getattr(instance, "_member_ids", []))
+
+
+_ACCESS_FLAG_FIELDS = ("is_active", "is_staff", "is_superuser")
+
+
+@receiver(pre_save, sender=CustomUser)
+def remember_access_flags_change(sender, instance, update_fields=None, **kwargs):
+    # Saves such as update_last_login leave the flags alone and keep the tokens trusted.
+    instance._access_flags_changed = False
+    if instance.pk is None or (update_fields is not None and not set(update_fields) & set(_ACCESS_FLAG_FIELDS)):
+        return
+    stored = CustomUser.objects.filter(pk=instance.pk).values(*_ACCESS_FLAG_FIELDS).first()
+    instance._access_flags_changed = stored is not None and any(
+        stored[field] != getattr(instance, field) for field in _ACCESS_FLAG_FIELDS
+    )
+
+
+@receiver(post_save, sender=CustomUser)
+def bump_updated_user(sender, instance, created, **kwargs):
+    # Tokens of a deactivated account or of changed admin rights fall back to a database lookup.
+    if not created and instance.__dict__.pop("_access_flags_changed", False):
+        CustomUser.objects.bump_membership_version([instance.pk])
+
+
+@receiver(m2m_changed, sender=Team.members.through)
+def touch_on_membership_change(sender, instance, action, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    teams = [instance] if isinstance(instance, Team) else Team.objects.filter(pk__in=pk_set or [])
+    for team in teams:
+        _touch_team(team)
+
+
+def _touch_team(team):
+    now = timezone.now()
+    Certificate.objects.filter(access_teams=team).update(updated_at=now)
+    PrivateKey.objects.filter(access_teams=team).update(updated_at=now)
+
+
 @receiver(post_delete, sender=PrivateKey)
 def delete_key_file(sender, instance, **kwargs):
     if instance.encrypted_key_file:
@@ -148,5 +521,11 @@ def delete_key_file(sender, instance, **kwargs):
 
 @receiver(post_delete, sender=UploadedFile)
 def delete_file_on_model_delete(sender, instance, **kwargs):
-    if instance.file:
+    if _batched_delete.get():
+        return
+    if instance.blob_id:
+        # The file belongs to the shared blob, only drop this reference.
+        from .utils.blob_store import release_blobs
+        release_blobs([instance.blob_id])
+    elif instance.file:
         instance.file.delete(save=False)
\ No newline at end of file
@@ -1,12 +1,82 @@
+import os
 from rest_framework import serializers
+from django.db.models import Exists, OuterRef, Prefetch
 from django.contrib.auth.password_validation import validate_password
 from django.contrib.auth import get_user_model
-from .models import Certificate, InviteToken, PrivateKey, CustomUser,Team, UploadedFile, UserProfile, Website
+from .models import Certificate, InviteToken, PrivateKey, CustomUser,Team, UploadedFile, UploadJob, UserProfile, Website
+from .utils import create_uploaded_file
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer,TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from .authentication import MEMBERSHIP_VERSION_CLAIM, set_access_claims
 from django.contrib.auth import authenticate
 
 User = get_user_model()
 
+
+def sparse_params(request):
+    """Return the (fields, expand) sets of ?fields=a,b&expand=c, None when a parameter is absent."""
+    def split(name):
+        raw = request.query_params.get(name)
+        if raw is None:
+            return None
+        return {item.strip() for item in raw.split(",") if item.strip()}
+    return split("fields"), split("expand")
+
+
+class SparseFieldsetMixin:
+    """Serializer mixin for ?fields= / ?expand= selections.
+    `fields` keeps only the listed top-level fields. `expand` lists the relations rendered as
+    nested objects; the other relations of `expandable_fields` are rendered as primary keys.
+    Without either parameter the serializer is unchanged (every relation is nested).
+    `sparse_queryset` turns the same selection into .only() columns and only runs the
+    select_related/prefetch_related/annotate calls of `sparse_relations` for selected fields.
+    """
+    # name -> many, for relations that can be collapsed to primary keys
+    expandable_fields = {}
+    # name -> fn(queryset, expanded) returning (queryset, extra .only() columns)
+    sparse_relations = {}
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        if expand is not None:
+            for name, many in self.expandable_fields.items():
+                if name in self.fields and name not in expand:
+                    self.fields[name] = serializers.PrimaryKeyRelatedField(many=many, read_only=True)
+
+    @classmethod
+    def sparse_queryset(cls, queryset, fields=None, expand=None, required=("id",)):
+        """Restrict a queryset to what cls(fields=fields, expand=expand) will read."""
+        if fields is None and expand is None:
+            return queryset
+        serializer = cls(fields=fields, expand=expand)
+        concrete = {field.name for field in queryset.model._meta.concrete_fields}
+        columns = set(required)
+        for name, field in serializer.fields.items():
+            if field.source in concrete:
+                columns.add(field.source)
+            if name in cls.sparse_relations:
+                queryset, extra = cls.sparse_relations[name](queryset, expand is None or name in expand)
+                columns.update(extra)
+        return queryset.only(*columns)
+
+
+def _prefetch(name, queryset):
+    return lambda qs, expanded: (qs.prefetch_related(Prefetch(name, queryset=queryset(expanded))), ())
+
+
+def _annotate_has_key(qs, expanded):
+    return qs.annotate(has_key=Exists(PrivateKey.objects.filter(certificate=OuterRef('pk')))), ()
+
+
+def _select_certificate(qs, expanded):
+    if not expanded:
+        return qs, ()
+    return qs.select_related('certificate'), [f'certificate__{name}' for name in CertificateMiniSerializer.Meta.fields]
+
 class TeamMiniSerializer(serializers.ModelSerializer):
     class Meta:
         model = Team
@@ -36,8 +106,21 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
         token['username'] = user.username
         token['first_name'] = user.first_name
         token['last_name'] = user.last_name
+        set_access_claims(token, user)
         return token
 
+class MyTokenRefreshSerializer(TokenRefreshSerializer):
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        # Access tokens inherit the claims of the refresh token: re-read the teams if they changed since.
+        access = AccessToken(data['access'])
+        user_id = access[api_settings.USER_ID_CLAIM]
+        if access.get(MEMBERSHIP_VERSION_CLAIM) != CustomUser.objects.membership_version(user_id):
+            user = CustomUser.objects.filter(pk=user_id).first()
+            if user is not None:
+                data['access'] = str(set_access_claims(access, user))
+        return data
+
 class LoginUserSerializer(serializers.Serializer):
     email = serializers.EmailField(required=True)
     password = serializers.CharField(write_only=True)
@@ -66,23 +149,83 @@ class CertificateMiniSerializer(serializers.ModelSerializer):
         model = Certificate
         fields = ['id', 'name', 'not_after', 'subject']  
 
-class WebsiteSerializer(serializers.ModelSerializer):
+class WebsiteSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     certificate = CertificateMiniSerializer(read_only=True)
+    expandable_fields = {'certificate': False}
+    sparse_relations = {'certificate': _select_certificate}
     class Meta:
         model = Website
         fields = ['id', 'url', 'domain', 'certificate']
         read_only_fields = ['id', 'domain']
         
-class CertificateSerializer(serializers.ModelSerializer):
+class CertificateSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     access_teams= TeamSerializer(many=True, read_only=True)
     websites     = WebsiteSerializer(many=True, read_only=True)
     has_private_key = serializers.SerializerMethodField()
+    expandable_fields = {'access_teams': True, 'websites': True}
+    sparse_relations = {
+        'access_teams': _prefetch('access_teams', lambda expanded: (
+            Team.objects.prefetch_related('members__teams') if expanded else Team.objects.only('id')
+        )),
+        'websites': _prefetch('websites', lambda expanded: (
+            Website.objects.select_related('certificate').only(
+                'id', 'url', 'domain', *[f'certificate__{name}' for name in CertificateMiniSerializer.Meta.fields]
+            ) if expanded else Website.objects.only('id', 'certificate_id')
+        )),
+        'children': _prefetch('children', lambda expanded: Certificate.objects.only('id')),
+        'has_private_key': _annotate_has_key,
+    }
     class Meta:
         model = Certificate
-        fields = '__all__'
+        exclude = ['der']
     def get_has_private_key(self, obj):
+        if hasattr(obj, 'has_key'):
+            return obj.has_key
         return obj.has_private_key
 
+class WebsiteMiniSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Website
+        fields = ['id', 'url', 'domain']
+
+class CertificateListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Flat certificate representation for list pages.
+    Expects the queryset of CertificateListView: has_private_key annotated, access_teams and
+    websites prefetched, so the number of queries does not depend on the page size.
+    """
+    access_teams = TeamMiniSerializer(many=True, read_only=True)
+    websites = WebsiteMiniSerializer(many=True, read_only=True)
+    has_private_key = serializers.BooleanField(source='has_key', read_only=True)
+    expandable_fields = {'access_teams': True, 'websites': True}
+    sparse_relations = {
+        'access_teams': _prefetch('access_teams', lambda expanded: Team.objects.only('id', 'name')),
+        'websites': _prefetch('websites', lambda expanded: Website.objects.only('id', 'url', 'domain', 'certificate_id')),
+        'has_private_key': _annotate_has_key,
+    }
+    class Meta:
+        model = Certificate
+        fields = [
+            'id', 'name', 'comment', 'subject', 'issuer', 'serial_number', 'not_before', 'not_after',
+            'is_expired', 'public_key_type', 'public_key_length', 'signature_algorithm', 'san',
+            'file_format', 'original_filename', 'cert_hash', 'issuer_hash', 'subject_hash',
+            'certificate_type', 'parent', 'access_teams', 'websites', 'has_private_key', 'updated_at',
+        ]
+
+class CertificateSearchSerializer(serializers.ModelSerializer):
+    rank = serializers.FloatField(read_only=True)
+    class Meta:
+        model = Certificate
+        fields = ['id', 'name', 'subject', 'issuer', 'san', 'not_after', 'is_expired', 'certificate_type', 'rank']
+
+class CertificateCoverageSerializer(serializers.ModelSerializer):
+    match = serializers.SerializerMethodField()
+    class Meta:
+        model = Certificate
+        fields = ['id', 'name', 'san', 'not_after', 'is_expired', 'certificate_type', 'match']
+
+    def get_match(self, obj):
+        return self.context.get('match')
+
 class CertificateMetaSerializer(serializers.Serializer):
     file = serializers.IntegerField()
     name = serializers.CharField(max_length=255, allow_blank=True, required=False)
@@ -96,16 +239,45 @@ class UploadFileSerializer(serializers.ModelSerializer):
         fields =['id','file','uploaded_at']
     
     def create(self, validated_data):
-        validated_data['uploaded_by'] = self.context['request'].user
-        return UploadedFile.objects.create(**validated_data)
+        upload = validated_data['file']
+        return create_uploaded_file(
+            upload,
+            self.context['request'].user,
+            suffix=os.path.splitext(upload.name)[1],
+            original_filename=upload.name,
+        )
 
 
-class PrivateKeyDetailSerializer(serializers.ModelSerializer):
+class PrivateKeyDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     certificate = CertificateMiniSerializer(read_only=True)
     access_teams= TeamSerializer(many=True, read_only=True)
+    expandable_fields = {'certificate': False, 'access_teams': True}
+    sparse_relations = {
+        'certificate': _select_certificate,
+        'access_teams': _prefetch('access_teams', lambda expanded: (
+            Team.objects.prefetch_related('members__teams') if expanded else Team.objects.only('id')
+        )),
+    }
     class Meta:
         model = PrivateKey
-        fields = '__all__'
+        exclude = ['encrypted_key']
+
+
+class PrivateKeyListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Flat private key representation for list pages (certificate joined, access_teams prefetched)."""
+    certificate = CertificateMiniSerializer(read_only=True)
+    access_teams = TeamMiniSerializer(many=True, read_only=True)
+    expandable_fields = {'certificate': False, 'access_teams': True}
+    sparse_relations = {
+        'certificate': _select_certificate,
+        'access_teams': _prefetch('access_teams', lambda expanded: Team.objects.only('id', 'name')),
+    }
+    class Meta:
+        model = PrivateKey
+        fields = [
+            'id', 'name', 'comment', 'created_at', 'updated_at', 'certificate', 'uploaded_by', 'keysize',
+            'file_format', 'original_filename', 'access_teams', 'key_hash',
+        ]
 
 
 class PrivateKeyUploadSerializer(serializers.Serializer):
@@ -122,6 +294,12 @@ class UploadedFileProcessSerializer(serializers.Serializer):
     name = serializers.CharField(required=False, allow_blank=True)
 
 
+class UploadJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UploadJob
+        fields = ['id', 'kind', 'status', 'total', 'processed', 'results', 'error', 'created_at', 'started_at', 'finished_at']
+
+
 class CertificateUpdateSerializer(serializers.ModelSerializer):
     access_teams = serializers.PrimaryKeyRelatedField(queryset=Team.objects.all(), many=True, required=False)
 
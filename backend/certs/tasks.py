@@ -1,6 +1,8 @@
 from celery import shared_task
 from django.utils import timezone
-from .models import Certificate
+from .models import Certificate, UploadJob
+from .utils import dashboard, upload_staging
+from .utils.upload_jobs import run_upload_job
 
 @shared_task
 def check_and_update_expired_certificates():
@@ -9,5 +11,30 @@ def check_and_update_expired_certificates():
     now = timezone.now()
     # Find certificates that are not marked as expired but should be
     expired_certs = Certificate.objects.filter(not_after__lt=now, is_expired=False)
-    count = expired_certs.update(is_expired=True)
-    return f"Marked {count} certificates as expired."
\ No newline at end of file
+    count = expired_certs.update(is_expired=True, updated_at=now)
+    if count:
+        dashboard.invalidate_dashboard_snapshots()
+    return f"Marked {count} certificates as expired."
+
+@shared_task(soft_time_limit=600, time_limit=660)
+def process_upload_job(job_id):
+    """Run a pending upload job (parsing, deduplication, persistence and chain linking)."""
+    job = UploadJob.objects.filter(id=job_id, status=UploadJob.STATUS_PENDING).select_related('uploaded_file').first()
+    if job is None:
+        return f"Upload job {job_id} is not pending."
+    run_upload_job(job)
+    return f"Upload job {job_id} {job.status}."
+
+
+@shared_task
+def purge_expired_upload_previews():
+    """Delete upload previews whose TTL has passed without being imported."""
+    count = upload_staging.purge_expired_upload_previews()
+    return f"Deleted {count} expired upload previews."
+
+
+@shared_task
+def refresh_dashboard_snapshots():
+    """Recompute the dashboard snapshot of every visibility scope in use."""
+    count = dashboard.refresh_dashboard_snapshots()
+    return f"Refreshed {count} dashboard snapshots."
@@ -1,3 +1,221 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from certs.models import Certificate, CustomUser, PrivateKey, Team
+from certs.utils.access_utils import (
+    authorize_certificates,
+    authorize_keys,
+    get_accessible_certificates,
+    get_accessible_keys,
+)
+
+
+def make_certificate(name, teams=()):
+    cert = Certificate.objects.create(
+        name=name,
+        subject=f"CN={name}",
+        issuer=f"CN={name}",
+        serial_number=name,
+        not_before="2020-01-01T00:00Z",
+        not_after="2030-01-01T00:00Z",
+        signature_algorithm="sha256WithRSAEncryption",
+    )
+    cert.access_teams.set(teams)
+    return cert
+
+
+def make_key(name, teams=()):
+    key = PrivateKey.objects.create(name=name)
+    key.access_teams.set(teams)
+    return key
+
+
+class PublicFlagTests(TestCase):
+    """is_public follows access_teams whichever side of the relation changes."""
+
+    def setUp(self):
+        self.team = Team.objects.create(name="ops")
+        self.other_team = Team.objects.create(name="dev")
+
+    def assertPublic(self, obj, expected):
+        obj.refresh_from_db(fields=["is_public"])
+        self.assertEqual(obj.is_public, expected)
+
+    def test_new_certificate_is_public(self):
+        self.assertPublic(make_certificate("c"), True)
+
+    def test_certificate_side_add_remove_clear(self):
+        cert = make_certificate("c")
+        cert.access_teams.add(self.team)
+        self.assertPublic(cert, False)
+        cert.access_teams.add(self.other_team)
+        cert.access_teams.remove(self.team)
+        self.assertPublic(cert, False)
+        cert.access_teams.remove(self.other_team)
+        self.assertPublic(cert, True)
+        cert.access_teams.set([self.team, self.other_team])
+        cert.access_teams.clear()
+        self.assertPublic(cert, True)
+
+    def test_team_side_add_remove_clear(self):
+        certs = [make_certificate("a"), make_certificate("b")]
+        key = make_key("k")
+        self.team.certificates.add(*certs)
+        self.team.private_key.add(key)
+        for obj in (*certs, key):
+            self.assertPublic(obj, False)
+        self.team.certificates.remove(certs[0])
+        self.assertPublic(certs[0], True)
+        self.assertPublic(certs[1], False)
+        self.team.certificates.clear()
+        self.team.private_key.clear()
+        for obj in (*certs, key):
+            self.assertPublic(obj, True)
+
+    def test_team_delete(self):
+        shared = make_certificate("shared", [self.team, self.other_team])
+        private = make_certificate("private", [self.team])
+        key = make_key("k", [self.team])
+        self.team.delete()
+        self.assertPublic(shared, False)
+        self.assertPublic(private, True)
+        self.assertPublic(key, True)
+
+    def test_visibility_follows_flag(self):
+        member = CustomUser.objects.create_user(email="member@example.com", password="pw")
+        outsider = CustomUser.objects.create_user(email="outsider@example.com", password="pw")
+        self.team.members.add(member)
+        public = make_certificate("public")
+        restricted = make_certificate("restricted", [self.team])
+        key = make_key("k", [self.team])
+
+        self.assertCountEqual(get_accessible_certificates(member), [public, restricted])
+        self.assertCountEqual(get_accessible_certificates(outsider), [public])
+        self.assertCountEqual(get_accessible_keys(outsider), [])
+
+        restricted.access_teams.clear()
+        self.team.private_key.remove(key)
+        outsider = CustomUser.objects.get(pk=outsider.pk)
+        self.assertCountEqual(get_accessible_certificates(outsider), [public, restricted])
+        self.assertCountEqual(get_accessible_keys(outsider), [key])
+
+
+class BatchAuthorizationTests(TestCase):
+    """authorize_certificates/authorize_keys split ids in one query."""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email="member@example.com", password="pw")
+        self.team = Team.objects.create(name="ops")
+        self.other_team = Team.objects.create(name="dev")
+        self.team.members.add(self.user)
+        self.public = make_certificate("public")
+        self.granted = make_certificate("granted", [self.team, self.other_team])
+        self.denied = make_certificate("denied", [self.other_team])
+
+    def test_certificates_split(self):
+        missing = self.denied.pk + 1000
+        ids = {self.public.pk, self.granted.pk, self.denied.pk, missing}
+        with CaptureQueriesContext(connection) as queries:
+            allowed, denied = authorize_certificates(ids, self.user)
+        self.assertEqual(allowed, {self.public.pk, self.granted.pk})
+        self.assertEqual(denied, {self.denied.pk})
+        self.assertEqual(len(queries), 2)  # the user's teams, then the split
+
+    def test_keys_split(self):
+        public, granted, denied = make_key("a"), make_key("b", [self.team]), make_key("c", [self.other_team])
+        allowed, refused = authorize_keys({public.pk, granted.pk, denied.pk, denied.pk + 1000}, self.user)
+        self.assertEqual(allowed, {public.pk, granted.pk})
+        self.assertEqual(refused, {denied.pk})
+
+    def test_only_missing_ids(self):
+        self.assertEqual(authorize_certificates({self.denied.pk + 1000}, self.user), (set(), set()))
+
+    def test_query_count_does_not_grow_with_selection(self):
+        certs = [make_certificate(f"bulk-{i}", [self.team]) for i in range(50)]
+        self.user._access_team_ids = None
+        with CaptureQueriesContext(connection) as few:
+            authorize_certificates({certs[0].pk}, self.user)
+        self.user._access_team_ids = None
+        with CaptureQueriesContext(connection) as many:
+            allowed, _ = authorize_certificates({c.pk for c in certs}, self.user)
+        self.assertEqual(len(allowed), 50)
+        self.assertEqual(len(few), len(many))
+
+    def test_bulk_delete_is_all_or_nothing(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.delete(
+            "/api/certificates/delete/", {"ids": [self.granted.pk, self.denied.pk]}, format="json"
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertTrue(Certificate.objects.filter(pk=self.granted.pk).exists())
+
+        response = client.delete(
+            "/api/certificates/delete/", {"ids": [self.denied.pk + 1000]}, format="json"
+        )
+        self.assertEqual(response.status_code, 404)
+
+        response = client.delete(
+            "/api/certificates/delete/", {"ids": [self.public.pk, self.granted.pk]}, format="json"
+        )
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Certificate.objects.filter(pk__in=[self.public.pk, self.granted.pk]).exists())
+
+
+class TokenAccessContextTests(TestCase):
+    """Team claims of access tokens stop being trusted once membership changes."""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email="member@example.com", password="pw12345!")
+        self.admin = CustomUser.objects.create_superuser(email="admin@example.com", password="pw12345!")
+        self.team = Team.objects.create(name="ops")
+        self.team.members.add(self.user)
+        self.restricted = make_certificate("restricted", [self.team])
+        self.client = APIClient()
+        tokens = self.client.post(
+            "/api/token/", {"email": "member@example.com", "password": "pw12345!"}, format="json"
+        ).json()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+
+    def list_names(self):
+        response = self.client.get("/api/certificates/")
+        self.assertEqual(response.status_code, 200)
+        return [row["name"] for row in response.json()["results"]]
+
+    def test_removed_member_loses_access_on_next_request(self):
+        self.assertEqual(self.list_names(), ["restricted"])
+        self.assertEqual(self.client.get(f"/api/certificates/{self.restricted.pk}/").status_code, 200)
+
+        admin = APIClient()
+        admin.force_authenticate(self.admin)
+        response = admin.put(f"/api/admin/teams/{self.team.pk}/update_members/", {"user_ids": []}, format="json")
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.list_names(), [])
+        self.assertNotEqual(self.client.get(f"/api/certificates/{self.restricted.pk}/").status_code, 200)
+
+    def test_deleted_team_revokes_access(self):
+        self.team.certificates.add(make_certificate("shared"))
+        Team.objects.create(name="dev").certificates.add(Certificate.objects.get(name="shared"))
+        self.assertCountEqual(self.list_names(), ["restricted", "shared"])
+        self.team.delete()
+        self.assertEqual(self.list_names(), ["restricted"])  # now public
+
+    def test_unrelated_saves_keep_the_version(self):
+        version = CustomUser.objects.membership_version(self.user.pk)
+        self.client.post("/api/token/", {"email": "member@example.com", "password": "pw12345!"}, format="json")
+        self.user.refresh_from_db()
+        self.user.first_name = "Ada"
+        self.user.save()
+        self.assertEqual(CustomUser.objects.membership_version(self.user.pk), version)
+
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(CustomUser.objects.membership_version(self.user.pk), version + 1)
+
+    def test_deactivated_user_is_rejected(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get("/api/certificates/").status_code, 401)
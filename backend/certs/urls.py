@@ -7,17 +7,24 @@ from certs.views import (
     TeamListView,
     UploadCertFilePreviewView,
     ImportCertMetadataView,
+    UploadJobDetailView,
     PrivateKeyListView,
     DeleteKeysView,
     ManageCertificatesView,
     ManageKeyView,
     UserInfoView,
     MyTokenObtainPairView,
+    MyTokenRefreshView,
     CertificateWebsiteListCreateView,
     WebsiteDetailView,
     WebsiteListView,
+    CertificateWebsiteSuggestionsView,
     CertificateExportView,
+    CertificateBulkExportView,
+    CertificateSearchView,
+    CertificateHostnameLookupView,
     CertificateTestView,
+    CertificateDescendantsView,
     CreateTeamView,
     CreateUserView,
     DeleteTeamView,
@@ -29,12 +36,14 @@ from certs.views import (
     RegisterFromInviteView,
     GenerateInviteView,
     TeamDetailView,
+    CertificateCacheStatsView,
     certificates_overview,
     certificates_expiring_soon,
     certificates_list,
     certificates_top_expiry,
+    certificates_summary,
+    certificates_expiry_forecast,
 )
-from rest_framework_simplejwt.views import TokenRefreshView
 
 
 urlpatterns = [
@@ -42,6 +51,7 @@ urlpatterns = [
     path('certificates/delete/', DeleteCertifiactesView.as_view(), name='certificates-delete'),
     path('certificates/<int:cert_id>/update-certificate/', ManageCertificatesView.as_view(), name='certificate-update'),
     path('certificates/<int:cert_id>/websites/',CertificateWebsiteListCreateView.as_view(),name='cert-website-list-create'),
+    path('certificates/<int:cert_id>/website-suggestions/',CertificateWebsiteSuggestionsView.as_view(),name='cert-website-suggestions'),
     path('websites/<int:pk>/',WebsiteDetailView.as_view(),name='website-detail'),
 
     #MANAGE KEY
@@ -51,11 +61,14 @@ urlpatterns = [
     #UPLOAD CERTIFICATE
     path('upload-cert-file/', UploadCertFilePreviewView.as_view(), name='upload-file-cert'),
     path('import-cert-metadata/', ImportCertMetadataView.as_view(), name='import-file-cert'),
+    path('upload-jobs/<uuid:job_id>/', UploadJobDetailView.as_view(), name='upload-job-detail'),
 
     #VIEW CERTIFICATE DETAILS
     path('keys/<int:key_id>/',PrivateKeyDetailView.as_view(),name='PrivateKey-detail'),
     path('certificates/',CertificateListView.as_view(),name='certificate-create-list'),
     path('certificates/<int:cert_id>/',CertificateDetailView.as_view(),name='certificate-detail'),
+    path('certificates/search/',CertificateSearchView.as_view(),name='certificate-search'),
+    path('certificates/covering/',CertificateHostnameLookupView.as_view(),name='certificate-covering'),
     path('keys/',PrivateKeyListView.as_view(),name='privatekey-list'),
 
     #TEAMS VIEW
@@ -68,12 +81,16 @@ urlpatterns = [
 
     #TEST VIEW
     path('token/', MyTokenObtainPairView.as_view()),
-    path('token/refresh/',TokenRefreshView.as_view()),
+    path('token/refresh/',MyTokenRefreshView.as_view()),
 
     #Export VIEW
     path('certificates/<int:cert_id>/export/', CertificateExportView.as_view(), name='certificate-export'),
+    path('certificates/bulk-export/', CertificateBulkExportView.as_view(), name='certificate-bulk-export'),
     path('certificates/<int:cert_id>/test/',CertificateTestView.as_view(), name='certificate-test' ),
 
+    #CHAIN VIEW
+    path('certificates/<int:cert_id>/descendants/', CertificateDescendantsView.as_view(), name='certificate-descendants'),
+
     #ADMIN MANAGEMENT
     path('admin/users/', CreateUserView.as_view()),
     path('admin/users/<int:pk>/send_reset_link/', SendPasswordResetLinkView.as_view()),
@@ -85,6 +102,7 @@ urlpatterns = [
     path('admin/teams/<int:pk>/delete/', DeleteTeamView.as_view()),
     path('register/<uuid:token>/', RegisterFromInviteView.as_view()),
     path('admin/invite/', GenerateInviteView.as_view()),
+    path('admin/certificate-cache/', CertificateCacheStatsView.as_view()),
 
     #WEBSITE VIEW
     path('websites/', WebsiteListView.as_view()),
@@ -94,5 +112,7 @@ urlpatterns = [
     path('dashboard/certificates-expiring-soon/', certificates_expiring_soon, name='certificates-expiring-soon'),
     path('dashboard/certificates-list/', certificates_list, name='certificates-list'),
     path('dashboard/certificates-top-expiry/', certificates_top_expiry, name='certificates-top-expiry'),
+    path('dashboard/summary/', certificates_summary, name='dashboard-summary'),
+    path('dashboard/expiry-forecast/', certificates_expiry_forecast, name='dashboard-expiry-forecast'),
 
 ]
\ No newline at end of file
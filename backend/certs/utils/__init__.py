@@ -1,12 +1,26 @@
 from .cert_parser import get_certificate_info
-from .certificate_hashing import hash_certificate, compute_issuer_hash, compute_subject_hash, calculate_key_hash
-from .chain_utils import get_parent_certificate, get_children_item, certificate_relationship
+from .certificate_hashing import hash_certificate, compute_issuer_hash, compute_subject_hash, calculate_key_hash, compute_subject_key_id, compute_authority_key_id
+from .chain_closure import refresh_chain_closure, get_certificate_ancestors, get_certificate_descendants, get_certificate_chains
+from .chain_utils import get_parent_certificate, get_children_item, resolve_certificate_chains
+from .format_detection import sniff_format
+from .pem_stream import iter_file_chunks, iter_pem_blocks, iter_der_blocks, iter_uploaded_objects
 from .parser import detect_file_format, parse_uploaded_file, split_pem_sections
-from .utils import load_certificate_from_bytes, extract_common_name, walk_certificate_chain, build_cert_chain_tree, _load_and_decrypt_key
+from .utils import load_certificate_from_bytes, read_fieldfile_bytes, read_encrypted_key_bytes, x_accel_redirect_response, extract_common_name, walk_certificate_chain, build_cert_chain_tree, _load_and_decrypt_key
 from .classify_certificate import classify_certificate
 from .parserCert import parse_uploaded_content
+from .blob_store import content_hash, acquire_blobs, release_blobs, atomic_storage
 from .create_uploaded_file import create_uploaded_file
-from .create_certifiacte import create_certificate
+from .create_certifiacte import create_certificate, build_certificate
+from .bulk_ingest import bulk_create_certificates
+from .upload_staging import stage_upload_preview, upload_preview_exists, load_upload_preview, discard_upload_preview, purge_expired_upload_previews
+from .upload_jobs import create_upload_job, get_upload_job_progress, run_upload_job
 from .create_private_key import create_private_key
 from .link_certificate import link_certificates
-from .access_utils import user_can_access_certificate,get_accessible_certificates,user_can_access_key,get_accessible_keys
\ No newline at end of file
+from .access_utils import user_team_ids,user_can_access_certificate,get_accessible_certificates,user_can_access_key,get_accessible_keys,certificate_access_filter,authorize_certificates,authorize_keys
+from .certificate_bundles import build_certificate_bundles, get_certificate_bundle
+from .bulk_export import iter_certificate_archive
+from .conditional import conditional_view
+from .search import search_certificates
+from .hostname_coverage import find_covering_certificates, suggest_websites
+from .bulk_delete import delete_certificates, delete_private_keys
+from .dashboard import get_dashboard_summary, get_expiry_forecast, invalidate_dashboard_snapshots, refresh_dashboard_snapshots
\ No newline at end of file
@@ -1,37 +1,102 @@
-from certs.models import Certificate, PrivateKey
-from django.db.models import Q
+from certs.models import Certificate, PrivateKey, Team
+from django.db.models import BooleanField, Exists, ExpressionWrapper, OuterRef, Q
+
+
+def user_team_ids(user):
+    """
+    Return the ids of the user's teams, loaded at most once per request.
+    Users authenticated with a current access token (certs.authentication.TokenUser) carry
+    them from the token claims, so no query is needed.
+    """
+    team_ids = getattr(user, "_access_team_ids", None)
+    if team_ids is None:
+        team_ids = list(Team.members.through.objects.filter(customuser_id=user.pk).values_list("team_id", flat=True))
+        user._access_team_ids = team_ids
+    return team_ids
+
+
+def _visible_to_teams(team_ids, model, outer_ref="pk", prefix=""):
+    """Q matching the rows of `model` (reached through `prefix`) visible to members of the teams.
+    Public rows come from the indexed is_public flag, the others from an EXISTS probe of the
+    access_teams through table restricted to the teams, so no JOIN or DISTINCT is needed.
+    """
+    through = model.access_teams.through
+    owner_column = model.access_teams.field.m2m_column_name()
+    granted = through.objects.filter(**{owner_column: OuterRef(outer_ref), "team_id__in": team_ids})
+    return Q(**{f"{prefix}is_public": True}) | Q(Exists(granted))
+
+
+def _visible_to(user, model, outer_ref="pk", prefix=""):
+    return _visible_to_teams(user_team_ids(user), model, outer_ref=outer_ref, prefix=prefix)
+
+
+def get_certificates_visible_to_teams(team_ids):
+    """
+    Return a queryset of the certificates visible to members of exactly these teams.
+    Every user with the same teams sees the same certificates (their visibility scope).
+    """
+    return Certificate.objects.filter(_visible_to_teams(list(team_ids), Certificate)).defer("der")
+
+
+def certificate_access_filter(user, field=None):
+    """
+    Return a Q selecting the rows whose certificate the user can access, for filtering a model
+    pointing to Certificate through `field` (e.g. Website and "certificate").
+    """
+    if field is None:
+        return _visible_to(user, Certificate)
+    return _visible_to(user, Certificate, outer_ref=f"{field}_id", prefix=f"{field}__")
+
 
 def user_can_access_certificate(cert, user):
     """
     Return True if the user can access this certificate (either it's public, or they're in an access team).
     """
-    if cert.access_teams.count() == 0:
-        return True
-    return cert.access_teams.filter(members=user).exists()
+    return Certificate.objects.filter(certificate_access_filter(user), pk=cert.pk).exists()
 
 def get_accessible_certificates(user):
     """
     Return a queryset of certificates the user can access.
     """
-    user_teams = user.teams.all()
-    return Certificate.objects.filter(
-        Q(access_teams__in=user_teams) | Q(access_teams__isnull=True)
-    ).distinct()
+    return Certificate.objects.filter(certificate_access_filter(user)).defer("der")
 
 def user_can_access_key(key, user):
     """
     Return True if the user can access this key
     (either it's public, or they're in an access team).
     """
-    if key.access_teams.count() == 0:
-        return True
-    return key.access_teams.filter(members=user).exists()
+    return PrivateKey.objects.filter(_visible_to(user, PrivateKey), pk=key.pk).exists()
 
 def get_accessible_keys(user):
     """
     Return a queryset of keys the user can access.
     """
-    user_teams = user.teams.all()
-    return PrivateKey.objects.filter(
-        Q(access_teams__in=user_teams) | Q(access_teams__isnull=True)
-    ).distinct()
\ No newline at end of file
+    return PrivateKey.objects.filter(_visible_to(user, PrivateKey)).defer("encrypted_key")
+
+
+def _authorize(model, ids, user):
+    allowed, denied = set(), set()
+    rows = model.objects.filter(pk__in=ids).annotate(
+        allowed=ExpressionWrapper(_visible_to(user, model), output_field=BooleanField())
+    ).values_list("pk", "allowed")
+    for pk, is_allowed in rows:
+        (allowed if is_allowed else denied).add(pk)
+    return allowed, denied
+
+def authorize_certificates(cert_ids, user):
+    """
+    Split certificate ids into those the user can access and those they cannot, with one query.
+    Ids of certificates that do not exist are in neither set.
+    Returns:
+        tuple: (allowed ids, denied ids)
+    """
+    return _authorize(Certificate, cert_ids, user)
+
+def authorize_keys(key_ids, user):
+    """
+    Split private key ids into those the user can access and those they cannot, with one query.
+    Ids of keys that do not exist are in neither set.
+    Returns:
+        tuple: (allowed ids, denied ids)
+    """
+    return _authorize(PrivateKey, key_ids, user)
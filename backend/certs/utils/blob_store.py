@@ -0,0 +1,132 @@
+import hashlib
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.core.files.base import ContentFile, File
+from django.db import transaction
+from django.db.models import F
+from certs.models import Blob
+
+# Files written to storage inside the innermost atomic_storage() block.
+_written_files = ContextVar("written_files", default=None)
+
+
+def content_hash(content):
+    """Return the SHA-256 (hex) of raw bytes or of a File read in chunks, the key of
+    non-certificate blobs."""
+    if not isinstance(content, File):
+        return hashlib.sha256(content).hexdigest()
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def blob_name(sha256, suffix=""):
+    """Return the storage name of a blob, fanned out by the first two hex digits."""
+    return f"{sha256[:2]}/{sha256}{suffix}"
+
+
+def track_written_file(storage, name):
+    """Remember a file written to storage so that it is deleted if the enclosing
+    atomic_storage() block rolls back. Does nothing outside such a block."""
+    written = _written_files.get()
+    if written is not None:
+        written.append((storage, name))
+
+
+@contextmanager
+def atomic_storage():
+    """transaction.atomic() that also deletes the files written inside the block (see
+    track_written_file) when it rolls back, so a failed import leaves no orphaned files.
+    Files written in a nested block are handed over to the enclosing one once it succeeds.
+    """
+    parent = _written_files.get()
+    written = []
+    token = _written_files.set(written)
+    try:
+        with transaction.atomic():
+            yield
+    except BaseException:
+        for storage, name in written:
+            storage.delete(name)
+        raise
+    finally:
+        _written_files.reset(token)
+    if parent is not None:
+        parent.extend(written)
+
+
+def acquire_blobs(items, suffix=".pem"):
+    """Return the blobs for the given contents, writing only the ones not stored yet.
+    Every occurrence in items adds one reference, so each returned blob must end up used by
+    exactly as many UploadedFile rows. Content already stored costs no storage I/O.
+    Args:
+        items (list): (sha256, content) tuples, content being bytes or a File (such as an upload)
+            that is streamed to storage; the same key may appear several times.
+        suffix (str, optional): Extension of newly written files.
+    Returns:
+        dict: The Blob objects keyed by sha256.
+    """
+    counts = Counter(sha for sha, _ in items)
+    contents = dict(items)
+    if not counts:
+        return {}
+
+    file_field = Blob._meta.get_field("file")
+    with atomic_storage():
+        # Row locks keep a concurrent release from deleting a blob we are about to reference.
+        blobs = Blob.objects.select_for_update().in_bulk(list(counts))
+        missing = [sha for sha in counts if sha not in blobs]
+        if missing:
+            new_blobs = []
+            for sha in missing:
+                content = contents[sha]
+                if not isinstance(content, File):
+                    content = ContentFile(content)
+                blob = Blob(sha256=sha, size=content.size)
+                name = file_field.generate_filename(blob, blob_name(sha, suffix))
+                blob.file.name = file_field.storage.save(name, content)
+                track_written_file(file_field.storage, blob.file.name)
+                new_blobs.append(blob)
+            Blob.objects.bulk_create(new_blobs, ignore_conflicts=True)
+
+            stored = Blob.objects.in_bulk(missing)
+            for blob in new_blobs:
+                # Another upload created the same blob concurrently, keep its file.
+                if stored[blob.sha256].file.name != blob.file.name:
+                    file_field.storage.delete(blob.file.name)
+            blobs.update(stored)
+
+        by_count = defaultdict(list)
+        for sha, count in counts.items():
+            by_count[count].append(sha)
+        for count, shas in by_count.items():
+            Blob.objects.filter(sha256__in=shas).update(ref_count=F("ref_count") + count)
+    return blobs
+
+
+def release_blobs(shas):
+    """Drop one reference per key and delete blobs that are no longer used.
+    Files are removed from storage after the transaction commits.
+    Args:
+        shas (Iterable[str]): Blob keys, one entry per released reference.
+    """
+    counts = Counter(shas)
+    if not counts:
+        return
+
+    with transaction.atomic():
+        by_count = defaultdict(list)
+        for sha, count in counts.items():
+            by_count[count].append(sha)
+        for count, keys in by_count.items():
+            Blob.objects.filter(sha256__in=keys).update(ref_count=F("ref_count") - count)
+
+        unused = Blob.objects.filter(sha256__in=list(counts), ref_count=0)
+        names = list(unused.values_list("file", flat=True))
+        unused.delete()
+
+    storage = Blob._meta.get_field("file").storage
+    for name in names:
+        transaction.on_commit(lambda name=name: storage.delete(name))
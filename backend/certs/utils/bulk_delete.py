@@ -0,0 +1,64 @@
+from django.db import transaction
+from django.utils import timezone
+from certs.models import Certificate, CertificateClosure, PrivateKey, UploadedFile, batched_delete
+from .blob_store import release_blobs
+from .dashboard import invalidate_dashboard_snapshots
+
+
+def _delete_uploaded_files(file_ids):
+    """Delete UploadedFile rows, releasing their blobs (or removing their own file) in one pass."""
+    rows = list(UploadedFile.objects.filter(id__in=file_ids).values_list("blob_id", "file"))
+    UploadedFile.objects.filter(id__in=file_ids).delete()
+    release_blobs([blob_id for blob_id, _ in rows if blob_id])
+
+    storage = UploadedFile._meta.get_field("file").storage
+    for name in [name for blob_id, name in rows if not blob_id and name]:
+        transaction.on_commit(lambda name=name: storage.delete(name))
+
+
+def delete_certificates(certificate_ids):
+    """Delete certificates with a number of queries that does not depend on how many there are.
+    Same outcome as deleting them one by one: their uploaded files go too (with the other
+    certificates stored in the same file), linked private keys and websites are cascaded and
+    the closure of the children left without parent is refreshed once for the batch.
+    Args:
+        certificate_ids (Iterable[int]): IDs of the certificates to delete.
+    Returns:
+        int: The number of deleted certificates.
+    """
+    certificate_ids = set(certificate_ids)
+    with transaction.atomic():
+        file_ids = set(
+            Certificate.objects.filter(id__in=certificate_ids, file__isnull=False).values_list("file_id", flat=True)
+        )
+        # Deleting a file cascades to every certificate stored in it.
+        certificate_ids |= set(Certificate.objects.filter(file_id__in=file_ids).values_list("id", flat=True))
+        children = list(
+            Certificate.objects.filter(parent_id__in=certificate_ids)
+            .exclude(id__in=certificate_ids)
+            .values_list("id", flat=True)
+        )
+
+        with batched_delete():
+            _, deleted = Certificate.objects.filter(id__in=certificate_ids).delete()
+            _delete_uploaded_files(file_ids)
+        CertificateClosure.objects.refresh(children)
+        transaction.on_commit(invalidate_dashboard_snapshots)
+    return deleted.get(Certificate._meta.label, 0)
+
+
+def delete_private_keys(key_ids):
+    """Delete private keys with a number of queries that does not depend on how many there are.
+    The certificates they were linked to are touched once for the batch.
+    Args:
+        key_ids (Iterable[int]): IDs of the private keys to delete.
+    Returns:
+        int: The number of deleted keys.
+    """
+    with transaction.atomic():
+        keys = PrivateKey.objects.filter(id__in=set(key_ids))
+        certificate_ids = set(keys.filter(certificate__isnull=False).values_list("certificate_id", flat=True))
+        with batched_delete():
+            _, deleted = keys.delete()
+        Certificate.objects.filter(id__in=certificate_ids).update(updated_at=timezone.now())
+    return deleted.get(PrivateKey._meta.label, 0)
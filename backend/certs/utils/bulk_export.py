@@ -0,0 +1,170 @@
+import io
+import logging
+import tarfile
+import time
+import zipfile
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.utils.text import get_valid_filename
+from cryptography.hazmat.primitives.serialization import Encoding
+from certs.models import Certificate
+from .access_utils import get_accessible_keys
+from .certificate_cache import certificate_cache
+from .chain_closure import get_certificate_chains
+from .utils import read_encrypted_key_bytes, _load_and_decrypt_key
+
+logger = logging.getLogger(__name__)
+
+EXPORT_BATCH_SIZE = 200
+ARCHIVE_FORMATS = {
+    "zip": ("application/zip", "zip"),
+    "tar": ("application/x-tar", "tar"),
+}
+
+
+class _StreamBuffer:
+    """Write-only file object whose content is drained after every archive member.
+    zipfile and tarfile both accept it as a non-seekable output stream.
+    """
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class _ZipWriter:
+    def __init__(self, stream):
+        self._archive = zipfile.ZipFile(stream, mode="w", compression=zipfile.ZIP_DEFLATED)
+
+    def add(self, name, data, mtime):
+        info = zipfile.ZipInfo(name, date_time=time.gmtime(mtime)[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        self._archive.writestr(info, data)
+
+    def close(self):
+        self._archive.close()
+
+
+class _TarWriter:
+    def __init__(self, stream):
+        self._archive = tarfile.open(fileobj=stream, mode="w|")
+
+    def add(self, name, data, mtime):
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = mtime
+        info.mode = 0o600 if name.endswith("privkey.pem") else 0o644
+        self._archive.addfile(info, io.BytesIO(data))
+
+    def close(self):
+        self._archive.close()
+
+
+def _entry_files(chain, key_pem):
+    """Return the certbot-style files of one certificate.
+    chain.pem holds the issuers above the certificate without a self-signed root, which is what
+    a server is expected to send; fullchain.pem is cert.pem followed by chain.pem.
+    """
+    leaf, issuers = chain[0], chain[1:]
+    if issuers and issuers[-1].certificate_type == "RootCA":
+        issuers = issuers[:-1]
+
+    cert_pem = certificate_cache.get(leaf)[0].public_bytes(Encoding.PEM)
+    chain_pem = b"".join(certificate_cache.get(c)[0].public_bytes(Encoding.PEM) for c in issuers)
+    files = [
+        ("cert.pem", cert_pem),
+        ("chain.pem", chain_pem),
+        ("fullchain.pem", cert_pem + chain_pem),
+    ]
+    if key_pem:
+        files.append(("privkey.pem", key_pem))
+    return files
+
+
+def _entry_folder(certificate):
+    try:
+        name = get_valid_filename(certificate.name)
+    except SuspiciousFileOperation:
+        name = "certificate"
+    return f"{name}-{certificate.id}"
+
+
+def _load_key_pems(user, certificate_ids):
+    keys = get_accessible_keys(user).filter(certificate_id__in=certificate_ids).defer(None)
+    key_pems = {}
+    for key in keys:
+        try:
+            key_obj = _load_and_decrypt_key(read_encrypted_key_bytes(key))
+        except Exception as e:
+            logger.warning("Bulk export skipped private key %s: %s", key.id, e)
+            continue
+        key_pems[key.certificate_id] = key_obj.private_bytes(
+            encoding=Encoding.PEM,
+            format=settings.KEY_FORMAT,
+            encryption_algorithm=settings.KEY_ENCRYPTION_ALGO,
+        )
+    return key_pems
+
+
+def iter_certificate_archive(certificate_ids, user, archive="zip", include_keys=False):
+    """Yield a ZIP or tar archive of many certificates chunk by chunk.
+    Each certificate gets a "<name>-<id>/" directory with cert.pem, chain.pem, fullchain.pem and,
+    when include_keys is set and the user can access the key, privkey.pem. Chains and keys are
+    loaded for EXPORT_BATCH_SIZE certificates at a time, so memory does not grow with the
+    selection size.
+    Args:
+        certificate_ids (Iterable[int]): IDs of certificates the user is allowed to export.
+        user (User): The requesting user, used for the private key access check.
+        archive (str, optional): "zip" or "tar".
+        include_keys (bool, optional): Add privkey.pem for accessible keys.
+    Yields:
+        bytes: Consecutive parts of the archive.
+    """
+    stream = _StreamBuffer()
+    writer = _ZipWriter(stream) if archive == "zip" else _TarWriter(stream)
+    mtime = int(time.time())
+
+    batch = []
+    for cert_id in certificate_ids:
+        batch.append(cert_id)
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            yield from _write_batch(writer, stream, batch, user, include_keys, mtime)
+            batch = []
+    if batch:
+        yield from _write_batch(writer, stream, batch, user, include_keys, mtime)
+
+    writer.close()
+    yield stream.drain()
+
+
+def _write_batch(writer, stream, certificate_ids, user, include_keys, mtime):
+    chains = get_certificate_chains(certificate_ids)
+    missing = [cert_id for cert_id in certificate_ids if cert_id not in chains]
+    if missing:
+        # Certificates without closure rows yet are exported on their own
+        for cert in Certificate.objects.filter(id__in=missing).select_related("file"):
+            chains[cert.id] = [cert]
+    key_pems = _load_key_pems(user, certificate_ids) if include_keys else {}
+    for cert_id in certificate_ids:
+        chain = chains.get(cert_id)
+        if not chain:
+            continue
+        try:
+            files = _entry_files(chain, key_pems.get(cert_id))
+        except Exception as e:
+            logger.warning("Bulk export skipped certificate %s: %s", cert_id, e)
+            continue
+        folder = _entry_folder(chain[0])
+        for filename, data in files:
+            writer.add(f"{folder}/{filename}", data, mtime)
+        yield stream.drain()
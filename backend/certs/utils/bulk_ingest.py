@@ -0,0 +1,102 @@
+from django.conf import settings
+from django.db import transaction
+from cryptography import x509
+from certs.models import Certificate, CertificateHostname, UploadedFile, Website, extract_domain
+from .blob_store import acquire_blobs, content_hash
+from .certificate_hashing import hash_certificate
+from .create_certifiacte import build_certificate
+from .dashboard import invalidate_dashboard_snapshots
+
+
+def _store_certificate_files(cert_objs, user, suffix=".pem"):
+    """Point one UploadedFile per certificate at its content-addressed blob, writing only the
+    blobs that are not stored yet, and create the UploadedFile rows in one query.
+    Args:
+        cert_objs (list): List of x509.Certificate objects.
+        user (User): The user who uploaded the certificates.
+        suffix (str, optional): The file extension of newly written blobs. Defaults to ".pem".
+    Returns:
+        list: The created UploadedFile objects, in the same order as cert_objs.
+    """
+    contents = [cert_obj.public_bytes(encoding=settings.X509_ENCODING) for cert_obj in cert_objs]
+    # Keyed by the stored (PEM) bytes, not the cert_hash: a raw DER upload of the same
+    # certificate has the cert_hash as content hash and must stay a different blob.
+    hashes = [content_hash(content) for content in contents]
+    blobs = acquire_blobs(list(zip(hashes, contents)), suffix=suffix)
+    uploaded_files = []
+    for blob_hash in hashes:
+        uploaded_file = UploadedFile(uploaded_by=user, blob=blobs[blob_hash])
+        uploaded_file.file.name = blobs[blob_hash].file.name
+        uploaded_files.append(uploaded_file)
+    return UploadedFile.objects.bulk_create(uploaded_files)
+
+
+def bulk_create_certificates(entries, user, teams=None):
+    """Create many certificates with a fixed number of queries, independent of the batch size.
+    Certificates already stored (same cert_hash) are left untouched. New rows are written with
+    INSERT ... ON CONFLICT (cert_hash) DO NOTHING, followed by bulk inserts of the team, website
+    and hostname index rows, all in one transaction.
+    Args:
+        entries (list): Either x509.Certificate objects or dicts with the keys
+            "cert" (x509.Certificate) and the optional "name", "teams" and "urls".
+        user (User): The user who uploaded the certificates.
+        teams (list, optional): Team IDs used for entries that do not define their own "teams".
+    Returns:
+        list: (Certificate, created) tuples in input order, one per distinct certificate.
+    """
+    items = {}
+    for entry in entries:
+        if isinstance(entry, x509.Certificate):
+            entry = {"cert": entry}
+        cert_hash = hash_certificate(entry["cert"])
+        items.setdefault(cert_hash, entry)
+
+    if not items:
+        return []
+
+    with transaction.atomic():
+        existing = Certificate.objects.in_bulk(list(items), field_name="cert_hash")
+        new_hashes = [h for h in items if h not in existing]
+        new_entries = [items[h] for h in new_hashes]
+
+        uploaded_files = _store_certificate_files([e["cert"] for e in new_entries], user)
+        Certificate.objects.bulk_create(
+            [
+                build_certificate(e["cert"], uploaded_file, user, name_override=e.get("name"))
+                for e, uploaded_file in zip(new_entries, uploaded_files)
+            ],
+            ignore_conflicts=True,
+        )
+
+        stored = Certificate.objects.in_bulk(new_hashes, field_name="cert_hash")
+        created_file_ids = {f.id for f in uploaded_files}
+        created = {h for h, cert in stored.items() if cert.file_id in created_file_ids}
+
+        # Certificates inserted concurrently by another upload keep their own file.
+        orphaned_file_ids = created_file_ids - {stored[h].file_id for h in created}
+        if orphaned_file_ids:
+            UploadedFile.objects.filter(id__in=orphaned_file_ids).delete()
+
+        through = Certificate.access_teams.through
+        team_rows = []
+        websites = []
+        for cert_hash in new_hashes:
+            if cert_hash not in created:
+                continue
+            entry = items[cert_hash]
+            certificate = stored[cert_hash]
+            for tid in entry.get("teams", teams) or []:
+                team_rows.append(through(certificate_id=certificate.id, team_id=tid))
+            for url in entry.get("urls") or []:
+                websites.append(Website(url=url, domain=extract_domain(url), certificate=certificate))
+
+        through.objects.bulk_create(team_rows, ignore_conflicts=True)
+        Certificate.objects.filter(id__in={row.certificate_id for row in team_rows}).update(is_public=False)
+        Website.objects.bulk_create(websites)
+        CertificateHostname.objects.index((stored[h].id, stored[h].san) for h in created)
+
+        if created:
+            transaction.on_commit(invalidate_dashboard_snapshots)
+
+    existing.update(stored)
+    return [(existing[h], h in created) for h in items]
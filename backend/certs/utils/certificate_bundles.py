@@ -0,0 +1,50 @@
+from cryptography.hazmat.primitives.serialization import Encoding
+from certs.models import Certificate, CertificateBundle
+from .certificate_cache import certificate_cache
+from .chain_closure import get_certificate_chains
+
+
+def _bundle_for_chain(chain):
+    encoded = [certificate_cache.get(c) for c in chain]
+    pems = [cert_obj.public_bytes(Encoding.PEM) for cert_obj, _ in encoded]
+    return CertificateBundle(
+        certificate_id=chain[0].id,
+        leaf_pem=pems[0],
+        chain_pem=b"".join(pems[1:]),
+        fullchain_pem=b"".join(pems),
+        leaf_der=encoded[0][1],
+        fullchain_der=b"".join(der for _, der in encoded),
+    )
+
+
+def build_certificate_bundles(certificate_ids):
+    """Precompute the export bundles of many certificates.
+    Chains are loaded with one closure-table query; bundles that already exist are kept.
+    Args:
+        certificate_ids (Iterable[int]): IDs of the certificates to build bundles for.
+    Returns:
+        dict: The CertificateBundle objects keyed by certificate id.
+    """
+    certificate_ids = list(certificate_ids)
+    chains = get_certificate_chains(certificate_ids)
+    missing = [cert_id for cert_id in certificate_ids if cert_id not in chains]
+    if missing:
+        for cert in Certificate.objects.filter(id__in=missing).select_related("file"):
+            chains[cert.id] = [cert]
+
+    bundles = {cert_id: _bundle_for_chain(chain) for cert_id, chain in chains.items()}
+    CertificateBundle.objects.bulk_create(list(bundles.values()), ignore_conflicts=True)
+    return bundles
+
+
+def get_certificate_bundle(certificate):
+    """Return the export bundle of a certificate, building it on first use.
+    Args:
+        certificate (Certificate): The certificate, ideally fetched with select_related("bundle").
+    Returns:
+        CertificateBundle: The leaf/chain/fullchain encodings.
+    """
+    try:
+        return certificate.bundle
+    except CertificateBundle.DoesNotExist:
+        return build_certificate_bundles([certificate.id])[certificate.id]
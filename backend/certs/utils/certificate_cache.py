@@ -0,0 +1,134 @@
+import logging
+import threading
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+from cryptography.hazmat.primitives.serialization import Encoding
+from .utils import load_certificate_from_bytes, read_fieldfile_bytes
+
+logger = logging.getLogger(__name__)
+
+SHARED_CACHE_ALIAS = "certificates"
+
+
+class CertificateCache:
+    """LRU cache of parsed certificates and their DER bytes, keyed by cert_hash.
+    The hash is the SHA-256 of the DER encoding, so entries never go stale and only need
+    to be evicted. When a "certificates" cache alias is configured, DER bytes are also
+    shared between processes through it.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def _shared(self):
+        if SHARED_CACHE_ALIAS not in settings.CACHES:
+            return None
+        return caches[SHARED_CACHE_ALIAS]
+
+    def _get_local(self, cert_hash):
+        with self._lock:
+            entry = self._entries.get(cert_hash)
+            if entry is not None:
+                self._entries.move_to_end(cert_hash)
+                self.hits += 1
+            return entry
+
+    def _put_local(self, cert_hash, entry):
+        with self._lock:
+            self._entries[cert_hash] = entry
+            self._entries.move_to_end(cert_hash)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _get_shared(self, cert_hash):
+        shared = self._shared()
+        if shared is None:
+            return None
+        try:
+            return shared.get(cert_hash)
+        except Exception as e:
+            logger.warning("Shared certificate cache unavailable: %s", e)
+            return None
+
+    def _put_shared(self, cert_hash, der):
+        shared = self._shared()
+        if shared is None:
+            return
+        try:
+            shared.set(cert_hash, der)
+        except Exception as e:
+            logger.warning("Shared certificate cache unavailable: %s", e)
+
+    def get(self, certificate):
+        """Return (x509.Certificate, DER bytes) for a Certificate model, loading it on a miss.
+        Args:
+            certificate (Certificate): The stored certificate.
+        Returns:
+            tuple: The parsed certificate and its DER encoding.
+        """
+        cert_hash = certificate.cert_hash
+        if cert_hash:
+            entry = self._get_local(cert_hash)
+            if entry is not None:
+                return entry
+
+            der = self._get_shared(cert_hash)
+            if der is not None:
+                entry = (load_certificate_from_bytes(der), der)
+                with self._lock:
+                    self.shared_hits += 1
+                self._put_local(cert_hash, entry)
+                return entry
+
+        with self._lock:
+            self.misses += 1
+        if certificate.der is not None:
+            der = bytes(certificate.der)
+            entry = (load_certificate_from_bytes(der), der)
+        else:
+            cert_obj = load_certificate_from_bytes(read_fieldfile_bytes(certificate.file.file))
+            entry = (cert_obj, cert_obj.public_bytes(Encoding.DER))
+        if cert_hash:
+            self._put_local(cert_hash, entry)
+            self._put_shared(cert_hash, entry[1])
+        return entry
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "max_size": self.max_entries,
+                "shared_tier": SHARED_CACHE_ALIAS in settings.CACHES,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.shared_hits = self.misses = 0
+
+
+certificate_cache = CertificateCache(settings.CERTIFICATE_CACHE_SIZE)
+
+
+def get_parsed_certificate(certificate):
+    """Return the parsed x509.Certificate of a stored certificate, from the cache when possible."""
+    return certificate_cache.get(certificate)[0]
+
+
+def get_certificate_der(certificate):
+    """Return the DER bytes of a stored certificate, from the cache when possible."""
+    return certificate_cache.get(certificate)[1]
+
+
+def certificate_cache_stats():
+    """Return the hit/miss counters of this process' certificate cache."""
+    return certificate_cache.stats()
@@ -37,4 +37,25 @@ def calculate_key_hash(private_key):
     )
     digest = hashes.Hash(hashes.SHA256())
     digest.update(key_bytes)
-    return digest.finalize().hex()
\ No newline at end of file
+    return digest.finalize().hex()
+def compute_subject_key_id(cert):
+    """
+    Return the Subject Key Identifier (hex) of the certificate, or None if the extension is missing.
+    """
+    try:
+        ext = cert.extensions.get_extension_for_class(x509.SubjectKeyIdentifier)
+    except x509.ExtensionNotFound:
+        return None
+    return ext.value.digest.hex()
+
+def compute_authority_key_id(cert):
+    """
+    Return the key identifier (hex) of the Authority Key Identifier extension, or None if absent.
+    """
+    try:
+        ext = cert.extensions.get_extension_for_class(x509.AuthorityKeyIdentifier)
+    except x509.ExtensionNotFound:
+        return None
+    if ext.value.key_identifier is None:
+        return None
+    return ext.value.key_identifier.hex()
@@ -0,0 +1,62 @@
+from certs.models import Certificate, CertificateClosure
+
+
+def refresh_chain_closure(certificate_ids):
+    """Recompute the closure rows of the given certificates and of their descendants.
+    Args:
+        certificate_ids (Iterable[int]): IDs of certificates that were created or whose parent changed.
+    """
+    CertificateClosure.objects.refresh(certificate_ids)
+
+
+def get_certificate_ancestors(certificate, include_self=True):
+    """Return the issuer chain of a certificate, ordered from the certificate up to the root.
+    Args:
+        certificate (Certificate): The certificate to start from.
+        include_self (bool, optional): Include the certificate itself as first element.
+    Returns:
+        QuerySet: Certificates ordered by their distance to the given certificate.
+    """
+    lookups = {"descendant_links__descendant_id": certificate.pk}
+    if not include_self:
+        lookups["descendant_links__depth__gt"] = 0
+    return Certificate.objects.filter(**lookups).order_by("descendant_links__depth")
+
+
+def get_certificate_descendants(certificate, include_self=False, leaves_only=False):
+    """Return every certificate issued directly or indirectly by the given certificate.
+    This answers "what is impacted if this CA is revoked" with a single indexed query.
+    Args:
+        certificate (Certificate): The CA certificate.
+        include_self (bool, optional): Include the certificate itself.
+        leaves_only (bool, optional): Only return certificates that have no children.
+    Returns:
+        QuerySet: Certificates ordered by their depth below the given certificate.
+    """
+    lookups = {"ancestor_links__ancestor_id": certificate.pk}
+    if not include_self:
+        lookups["ancestor_links__depth__gt"] = 0
+    queryset = Certificate.objects.filter(**lookups)
+    if leaves_only:
+        queryset = queryset.filter(p_certificate__isnull=True)
+    return queryset.order_by("ancestor_links__depth", "id")
+
+
+def get_certificate_chains(certificate_ids):
+    """Return the issuer chains of many certificates with a single query.
+    Args:
+        certificate_ids (Iterable[int]): IDs of the certificates to look up.
+    Returns:
+        dict: {certificate id: [Certificate, ...]} ordered from the certificate up to the root.
+        The certificate itself is always the first element.
+    """
+    chains = {}
+    links = (
+        CertificateClosure.objects
+        .filter(descendant_id__in=list(certificate_ids))
+        .select_related("ancestor__file")
+        .order_by("descendant_id", "depth")
+    )
+    for link in links:
+        chains.setdefault(link.descendant_id, []).append(link.ancestor)
+    return chains
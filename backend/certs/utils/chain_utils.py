@@ -2,8 +2,10 @@ from typing import List, Dict
 from cryptography import x509
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives.asymmetric import rsa
+from django.utils import timezone
 from certs.models import Certificate
 from certs.utils.certificate_hashing import hash_certificate
+from .chain_closure import refresh_chain_closure
 from cryptography.hazmat.primitives import serialization
 
 """def link_chain_by_hash(certificate: Certificate, chain_objs:List[Certificate])-> None:
@@ -39,17 +41,54 @@ from cryptography.hazmat.primitives import serialization
             if parent and parent != cert_obj:
                 cert_obj.chain.add(parent)"""
 
-def get_parent_certificate(issuer_hash):
+def key_ids_match(child, parent):
+    """Return 2 if the child's AKI equals the parent's SKI, 1 if it cannot be checked and 0 if they differ.
+    Args:
+        child (Certificate): The issued certificate.
+        parent (Certificate): The candidate issuer, whose subject already matches the child's issuer.
+    """
+    if not child.authority_key_id or not parent.subject_key_id:
+        return 1
+    return 2 if child.authority_key_id == parent.subject_key_id else 0
+
+def pick_parent(child, candidates):
+    """Pick the issuer of a certificate among candidates with a matching subject.
+    An AKI→SKI match wins, candidates whose SKI contradicts the AKI are rejected and the
+    remaining ones are taken in candidate order.
+    Args:
+        child (Certificate): The issued certificate.
+        candidates (list): Certificates whose subject_hash equals the child's issuer_hash.
+    Returns:
+        Certificate: The best parent, or None if no candidate fits.
+    """
+    best, best_score = None, 0
+    for candidate in candidates:
+        if candidate.id == child.id:
+            continue
+        score = key_ids_match(child, candidate)
+        if score > best_score:
+            best, best_score = candidate, score
+            if score == 2:
+                break
+    return best
+
+def get_parent_certificate(issuer_hash, authority_key_id=None):
     """Retrieve the parent certificate based on the issuer hash.
+    When the child's Authority Key Identifier is known, a parent with the matching Subject
+    Key Identifier is returned, which tells apart several generations of the same CA name.
     Args:
         issuer_hash (str): The hash of the issuer's subject.
+        authority_key_id (str, optional): The hex key identifier from the child's AKI extension.
     Returns:       
         Certificate: The parent certificate if found, otherwise None.
     """
-    matching_parent = Certificate.objects.filter(subject_hash=issuer_hash).first()
-    if matching_parent:
-        return matching_parent
-    return None
+    candidates = Certificate.objects.filter(subject_hash=issuer_hash)
+    if authority_key_id:
+        matching_parent = candidates.filter(subject_key_id=authority_key_id).first()
+        if matching_parent:
+            return matching_parent
+        candidates = candidates.filter(subject_key_id__isnull=True)
+    return candidates.first()
 
 def get_children_item(subject_hash):
     """Retrieve the child certificates based on the subject hash.
@@ -63,32 +102,78 @@ def get_children_item(subject_hash):
         return children
     return None
 
-def certificate_relationship(cert_type,certificate,issuer_hash,subject_hash):
-    """Establish the parent-child relationship between certificates based on their hashes.
+def resolve_certificate_chains(certificates):
+    """Link a batch of certificates to their parents and orphaned children in memory.
+    Candidate parents and children for the whole batch are loaded with two queries keyed on
+    subject_hash/issuer_hash, the links are resolved in memory (preferring AKI→SKI matches)
+    and written back with one bulk_update and one bulk insert into the children through table.
     Args:
-        cert_type (str): The type of the certificate (e.g., "RootCA", "IntermediateCA", "EndEntity").
-        certificate (Certificate): The certificate object to be processed.
-        issuer_hash (str): The hash of the issuer's distinguished name.
-        subject_hash (str): The hash of the subject's distinguished name.
+        certificates (list): The saved Certificate objects to link.
+    Returns:
+        list: The certificates whose parent changed.
     """
+    batch = {cert.id: cert for cert in certificates if cert.pk}
+    if not batch:
+        return []
 
-    if cert_type == "RootCA":
-        certificate.parent = None
-        certificate.save()
-    else:
-        parent_cert = get_parent_certificate(issuer_hash)
-
-        if parent_cert:
-                certificate.parent = parent_cert
-                parent_cert.children.add(certificate)
-                parent_cert.save()
-        certificate.save()
-    
-    children = get_children_item(subject_hash)
-    if children:
-        for child in children:
-            if child != certificate:
-                child.parent = certificate
-                child.save()
-                certificate.children.add(child)
-        certificate.save()
\ No newline at end of file
+    issuer_hashes = {
+        cert.issuer_hash for cert in batch.values()
+        if cert.issuer_hash and cert.certificate_type != "RootCA"
+    }
+    subject_hashes = {cert.subject_hash for cert in batch.values() if cert.subject_hash}
+
+    parent_candidates = {}
+    for candidate in Certificate.objects.filter(subject_hash__in=issuer_hashes).order_by("id"):
+        parent_candidates.setdefault(candidate.subject_hash, []).append(batch.get(candidate.id, candidate))
+
+    updated = {}
+    links = set()
+
+    for cert in batch.values():
+        if cert.certificate_type == "RootCA":
+            if cert.parent_id is not None:
+                cert.parent = None
+                updated[cert.id] = cert
+            continue
+
+        parent = pick_parent(cert, parent_candidates.get(cert.issuer_hash, []))
+        if parent:
+            if cert.parent_id != parent.id:
+                cert.parent = parent
+                updated[cert.id] = cert
+            links.add((parent.id, cert.id))
+
+    batch_by_subject = {}
+    for cert in sorted(batch.values(), key=lambda c: c.id):
+        batch_by_subject.setdefault(cert.subject_hash, []).append(cert)
+
+    orphans = (
+        Certificate.objects
+        .filter(issuer_hash__in=subject_hashes, parent__isnull=True)
+        .exclude(certificate_type="RootCA")
+        .order_by("id")
+    )
+    for child in orphans:
+        child = batch.get(child.id, child)
+        if child.parent_id is not None:
+            continue
+        parent = pick_parent(child, batch_by_subject.get(child.issuer_hash, []))
+        if parent:
+            child.parent = parent
+            updated[child.id] = child
+            links.add((parent.id, child.id))
+
+    if updated:
+        Certificate.objects.bulk_update(list(updated.values()), ["parent"])
+    if links:
+        through = Certificate.children.through
+        through.objects.bulk_create(
+            [through(from_certificate_id=parent_id, to_certificate_id=child_id) for parent_id, child_id in links],
+            ignore_conflicts=True,
+        )
+        # The children list is part of the parent's representation (detail ETag, list versions).
+        Certificate.objects.filter(id__in={parent_id for parent_id, _ in links}).update(updated_at=timezone.now())
+
+    refresh_chain_closure(set(batch) | set(updated))
+
+    return list(updated.values())
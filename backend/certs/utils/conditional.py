@@ -0,0 +1,160 @@
+import hashlib
+from functools import wraps
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from certs.models import Certificate
+from .access_utils import get_accessible_certificates, get_accessible_keys, user_can_access_certificate, user_team_ids
+from .dashboard import FORECAST_BUCKETS, MAX_DASHBOARD_DAYS, get_dashboard_summary, get_expiry_forecast, visibility_scope
+
+
+def _etag(*parts):
+    return hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()[:40]
+
+
+# Query parameters that must never end up hashed into a response header.
+_SECRET_PARAMS = {"pwd", "password"}
+
+
+def _query_string(request):
+    return "&".join(f"{key}={value}" for key, value in sorted(request.GET.items()) if key not in _SECRET_PARAMS)
+
+
+def conditional_view(version_func):
+    """Add strong ETag / Last-Modified handling to a GET handler.
+    version_func(request, *args, **kwargs) returns (etag, last_modified datetime or None), or
+    None when the resource has no version (not found, not accessible), in which case the view
+    runs normally. A matching If-None-Match / If-Modified-Since returns 304 before the view, and
+    therefore before any serializer or file work, is executed.
+    Works on APIView methods and on @api_view functions (apply it below @api_view).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            offset = 0 if hasattr(args[0], "META") else 1  # (request, ...) or (self, request, ...)
+            request = args[offset]
+            version = version_func(request, *args[offset + 1:], **kwargs)
+            if version is None:
+                return view(*args, **kwargs)
+
+            etag, last_modified = version
+            etag = quote_etag(etag)
+            timestamp = int(last_modified.timestamp()) if last_modified else None
+            response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+            if response is None:
+                response = view(*args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            response.headers.setdefault("ETag", etag)
+            if timestamp is not None:
+                response.headers.setdefault("Last-Modified", http_date(timestamp))
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
+
+
+def inventory_version(queryset, user):
+    """Return the (etag, last_modified) of the objects of a queryset as seen by one user.
+    The version changes with the number of objects, their latest updated_at and the user's teams.
+    last_modified alone misses deletions and objects leaving the user's scope, so it must not be
+    used as a validator on its own.
+    """
+    stats = queryset.order_by().values("id", "updated_at").aggregate(count=Count("id"), latest=Max("updated_at"))
+    team_ids = sorted(user_team_ids(user))
+    return _etag(stats["count"], stats["latest"], team_ids), stats["latest"]
+
+
+def certificate_list_version(request, *args, **kwargs):
+    etag, _ = inventory_version(get_accessible_certificates(request.user), request.user)
+    return _etag(etag, _query_string(request)), None
+
+
+def private_key_list_version(request, *args, **kwargs):
+    etag, _ = inventory_version(get_accessible_keys(request.user), request.user)
+    return _etag(etag, _query_string(request)), None
+
+
+def dashboard_version(request, *args, **kwargs):
+    """Dashboard figures also depend on the current time, so the version rolls over every hour."""
+    etag, _ = inventory_version(get_accessible_certificates(request.user), request.user)
+    hour = timezone.now().replace(minute=0, second=0, microsecond=0)
+    return _etag(etag, hour.isoformat(), _query_string(request)), None
+
+
+def dashboard_days(request, default=30):
+    try:
+        days = int(request.GET.get("days", default))
+    except ValueError:
+        days = default
+    return max(1, min(days, MAX_DASHBOARD_DAYS))
+
+
+def dashboard_summary_version(request, *args, **kwargs):
+    """The summary is served from a snapshot, so its version is the snapshot itself (no query on a hit)."""
+    summary = get_dashboard_summary(request.user, dashboard_days(request))
+    return _etag(visibility_scope(user_team_ids(request.user)), summary["days_selected"], summary["generated_at"]), None
+
+
+def expiry_forecast_params(request):
+    """Read the bucket / periods / team / issuer / type parameters of the expiry forecast.
+    Returns None for an unknown bucket."""
+    bucket = request.GET.get("bucket", "week")
+    if bucket not in FORECAST_BUCKETS:
+        return None
+    _, default, maximum = FORECAST_BUCKETS[bucket]
+    try:
+        periods = int(request.GET.get("periods", default))
+    except ValueError:
+        periods = default
+    try:
+        team = int(request.GET["team"]) if request.GET.get("team") else None
+    except ValueError:
+        team = None
+    return {
+        "bucket": bucket,
+        "periods": max(1, min(periods, maximum)),
+        "team": team,
+        "issuer": request.GET.get("issuer") or None,
+        "certificate_type": request.GET.get("type") or None,
+    }
+
+
+def expiry_forecast_version(request, *args, **kwargs):
+    """Like the summary, the forecast is cached, so its version costs no query on a hit."""
+    params = expiry_forecast_params(request)
+    if params is None:
+        return None
+    forecast = get_expiry_forecast(request.user, **params)
+    return _etag(visibility_scope(user_team_ids(request.user)), _query_string(request), forecast["generated_at"]), None
+
+
+def certificate_detail_version(request, cert_id, *args, **kwargs):
+    """The detail also lists the children, which are linked and deleted without touching
+    updated_at, so their count is part of the version along with chain_version (parent link)."""
+    row = Certificate.objects.filter(pk=cert_id).annotate(children_count=Count("children")).values(
+        "cert_hash", "chain_version", "updated_at", "children_count"
+    ).first()
+    if row is None or not user_can_access_certificate(Certificate(pk=cert_id), request.user):
+        return None
+    return _etag(row["cert_hash"], row["chain_version"], row["updated_at"], row["children_count"]), None
+
+
+def certificate_export_version(request, cert_id, *args, **kwargs):
+    """Exports only change with the certificate, its chain and (with key=true) its private key.
+    PFX archives are not byte-for-byte reproducible (random salt and IV), so they get no version."""
+    if request.GET.get("fmt", "pem").lower() == "pfx":
+        return None
+    row = Certificate.objects.filter(pk=cert_id).values(
+        "cert_hash", "chain_version", "updated_at", "private_key__key_hash", "private_key__updated_at"
+    ).first()
+    if row is None or not user_can_access_certificate(Certificate(pk=cert_id), request.user):
+        return None
+    parts = [row["cert_hash"], row["chain_version"], _query_string(request)]
+    last_modified = row["updated_at"]
+    if request.GET.get("key", "false").lower() == "true":
+        parts += [row["private_key__key_hash"], row["private_key__updated_at"]]
+        if row["private_key__updated_at"]:
+            last_modified = max(last_modified, row["private_key__updated_at"])
+    return _etag(*parts), last_modified
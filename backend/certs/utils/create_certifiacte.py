@@ -1,30 +1,30 @@
 from datetime import datetime
 
 import pytz
-from certs.models import Certificate, Team,Website
+from certs.models import Certificate, CertificateHostname, Team,Website
 from certs.utils import (
     extract_common_name,
     hash_certificate,
     compute_issuer_hash,
     compute_subject_hash,
+    compute_subject_key_id,
+    compute_authority_key_id,
     classify_certificate
 )
+from django.conf import settings
 from cryptography import x509
+from cryptography.hazmat.primitives.serialization import Encoding
 
-def create_certificate(cert_obj: x509.Certificate, uploaded_file, teams, user, name_override=None,urls=None) -> Certificate:
-    """Create a Certificate object from a cryptography x509.Certificate object.
+def build_certificate(cert_obj: x509.Certificate, uploaded_file, user, name_override=None) -> Certificate:
+    """Build an unsaved Certificate object from a cryptography x509.Certificate object.
     Args:
-        cert_obj (x509.Certificate): The certificate object to create from.             
-        uploaded_file (File): The file object containing the certificate.
-        teams (list): List of Team objects to associate with the certificate.
+        cert_obj (x509.Certificate): The certificate object to build from.
+        uploaded_file (UploadedFile): The stored file containing the certificate.
         user (User): The user who uploaded the certificate.
         name_override (str, optional): Optional name to override the common name extraction.
     Returns:
-        Certificate: The created Certificate object.
+        Certificate: The unsaved Certificate object.
     """
-    main_hash = hash_certificate(cert_obj)
-    issuer_hash = compute_issuer_hash(cert_obj)
-    subject_hash = compute_subject_hash(cert_obj)
     cert_type = classify_certificate(cert_obj)
     hex_serial = format(cert_obj.serial_number, 'x').upper()
 
@@ -36,7 +36,7 @@ def create_certificate(cert_obj: x509.Certificate, uploaded_file, teams, user, n
 
     cert_name = name_override or extract_common_name(cert_obj.subject)
 
-    certificate = Certificate.objects.create(
+    return Certificate(
         name=cert_name,
         subject=cert_obj.subject.rfc4514_string(),
         issuer=cert_obj.issuer.rfc4514_string(),
@@ -51,15 +51,33 @@ def create_certificate(cert_obj: x509.Certificate, uploaded_file, teams, user, n
         file=uploaded_file,
         file_format="PEM",  # could be passed as param too
         original_filename=uploaded_file.file.name,
-        cert_hash=main_hash,
-        issuer_hash=issuer_hash,
-        subject_hash=subject_hash,
+        cert_hash=hash_certificate(cert_obj),
+        issuer_hash=compute_issuer_hash(cert_obj),
+        subject_hash=compute_subject_hash(cert_obj),
+        subject_key_id=compute_subject_key_id(cert_obj),
+        authority_key_id=compute_authority_key_id(cert_obj),
         certificate_type=cert_type[:20],
+        der=cert_obj.public_bytes(Encoding.DER) if settings.INLINE_OBJECT_STORAGE else None,
         uploaded_by=user
     )
 
-    for tid in teams:
-        certificate.access_teams.add(tid)
+def create_certificate(cert_obj: x509.Certificate, uploaded_file, teams, user, name_override=None,urls=None) -> Certificate:
+    """Create a Certificate object from a cryptography x509.Certificate object.
+    Args:
+        cert_obj (x509.Certificate): The certificate object to create from.             
+        uploaded_file (File): The file object containing the certificate.
+        teams (list): List of Team objects to associate with the certificate.
+        user (User): The user who uploaded the certificate.
+        name_override (str, optional): Optional name to override the common name extraction.
+    Returns:
+        Certificate: The created Certificate object.
+    """
+    certificate = build_certificate(cert_obj, uploaded_file, user, name_override=name_override)
+    certificate.save(force_insert=True)
+    CertificateHostname.objects.index([(certificate.id, certificate.san)])
+
+    if teams:
+        certificate.access_teams.add(*teams)
 
     if urls:
         for url in urls:
@@ -4,6 +4,7 @@ import uuid
 from cryptography.hazmat.primitives import serialization
 from django.conf import settings
 import os
+from .blob_store import track_written_file
 from .certificate_hashing import calculate_key_hash
 
 def create_private_key(key_obj, bit_length ,user, teams, linked_certificate=None, original_name=None, file_format="PEM") -> PrivateKey:
@@ -28,10 +29,6 @@ def create_private_key(key_obj, bit_length ,user, teams, linked_certificate=None
         )
     )
 
-    # 📦 Save as uploaded file
-    filename = f"{uuid.uuid4()}_key.enc"
-    file_content = ContentFile(encrypted)
-    
     key_hash = calculate_key_hash(key_obj)
 
     # ✅ Create PrivateKey model and save encrypted file
@@ -43,10 +40,15 @@ def create_private_key(key_obj, bit_length ,user, teams, linked_certificate=None
         original_filename=original_name or "key",
         keysize=bit_length,
         key_hash = key_hash,
+        encrypted_key=encrypted if settings.INLINE_OBJECT_STORAGE else None,
     )
-    private_key.encrypted_key_file.save(filename, file_content)  # Will go to `keys/` folder
+    if not settings.INLINE_OBJECT_STORAGE:
+        # 📦 Save as uploaded file
+        filename = f"{uuid.uuid4()}_key.enc"
+        private_key.encrypted_key_file.save(filename, ContentFile(encrypted))  # Will go to `keys/` folder
+        track_written_file(private_key.encrypted_key_file.storage, private_key.encrypted_key_file.name)
 
-    for tid in teams:
-        private_key.access_teams.add(tid)
+    if teams:
+        private_key.access_teams.add(*teams)
 
     return private_key
@@ -1,17 +1,23 @@
-from django.core.files.base import ContentFile
 from certs.models import UploadedFile
-import uuid
+from .blob_store import acquire_blobs, atomic_storage, content_hash
 
-def create_uploaded_file(content: bytes, user, suffix=".pem") -> UploadedFile:
+def create_uploaded_file(content, user, suffix=".pem", original_filename=None) -> UploadedFile:
     """Create an UploadedFile object with the given content and user.
+    The bytes are stored in a content-addressed blob, so uploading the same content again
+    only adds a reference to the existing file. A File (such as a request upload) is hashed and
+    written chunk by chunk, and the blob file is removed again if the transaction rolls back.
     Args:
-        content (bytes): The content of the file to be uploaded.
+        content (bytes | File): The content of the file to be uploaded.
         user (User): The user who is uploading the file.
         suffix (str, optional): The file extension to use. Defaults to ".pem".  
+        original_filename (str, optional): The name of the file on the client.
     Returns:
         UploadedFile: The created UploadedFile object.
     """
-    filename = f"{uuid.uuid4()}{suffix}"
-    uploaded_file = UploadedFile.objects.create(uploaded_by=user)
-    uploaded_file.file.save(filename, ContentFile(content))
-    return uploaded_file
\ No newline at end of file
+    blob_hash = content_hash(content)
+    with atomic_storage():
+        blob = acquire_blobs([(blob_hash, content)], suffix=suffix)[blob_hash]
+        uploaded_file = UploadedFile(uploaded_by=user, blob=blob, original_filename=original_filename)
+        uploaded_file.file.name = blob.file.name
+        uploaded_file.save()
+    return uploaded_file
@@ -0,0 +1,227 @@
+import hashlib
+import time
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Exists, OuterRef, Q
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+from certs.models import Certificate, CustomUser, Team
+from .access_utils import get_certificates_visible_to_teams, user_team_ids
+
+CERTIFICATE_TYPES = [value for value, _ in Certificate._meta.get_field("certificate_type").choices]
+MAX_DASHBOARD_DAYS = 365
+
+# bucket -> (date_trunc function, default number of buckets, maximum number of buckets)
+FORECAST_BUCKETS = {
+    "week": (TruncWeek, 52, 104),
+    "month": (TruncMonth, 12, 24),
+}
+
+_GENERATION_KEY = "dashboard:generation"
+
+
+def _cache():
+    """The dashboard cache shared by every process (Redis by default). Without it, snapshots
+    fall back to the process-local default cache and only expire with their timeout."""
+    return caches["dashboard" if "dashboard" in settings.CACHES else "default"]
+
+
+def visibility_scope(team_ids):
+    """Cache key part shared by every user with the same teams (they see the same certificates)."""
+    return ",".join(str(team_id) for team_id in sorted(set(team_ids))) or "public"
+
+
+def _generation():
+    cache = _cache()
+    generation = cache.get(_GENERATION_KEY)
+    if generation is None:
+        # Start from the clock so that a lost counter never reuses the keys of older snapshots.
+        cache.add(_GENERATION_KEY, time.time_ns(), None)
+        generation = cache.get(_GENERATION_KEY)
+    return generation
+
+
+def invalidate_dashboard_snapshots():
+    """Make every cached dashboard snapshot stale. Called after certificate writes commit."""
+    cache = _cache()
+    try:
+        cache.incr(_GENERATION_KEY)
+    except ValueError:
+        cache.set(_GENERATION_KEY, time.time_ns(), None)
+
+
+def compute_dashboard_summary(team_ids, days):
+    """Compute the dashboard figures of a visibility scope with one aggregate query.
+    Args:
+        team_ids (Iterable[int]): The teams defining the scope (public certificates are always included).
+        days (int): Window of the "expiring soon" counts.
+    Returns:
+        dict: Totals, expired / valid / expiring counts and their per-type and per-team breakdowns.
+    """
+    team_ids = sorted(set(team_ids))
+    now = timezone.now()
+    expiring = Q(is_expired=False, not_after__gt=now, not_after__lte=now + timedelta(days=days))
+    through = Certificate.access_teams.through
+
+    aggregates = {
+        "total": Count("id"),
+        "expired": Count("id", filter=Q(is_expired=True)),
+        "valid": Count("id", filter=Q(is_expired=False)),
+        "expiring": Count("id", filter=expiring),
+        "public": Count("id", filter=Q(is_public=True)),
+        "type_unknown": Count("id", filter=Q(certificate_type__isnull=True)),
+    }
+    for index, certificate_type in enumerate(CERTIFICATE_TYPES):
+        aggregates[f"type_{index}"] = Count("id", filter=Q(certificate_type=certificate_type))
+    for team_id in team_ids:
+        in_team = Q(Exists(through.objects.filter(certificate_id=OuterRef("pk"), team_id=team_id)))
+        aggregates[f"team_{team_id}"] = Count("id", filter=in_team)
+        aggregates[f"team_{team_id}_expired"] = Count("id", filter=in_team & Q(is_expired=True))
+        aggregates[f"team_{team_id}_expiring"] = Count("id", filter=in_team & expiring)
+
+    row = get_certificates_visible_to_teams(team_ids).aggregate(**aggregates)
+    team_names = dict(Team.objects.filter(id__in=team_ids).values_list("id", "name")) if team_ids else {}
+
+    by_type = {certificate_type: row[f"type_{index}"] for index, certificate_type in enumerate(CERTIFICATE_TYPES)}
+    by_type["unknown"] = row["type_unknown"]
+    return {
+        "generated_at": now.isoformat(),
+        "days_selected": days,
+        "total_certificates": row["total"],
+        "expired_certificates": row["expired"],
+        "valid_certificates": row["valid"],
+        "expiring_soon_certificates": row["expiring"],
+        "public_certificates": row["public"],
+        "by_type": by_type,
+        "by_team": [
+            {
+                "id": team_id,
+                "name": team_names[team_id],
+                "total_certificates": row[f"team_{team_id}"],
+                "expired_certificates": row[f"team_{team_id}_expired"],
+                "expiring_soon_certificates": row[f"team_{team_id}_expiring"],
+            }
+            for team_id in team_ids
+            if team_id in team_names
+        ],
+    }
+
+
+def _snapshot_key(scope, days):
+    return f"dashboard:{_generation()}:{scope}:{days}"
+
+
+def get_dashboard_summary(user, days):
+    """Return the dashboard snapshot of the user's visibility scope, computing it on a cache miss.
+    Snapshots are shared by the users with the same teams, dropped on certificate writes
+    (invalidate_dashboard_snapshots, seen by every process with the shared cache) and kept at most DASHBOARD_SNAPSHOT_TIMEOUT seconds, since
+    the expired / expiring counts also move with time.
+    """
+    team_ids = user_team_ids(user)
+    key = _snapshot_key(visibility_scope(team_ids), days)
+    cache = _cache()
+    summary = cache.get(key)
+    if summary is None:
+        summary = compute_dashboard_summary(team_ids, days)
+        cache.set(key, summary, settings.DASHBOARD_SNAPSHOT_TIMEOUT)
+    return summary
+
+
+def refresh_dashboard_snapshots(days_options=None):
+    """Recompute the snapshots of every visibility scope in use (the team sets of active users).
+    Returns:
+        int: The number of snapshots written.
+    """
+    days_options = days_options or settings.DASHBOARD_SNAPSHOT_DAYS
+    teams_by_user = {user_id: [] for user_id in CustomUser.objects.filter(is_active=True).values_list("id", flat=True)}
+    for user_id, team_id in Team.members.through.objects.filter(customuser__is_active=True).values_list(
+        "customuser_id", "team_id"
+    ):
+        teams_by_user[user_id].append(team_id)
+    scopes = {visibility_scope(team_ids): team_ids for team_ids in teams_by_user.values()}
+
+    cache = _cache()
+    for scope, team_ids in scopes.items():
+        for days in days_options:
+            cache.set(_snapshot_key(scope, days), compute_dashboard_summary(team_ids, days), settings.DASHBOARD_SNAPSHOT_TIMEOUT)
+    return len(scopes) * len(days_options)
+
+
+def _bucket_start(moment, bucket):
+    """Start of the week (Monday) or month containing `moment`, in the current time zone."""
+    day = timezone.localtime(moment).date()
+    if bucket == "week":
+        day -= timedelta(days=day.weekday())
+    else:
+        day = day.replace(day=1)
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+
+def _next_bucket(start, bucket):
+    if bucket == "week":
+        return start + timedelta(days=7)
+    month = start.month % 12 + 1
+    return start.replace(year=start.year + (month == 1), month=month)
+
+
+def compute_expiry_forecast(queryset, bucket, periods):
+    """Count the certificates of a queryset expiring in each of the next `periods` buckets.
+    One GROUP BY date_trunc(bucket, not_after) query over the not_after range, which the
+    (not_after, id) index serves. The current bucket only counts certificates not expired yet.
+    Returns:
+        dict: {"bucket", "start", "counts": [one count per bucket, zeros included], "total", "generated_at"}
+    """
+    trunc = FORECAST_BUCKETS[bucket][0]
+    now = timezone.now()
+    starts = [_bucket_start(now, bucket)]
+    for _ in range(periods):
+        starts.append(_next_bucket(starts[-1], bucket))
+
+    rows = (
+        queryset.filter(not_after__gte=now, not_after__lt=starts[-1])
+        .annotate(period=trunc("not_after"))
+        .order_by()
+        .values("period")
+        .annotate(count=Count("id"))
+        .values_list("period", "count")
+    )
+    counts = {timezone.localtime(period).date(): count for period, count in rows}
+    series = [counts.get(timezone.localtime(start).date(), 0) for start in starts[:-1]]
+    return {
+        "bucket": bucket,
+        "start": starts[0].date().isoformat(),
+        "counts": series,
+        "total": sum(series),
+        "generated_at": now.isoformat(),
+    }
+
+
+def get_expiry_forecast(user, bucket="week", periods=None, team=None, issuer=None, certificate_type=None):
+    """Return the expiry forecast of the certificates accessible to the user, optionally filtered.
+    The series is cached per visibility scope and filters for DASHBOARD_SNAPSHOT_TIMEOUT seconds,
+    like the summary (the current bucket loses the certificates expiring meanwhile), and never
+    past the next bucket boundary, when the buckets shift. Certificate writes drop it earlier.
+    """
+    periods = periods or FORECAST_BUCKETS[bucket][1]
+    team_ids = user_team_ids(user)
+    filters = "|".join(str(value or "") for value in (team, issuer, certificate_type))
+    key = _snapshot_key(
+        visibility_scope(team_ids),
+        f"forecast:{bucket}:{periods}:{hashlib.sha256(filters.encode()).hexdigest()[:16]}",
+    )
+    cache = _cache()
+    forecast = cache.get(key)
+    if forecast is None:
+        queryset = get_certificates_visible_to_teams(team_ids)
+        if team:
+            queryset = queryset.filter(access_teams__id=team)
+        if issuer:
+            queryset = queryset.filter(issuer__icontains=issuer)
+        if certificate_type:
+            queryset = queryset.filter(certificate_type=certificate_type)
+        forecast = compute_expiry_forecast(queryset, bucket, periods)
+        next_boundary = _next_bucket(_bucket_start(timezone.now(), bucket), bucket)
+        timeout = min(settings.DASHBOARD_SNAPSHOT_TIMEOUT, (next_boundary - timezone.now()).total_seconds())
+        cache.set(key, forecast, max(1, int(timeout)))
+    return forecast
@@ -0,0 +1,162 @@
+SNIFF_SIZE = 512
+# Text files without armor in their head are scanned further in chunks of this size, since
+# PEM bundles may start with a long comment preamble (curl/Mozilla cacert.pem: ~1 KB).
+PEM_SCAN_CHUNK = 64 * 1024
+# The scan stops after this many bytes, larger files without armor fall back to their extension.
+PEM_SCAN_LIMIT = 4 * 1024 * 1024
+
+_PEM_BEGIN = b"-----BEGIN "
+_WHITESPACE = b" \t\r\n"
+_UTF8_BOM = b"\xef\xbb\xbf"
+
+# DER tags
+_SEQUENCE = 0x30
+_INTEGER = 0x02
+_OCTET_STRING = 0x04
+_OID = 0x06
+_EXPLICIT_0 = 0xA0
+
+# Former extension-based detection, used when the content is not recognised.
+_EXTENSION_FORMATS = {"p12": "PKCS12", "pfx": "PKCS12", "pem": "PEM", "crt": "CRT", "cer": "CRT", "key": "KEY"}
+
+# 1.2.840.113549.1.7 (PKCS#7 content types used as PFX authSafe)
+_PKCS7_OID_PREFIX = bytes.fromhex("2a864886f70d0107")
+
+
+def _read_header(data, offset):
+    """Read the DER tag and length at offset.
+    Returns:
+        tuple: (tag, content_offset, content_length) with content_length None for the
+        BER indefinite form, or None if the header is truncated or invalid.
+    """
+    if offset + 2 > len(data):
+        return None
+    tag = data[offset]
+    first = data[offset + 1]
+    if first < 0x80:
+        return tag, offset + 2, first
+    num_bytes = first & 0x7F
+    if num_bytes == 0:
+        return tag, offset + 2, None
+    if num_bytes > 4 or offset + 2 + num_bytes > len(data):
+        return None
+    length = int.from_bytes(data[offset + 2:offset + 2 + num_bytes], "big")
+    return tag, offset + 2 + num_bytes, length
+
+
+def _small_integer(data, header):
+    tag, start, length = header
+    if tag != _INTEGER or not length or length > 2 or start + length > len(data):
+        return None
+    return int.from_bytes(data[start:start + length], "big")
+
+
+def sniff_der_format(data):
+    """Classify the start of a DER/BER blob by its ASN.1 structure.
+    Args:
+        data (bytes): The first bytes of the file.
+    Returns:
+        str: "CRT" for an X.509 certificate, "KEY" for a PKCS#8, PKCS#1 or SEC1 private key,
+        "PKCS12" for a PFX archive, or "UNKNOWN".
+    """
+    outer = _read_header(data, 0)
+    if not outer or outer[0] != _SEQUENCE:
+        return "UNKNOWN"
+
+    first = _read_header(data, outer[1])
+    if not first:
+        return "UNKNOWN"
+
+    if first[0] == _SEQUENCE:
+        inner = _read_header(data, first[1])
+        if not inner:
+            return "UNKNOWN"
+        # Certificate ::= SEQUENCE { tbsCertificate SEQUENCE { [0] version | serial INTEGER ...
+        if inner[0] in (_EXPLICIT_0, _INTEGER):
+            return "CRT"
+        # EncryptedPrivateKeyInfo ::= SEQUENCE { AlgorithmIdentifier SEQUENCE { OID ...
+        if inner[0] == _OID:
+            return "KEY"
+        return "UNKNOWN"
+
+    version = _small_integer(data, first)
+    if version is None or first[2] is None:
+        return "UNKNOWN"
+    second = _read_header(data, first[1] + first[2])
+    if not second:
+        return "UNKNOWN"
+
+    # PFX ::= SEQUENCE { version INTEGER (3), authSafe ContentInfo SEQUENCE { OID pkcs7-* ...
+    if version == 3 and second[0] == _SEQUENCE:
+        oid = _read_header(data, second[1])
+        if oid and oid[0] == _OID and data[oid[1]:oid[1] + len(_PKCS7_OID_PREFIX)] == _PKCS7_OID_PREFIX:
+            return "PKCS12"
+        return "UNKNOWN"
+
+    # PrivateKeyInfo ::= SEQUENCE { version (0|1), AlgorithmIdentifier SEQUENCE, ...
+    # RSAPrivateKey ::= SEQUENCE { version (0), modulus INTEGER, ...
+    # ECPrivateKey ::= SEQUENCE { version (1), privateKey OCTET STRING, ...
+    if version in (0, 1) and second[0] in (_SEQUENCE, _INTEGER, _OCTET_STRING):
+        return "KEY"
+    return "UNKNOWN"
+
+
+def sniff_format(head):
+    """Detect the format of a certificate or key file from its first bytes.
+    The armor of PEM files with a preamble longer than head is not seen, detect_file_format
+    scans the rest of the file in that case.
+    Args:
+        head (bytes): The first bytes of the file (SNIFF_SIZE is enough).
+    Returns:
+        str: "PEM", "CRT", "KEY", "PKCS12" or "UNKNOWN".
+    """
+    data = head[len(_UTF8_BOM):] if head.startswith(_UTF8_BOM) else head
+    stripped = data.lstrip(_WHITESPACE)
+    if not stripped:
+        return "UNKNOWN"
+    if stripped[0] == _SEQUENCE:
+        return sniff_der_format(stripped)
+    # PEM bundles may start with a text preamble (e.g. Mozilla trust store comments).
+    if _PEM_BEGIN in data:
+        return "PEM"
+    return "UNKNOWN"
+
+
+def _contains_pem_armor(uploaded_file):
+    """Scan the first PEM_SCAN_LIMIT bytes in PEM_SCAN_CHUNK chunks for a PEM armor line."""
+    uploaded_file.seek(0)
+    tail = b""
+    scanned = 0
+    while scanned < PEM_SCAN_LIMIT:
+        chunk = uploaded_file.read(min(PEM_SCAN_CHUNK, PEM_SCAN_LIMIT - scanned))
+        if not chunk:
+            return False
+        scanned += len(chunk)
+        if _PEM_BEGIN in tail + chunk:
+            return True
+        # Keep enough of the previous chunk to find a marker split across two reads.
+        tail = chunk[-(len(_PEM_BEGIN) - 1):]
+    return False
+
+
+def detect_file_format(uploaded_file):
+    """Detect the format of the uploaded file from its content.
+    Only the first SNIFF_SIZE bytes are read for DER files and PEM files with a short
+    preamble; other files are scanned for PEM armor up to PEM_SCAN_LIMIT. The file is rewound
+    afterwards, so the extension no longer matters (a DER file named .pem or a bundle named
+    .txt both work). It is only used as a fallback when the content is not recognised.
+    Args:
+        uploaded_file (UploadedFile): The uploaded file object.
+    Returns:
+        str: The format of the file ("PKCS12", "PEM", "CRT", "KEY", or "UNKNOWN").
+    """
+    uploaded_file.seek(0)
+    head = uploaded_file.read(SNIFF_SIZE)
+    detected = sniff_format(head)
+    if detected == "UNKNOWN" and len(head) == SNIFF_SIZE and _contains_pem_armor(uploaded_file):
+        detected = "PEM"
+    uploaded_file.seek(0)
+    if detected == "UNKNOWN" and head:
+        extension = (getattr(uploaded_file, "name", None) or "").lower().rsplit(".", 1)[-1]
+        detected = _EXTENSION_FORMATS.get(extension, "UNKNOWN")
+    return detected
@@ -0,0 +1,89 @@
+import re
+from urllib.parse import urlparse
+from django.db.models import Q
+from certs.models import Certificate, CertificateHostname, Website
+from .access_utils import certificate_access_filter
+
+
+def find_covering_certificates(hostnames, queryset=None):
+    """Return the certificates whose SAN covers each hostname, exact matches first.
+    The hostnames are resolved with one index-only query on CertificateHostname, then the
+    matching certificates are loaded with one more query.
+    Args:
+        hostnames (Iterable[str]): Hostnames such as "api.eu.example.com".
+        queryset (QuerySet, optional): Restrict the results, e.g. get_accessible_certificates(user).
+    Returns:
+        dict: {hostname: [(Certificate, "exact" | "wildcard"), ...]}, newest certificates first
+        within each match type.
+    """
+    matches = CertificateHostname.objects.covering(hostnames)
+    certificate_ids = {certificate_id for found in matches.values() for certificate_id, _ in found}
+    queryset = Certificate.objects.all() if queryset is None else queryset
+    certificates = {cert.id: cert for cert in queryset.filter(id__in=certificate_ids)} if certificate_ids else {}
+
+    results = {}
+    for hostname, found in matches.items():
+        covering = [
+            (certificates[certificate_id], "wildcard" if wildcard else "exact")
+            for certificate_id, wildcard in found
+            if certificate_id in certificates
+        ]
+        covering.sort(key=lambda item: (item[1] != "exact", -item[0].not_after.timestamp()))
+        results[hostname] = covering
+    return results
+
+
+def _website_hostname(website):
+    return (urlparse(website.url).hostname or "").rstrip(".").lower()
+
+
+def _strip_www(name):
+    return name[4:] if name.startswith("www.") else name
+
+
+def _domain_pattern(names):
+    """Regex matching the Website.domain values (host without "www.", optional port) that SAN
+    names may cover. It preselects candidate websites, the hostname index decides."""
+    alternatives = set()
+    for name in names:
+        name = name.strip().rstrip(".").lower()
+        if name.startswith("*."):
+            alternatives.add(r"([^.:]+\.)?" + re.escape(name[2:]))
+        elif name:
+            alternatives.add(re.escape(_strip_www(name)))
+    if not alternatives:
+        return None
+    return r"^(" + "|".join(sorted(alternatives)) + r")(:[0-9]+)?$"
+
+
+def suggest_websites(certificates, user=None):
+    """Suggest existing websites to associate with newly imported certificates.
+    A website is suggested when its host is covered by the SAN of the certificate (checked with
+    the hostname index) and it is not attached to that certificate yet, typically websites still
+    pointing to the certificate being renewed.
+    Args:
+        certificates (Iterable[Certificate]): The imported certificates.
+        user (User, optional): Only suggest websites whose current certificate the user can access.
+    Returns:
+        dict: {certificate_id: [Website, ...]}
+    """
+    certificates = {cert.id: cert for cert in certificates if cert.san}
+    pattern = _domain_pattern([name for cert in certificates.values() for name in cert.san])
+    if pattern is None:
+        return {}
+
+    websites = Website.objects.filter(domain__iregex=pattern)
+    if user is not None:
+        websites = websites.filter(Q(certificate__isnull=True) | certificate_access_filter(user, field="certificate"))
+    websites = list(websites.select_related("certificate"))
+
+    hostnames = {website.id: _website_hostname(website) for website in websites}
+    covering = CertificateHostname.objects.covering(set(hostnames.values()))
+
+    suggestions = {}
+    for website in websites:
+        certificate_ids = {certificate_id for certificate_id, _ in covering.get(hostnames[website.id], [])}
+        for certificate_id in sorted(certificate_ids & certificates.keys()):
+            if website.certificate_id != certificate_id:
+                suggestions.setdefault(certificate_id, []).append(website)
+    return suggestions
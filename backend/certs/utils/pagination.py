@@ -0,0 +1,65 @@
+import base64
+import json
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _encode_cursor(value, pk):
+    raw = json.dumps([value.isoformat(), pk]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, pk = json.loads(raw)
+        value = parse_datetime(value)
+        if value is None:
+            raise ValueError
+        return value, int(pk)
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor.")
+
+
+def _page_size(request):
+    try:
+        size = int(request.query_params.get("limit", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise InvalidCursor("limit must be an integer.")
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def paginate_keyset(queryset, request, field):
+    """Return one page of a queryset ordered by (field, id), continuing after ?cursor=.
+    The position is the last (field, id) pair of the previous page, so every page is a single
+    indexed range scan whatever the depth, and rows inserted meanwhile are neither skipped nor
+    repeated. The field must be a non-null datetime.
+    Args:
+        queryset (QuerySet): The objects to paginate.
+        request (Request): The request carrying the optional ?cursor= and ?limit= parameters.
+        field (str): The datetime field leading the ordering (e.g. "not_after").
+    Returns:
+        tuple: (list of objects of the page, cursor of the next page or None)
+    Raises:
+        InvalidCursor: If ?cursor= or ?limit= cannot be decoded.
+    """
+    size = _page_size(request)
+    cursor = request.query_params.get("cursor")
+    if cursor:
+        value, pk = _decode_cursor(cursor)
+        queryset = queryset.filter(Q(**{f"{field}__gt": value}) | Q(**{field: value, "id__gt": pk}))
+
+    page = list(queryset.order_by(field, "id")[:size + 1])
+    next_cursor = None
+    if len(page) > size:
+        page = page[:size]
+        last = page[-1]
+        next_cursor = _encode_cursor(getattr(last, field), last.id)
+    return page, next_cursor
@@ -0,0 +1,199 @@
+from itertools import chain
+from cryptography import x509
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives.serialization import load_pem_private_key, load_der_private_key
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+MAX_BLOCK_SIZE = 1024 * 1024
+
+_BEGIN = b"-----BEGIN "
+_DASHES = b"-----"
+_MAX_LABEL_LENGTH = 64
+_WHITESPACE = b" \t\r\n"
+
+
+def iter_file_chunks(file, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Read an uploaded file in fixed-size chunks without loading it whole.
+    Args:
+        file (File): A Django File/UploadedFile/FieldFile or any binary file-like object.
+        chunk_size (int, optional): The number of bytes to read per chunk.
+    Yields:
+        bytes: The next chunk of the file.
+    """
+    if hasattr(file, "chunks"):
+        yield from file.chunks(chunk_size)
+        return
+
+    if hasattr(file, "seek"):
+        file.seek(0)
+    while True:
+        data = file.read(chunk_size)
+        if not data:
+            break
+        yield data
+
+
+def iter_pem_blocks(chunks, max_block_size=MAX_BLOCK_SIZE, skip_unterminated=False):
+    """Scan a stream of bytes for PEM armored blocks.
+    Only the block currently being assembled is buffered, so memory use does not
+    depend on the number of blocks in the stream.
+    Args:
+        chunks (Iterable[bytes]): The byte chunks of the stream.
+        max_block_size (int, optional): Maximum size of a single PEM block.
+        skip_unterminated (bool, optional): Drop a BEGIN line without its END line (followed
+            by another BEGIN line or by more than max_block_size bytes) and keep scanning.
+    Yields:
+        tuple: (label, block) where label is the PEM type (e.g. "CERTIFICATE")
+        and block is the armored block as bytes.
+    Raises:
+        ValueError: If a single block grows beyond max_block_size and skip_unterminated is not set.
+    """
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        while True:
+            start = buffer.find(_BEGIN)
+            if start == -1:
+                # Keep only what could be the beginning of a split BEGIN marker.
+                del buffer[:max(len(buffer) - len(_BEGIN) + 1, 0)]
+                break
+            if start:
+                del buffer[:start]
+
+            label_end = buffer.find(_DASHES, len(_BEGIN))
+            if label_end == -1 or label_end - len(_BEGIN) > _MAX_LABEL_LENGTH:
+                if label_end == -1 and len(buffer) <= len(_BEGIN) + _MAX_LABEL_LENGTH:
+                    break
+                # Not a real header, skip past this marker.
+                del buffer[:len(_BEGIN)]
+                continue
+
+            label = bytes(buffer[len(_BEGIN):label_end])
+            end_marker = b"-----END " + label + _DASHES
+            end = buffer.find(end_marker, label_end + len(_DASHES))
+            if skip_unterminated:
+                # Blocks do not nest: a BEGIN line before the END line starts the next block.
+                next_start = buffer.find(_BEGIN, label_end + len(_DASHES), None if end == -1 else end)
+                if next_start != -1:
+                    del buffer[:next_start]
+                    continue
+            if end == -1:
+                if len(buffer) > max_block_size:
+                    if not skip_unterminated:
+                        raise ValueError(f"PEM block exceeds {max_block_size} bytes.")
+                    del buffer[:len(_BEGIN)]
+                    continue
+                break
+
+            stop = end + len(end_marker)
+            yield label.decode("ascii", errors="replace"), bytes(buffer[:stop])
+            del buffer[:stop]
+
+
+def _der_length(buffer):
+    """Return the total length (header + content) of the DER object at the start of buffer,
+    or None if the header is not complete yet.
+    """
+    if len(buffer) < 2:
+        return None
+    first = buffer[1]
+    if first < 0x80:
+        return 2 + first
+    num_bytes = first & 0x7F
+    if num_bytes == 0 or num_bytes > 4:
+        raise ValueError("Unsupported DER length encoding.")
+    if len(buffer) < 2 + num_bytes:
+        return None
+    return 2 + num_bytes + int.from_bytes(buffer[2:2 + num_bytes], "big")
+
+
+def iter_der_blocks(chunks, max_block_size=MAX_BLOCK_SIZE):
+    """Scan a stream of concatenated DER SEQUENCE objects.
+    Args:
+        chunks (Iterable[bytes]): The byte chunks of the stream.
+        max_block_size (int, optional): Maximum size of a single DER object.
+    Yields:
+        bytes: The DER encoding of each top-level object.
+    Raises:
+        ValueError: If the stream does not contain DER SEQUENCEs or an object is too large.
+    """
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        while buffer:
+            if buffer[0] in _WHITESPACE:
+                del buffer[:len(buffer) - len(buffer.lstrip(_WHITESPACE))]
+                continue
+            if buffer[0] != 0x30:
+                raise ValueError("Data is not a DER encoded SEQUENCE.")
+            length = _der_length(buffer)
+            if length is None:
+                break
+            if length > max_block_size:
+                raise ValueError(f"DER object exceeds {max_block_size} bytes.")
+            if len(buffer) < length:
+                break
+            yield bytes(buffer[:length])
+            del buffer[:length]
+
+    if buffer.strip(_WHITESPACE):
+        raise ValueError("Truncated DER data.")
+
+
+def _load_pem_block(label, block, password):
+    if "PRIVATE KEY" in label:
+        return "key", load_pem_private_key(block, password=password, backend=default_backend())
+    if "CERTIFICATE" in label:
+        return "cert", x509.load_pem_x509_certificate(block, backend=default_backend())
+    return None
+
+
+def _load_der_block(block, password):
+    try:
+        return "cert", x509.load_der_x509_certificate(block, backend=default_backend())
+    except ValueError:
+        return "key", load_der_private_key(block, password=password, backend=default_backend())
+
+
+def iter_uploaded_objects(file, password=None, skip_invalid=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Stream certificates and private keys out of a PEM bundle or DER file.
+    The file is read chunk by chunk and each block is parsed as soon as it is complete,
+    so large trust bundles never have to be held in memory as a whole.
+    Args:
+        file (File): The uploaded file object.
+        password (bytes, optional): Password used to load encrypted private keys.
+        skip_invalid (bool, optional): Skip blocks that fail to parse instead of raising.
+        chunk_size (int, optional): The number of bytes to read per chunk.
+    Yields:
+        tuple: ("cert", x509.Certificate) or ("key", private key object).
+    """
+    chunks = iter_file_chunks(file, chunk_size)
+
+    head = b""
+    for chunk in chunks:
+        head += chunk
+        if head.lstrip(_WHITESPACE):
+            break
+    stripped = head.lstrip(_WHITESPACE)
+    if not stripped:
+        return
+
+    stream = chain([head], chunks)
+    if stripped[0] == 0x30:
+        for block in iter_der_blocks(stream):
+            try:
+                yield _load_der_block(block, password)
+            except Exception:
+                if not skip_invalid:
+                    raise
+        return
+
+    for label, block in iter_pem_blocks(stream, skip_unterminated=skip_invalid):
+        try:
+            loaded = _load_pem_block(label, block, password)
+        except Exception:
+            if not skip_invalid:
+                raise
+            continue
+        if loaded:
+            yield loaded
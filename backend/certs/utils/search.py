@@ -0,0 +1,61 @@
+import re
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import Case, FloatField, Q, Value, When
+from django.db.models.functions import Greatest
+
+# pg_trgm cannot use an index for fewer than 3 characters, shorter terms only match name prefixes
+MIN_TRIGRAM_LENGTH = 3
+
+
+def _san_candidates(term):
+    """SAN entries that cover a hostname: the name itself and the wildcard of its parent."""
+    candidates = [term]
+    if "." in term and not term.startswith("*."):
+        candidates.append("*." + term.split(".", 1)[1])
+    return candidates
+
+
+def search_certificates(queryset, term, autocomplete=False):
+    """Filter and rank certificates matching a search term.
+    Every condition is answered by the GIN indexes of Certificate: trigram (gin_trgm_ops) for
+    the case-insensitive regex and word-similarity matches on name/subject/issuer, and
+    jsonb_path_ops for SAN containment (exact hostname or covering wildcard).
+    With autocomplete, only names starting with the term (or one of its words) match and the
+    ranking favours the closest name.
+    Args:
+        queryset (QuerySet): The certificates to search, usually get_accessible_certificates(user).
+        term (str): The user input.
+        autocomplete (bool, optional): Prefix matching on the name only.
+    Returns:
+        QuerySet: Matching certificates annotated with `rank` and ordered by it.
+    """
+    term = term.strip()
+    pattern = re.escape(term)
+    name_rank = TrigramWordSimilarity(term, "name")
+    prefix_bonus = Case(
+        When(name__iexact=term, then=Value(1.0)),
+        When(name__iregex=f"^{pattern}", then=Value(0.5)),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+    if autocomplete or len(term) < MIN_TRIGRAM_LENGTH:
+        condition = Q(name__iregex=f"^{pattern}")
+        if len(term) >= MIN_TRIGRAM_LENGTH:
+            condition |= Q(name__iregex=rf"\m{pattern}")
+        return queryset.filter(condition).annotate(rank=name_rank + prefix_bonus).order_by("-rank", "name", "id")
+
+    san_match = Q()
+    for candidate in _san_candidates(term.lower()):
+        san_match |= Q(san__contains=[candidate])
+    condition = (
+        Q(name__iregex=pattern) | Q(subject__iregex=pattern) | Q(issuer__iregex=pattern)
+        | Q(name__trigram_word_similar=term) | Q(subject__trigram_word_similar=term)
+        | san_match
+    )
+    rank = Greatest(
+        name_rank,
+        TrigramWordSimilarity(term, "subject") * Value(0.8),
+        TrigramWordSimilarity(term, "issuer") * Value(0.5),
+    ) + prefix_bonus + Case(When(san_match, then=Value(1.0)), default=Value(0.0), output_field=FloatField())
+    return queryset.filter(condition).annotate(rank=rank).order_by("-rank", "not_after", "id")
@@ -0,0 +1,269 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from certs.crypto_pool import CryptoJobError, resource_limits
+from certs.models import Certificate, UploadJob
+from .blob_store import atomic_storage
+from .bulk_ingest import bulk_create_certificates
+from .certificate_bundles import build_certificate_bundles
+from .certificate_hashing import hash_certificate
+from .chain_utils import resolve_certificate_chains
+from .create_private_key import create_private_key
+from .hostname_coverage import suggest_websites
+from .parserCert import parse_uploaded_content
+from .upload_staging import load_upload_preview, discard_upload_preview
+
+UPLOAD_JOB_BATCH_SIZE = 200
+# Upper bound of a job's run time (see the process_upload_job task limits).
+UPLOAD_JOB_PROGRESS_TIMEOUT = 660
+
+# Payload entries only needed while the job runs.
+_TRANSIENT_PAYLOAD_KEYS = ("password", "key", "certs")
+
+
+def _encrypt(value):
+    return settings.FERNET.encrypt(value.encode()).decode() if value else None
+
+
+def _decrypt(value):
+    return settings.FERNET.decrypt(value.encode()).decode() if value else None
+
+
+def create_upload_job(user, kind, payload, uploaded_file=None):
+    """Create an UploadJob and queue it once the surrounding transaction commits.
+    Args:
+        user (User): The user who started the upload.
+        kind (str): UploadJob.KIND_FILE or UploadJob.KIND_IMPORT.
+        payload (dict): The job input. The "password" is encrypted before it is stored.
+        uploaded_file (UploadedFile, optional): The stored file to parse for KIND_FILE jobs.
+    Returns:
+        UploadJob: The pending job.
+    """
+    from certs.tasks import process_upload_job
+
+    payload = dict(payload)
+    if payload.get("password"):
+        payload["password"] = _encrypt(payload["password"])
+
+    job = UploadJob.objects.create(user=user, kind=kind, payload=payload, uploaded_file=uploaded_file)
+    transaction.on_commit(lambda: process_upload_job.delay(str(job.id)))
+    return job
+
+
+def _update_job(job, **fields):
+    for name, value in fields.items():
+        setattr(job, name, value)
+    UploadJob.objects.filter(pk=job.pk).update(**fields)
+
+
+def _progress_cache():
+    return caches["upload_jobs" if "upload_jobs" in settings.CACHES else "default"]
+
+
+def _progress_key(job_id):
+    return f"upload-job-progress:{job_id}"
+
+
+def get_upload_job_progress(job):
+    """Return the processed count of a job, including the batches of a running job that are
+    stored but not committed yet (reported through the upload job cache)."""
+    if job.status == UploadJob.STATUS_RUNNING:
+        return _progress_cache().get(_progress_key(job.id), job.processed)
+    return job.processed
+
+
+def _file_job_input(job):
+    """Parse the uploaded file of a KIND_FILE job.
+    The file is untrusted, so it is parsed under the UPLOAD_JOB_PARSE_CPU_SECONDS and
+    CRYPTO_JOB_MEMORY_MB limits (the crypto pool cannot run inside a Celery worker).
+    Returns:
+        tuple: (certificate entries, key entry or None)
+    """
+    payload = job.payload
+    try:
+        with resource_limits(settings.UPLOAD_JOB_PARSE_CPU_SECONDS, settings.CRYPTO_JOB_MEMORY_MB):
+            parsed = parse_uploaded_content(job.uploaded_file.file, password=_decrypt(payload.get("password")))
+    except MemoryError:
+        raise CryptoJobError("Processing the file exceeded the allowed resources.")
+    if parsed["error"]:
+        raise ValueError(parsed["error"])
+
+    name = (payload.get("name") or "").strip()
+    entries = [
+        {"cert": cert, "name": name if i == 0 and name else None}
+        for i, cert in enumerate(parsed["certs"])
+    ]
+    key = None
+    if parsed["key"]:
+        key = {
+            "obj": parsed["key"],
+            "teams": payload.get("teams"),
+            "linked_index": 0 if entries else None,
+            "certificate_id": payload.get("certificate_id"),
+            "bit_length": getattr(parsed["key"], "key_size", None),
+            "name": name or parsed["original_filename"],
+        }
+    return entries, key
+
+
+def _import_job_input(job):
+    """Load the certificates and key selected in the upload preview of a KIND_IMPORT job.
+    Returns:
+        tuple: (certificate entries, key entry or None)
+    """
+    payload = job.payload
+    key_data = payload.get("key")
+    temp_ids = [item["temp_id"] for item in payload.get("certs", [])]
+    staged = load_upload_preview(
+        job.user, payload["preview_id"], temp_ids + ([key_data["temp_id"]] if key_data else [])
+    )
+
+    if not staged["certs"] and not staged["key"]:
+        raise ValueError("Invalid or expired session.")
+
+    entries = [
+        {
+            "cert": staged["certs"][item["temp_id"]],
+            "name": item.get("name"),
+            "teams": item.get("teams"),
+            "urls": item.get("urls"),
+            "temp_id": item["temp_id"],
+        }
+        for item in payload.get("certs", [])
+        if item["temp_id"] in staged["certs"]
+    ]
+
+    key = None
+    if key_data and key_data["temp_id"] in staged["key"]:
+        entry_temp_ids = [entry["temp_id"] for entry in entries]
+        linked_temp_id = key_data.get("linked_cert_temp_id")
+        key = {
+            "obj": staged["key"][key_data["temp_id"]],
+            "teams": key_data.get("teams"),
+            "linked_index": entry_temp_ids.index(linked_temp_id) if linked_temp_id in entry_temp_ids else None,
+            "bit_length": key_data.get("bit_length"),
+            "name": key_data.get("filename"),
+            "use_certificate_name": True,
+        }
+    return entries, key
+
+
+def _store_key(job, key, cert_models):
+    """Create the private key of a job and return its outcome. A key already stored is reported
+    as "duplicate", like certificates, without failing the job."""
+    if key.get("certificate_id"):
+        linked_cert = Certificate.objects.filter(id=key["certificate_id"]).first()
+    elif key["linked_index"] is not None:
+        linked_cert = cert_models[key["linked_index"]]
+    else:
+        linked_cert = None
+
+    name = key["name"]
+    if key.get("use_certificate_name") and linked_cert:
+        name = linked_cert.name
+    try:
+        with atomic_storage():
+            private_key = create_private_key(
+                key_obj=key["obj"],
+                bit_length=key["bit_length"],
+                user=job.user,
+                teams=key["teams"],
+                linked_certificate=linked_cert,
+                original_name=name,
+            )
+    except IntegrityError:
+        return {"type": "key", "status": "duplicate", "detail": "This Key already exist."}
+    return {"type": "key", "status": "created", "private_key_id": private_key.id}
+
+
+def _add_website_suggestions(job, results, cert_models):
+    """Attach to each created certificate outcome the existing websites its SAN covers."""
+    created_ids = {r["certificate_id"] for r in results if r["type"] == "certificate" and r["status"] == "created"}
+    suggestions = suggest_websites([c for c in cert_models if c.id in created_ids], user=job.user)
+    for result in results:
+        websites = suggestions.get(result.get("certificate_id")) if result["status"] == "created" else None
+        if websites:
+            result["suggested_websites"] = [
+                {"id": website.id, "url": website.url, "certificate_id": website.certificate_id}
+                for website in websites
+            ]
+
+
+def _store_job_entries(job, entries, key):
+    """Store, link and index the certificates and key of a job, returning the per-entry outcomes.
+    Certificates and keys already stored are reported as "duplicate" instead of failing the job."""
+    teams = job.payload.get("teams")
+    results = []
+    cert_models = []
+    seen = set()
+    for start in range(0, len(entries), UPLOAD_JOB_BATCH_SIZE):
+        batch = entries[start:start + UPLOAD_JOB_BATCH_SIZE]
+        stored = {
+            cert_model.cert_hash: (cert_model, created)
+            for cert_model, created in bulk_create_certificates(batch, user=job.user, teams=teams)
+        }
+        for entry in batch:
+            cert_model, created = stored[hash_certificate(entry["cert"])]
+            created = created and cert_model.id not in seen
+            seen.add(cert_model.id)
+            cert_models.append(cert_model)
+            results.append({
+                "type": "certificate",
+                "name": cert_model.name,
+                "cert_hash": cert_model.cert_hash,
+                "certificate_id": cert_model.id,
+                "status": "created" if created else "duplicate",
+            })
+        # The rows are not visible before the import commits, so progress goes through the cache.
+        _progress_cache().set(_progress_key(job.id), len(cert_models), UPLOAD_JOB_PROGRESS_TIMEOUT)
+
+    resolve_certificate_chains(cert_models)
+    build_certificate_bundles([cert_model.id for cert_model in cert_models])
+    _add_website_suggestions(job, results, cert_models)
+
+    if key:
+        results.append(_store_key(job, key, cert_models))
+    return results
+
+
+def run_upload_job(job):
+    """Parse, deduplicate, store and link everything contained in an upload job.
+    The whole import runs in one transaction: either every entry is stored or, on error,
+    nothing is (rows and written files alike). Certificates are stored in batches of
+    UPLOAD_JOB_BATCH_SIZE, the processed count is reported after every batch (see
+    get_upload_job_progress) and the chain is linked once for the whole upload at the end.
+    The outcome of each created certificate lists the existing websites its SAN covers
+    ("suggested_websites").
+    Args:
+        job (UploadJob): A pending job.
+    """
+    _update_job(job, status=UploadJob.STATUS_RUNNING, started_at=timezone.now())
+    payload = job.payload
+    results = []
+    try:
+        if job.kind == UploadJob.KIND_FILE:
+            entries, key = _file_job_input(job)
+        else:
+            entries, key = _import_job_input(job)
+        _update_job(job, total=len(entries))
+
+        with atomic_storage():
+            results = _store_job_entries(job, entries, key)
+        error = None
+    except Exception as e:
+        error = str(e)
+
+    if job.kind == UploadJob.KIND_IMPORT:
+        discard_upload_preview(payload.get("preview_id"))
+
+    _update_job(
+        job,
+        status=UploadJob.STATUS_FAILED if error else UploadJob.STATUS_SUCCEEDED,
+        processed=sum(result["type"] == "certificate" for result in results),
+        results=results,
+        error=error,
+        payload={k: v for k, v in payload.items() if k not in _TRANSIENT_PAYLOAD_KEYS},
+        finished_at=timezone.now(),
+    )
+    _progress_cache().delete(_progress_key(job.id))
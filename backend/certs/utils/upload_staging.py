@@ -0,0 +1,113 @@
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from cryptography import x509
+from cryptography.hazmat.primitives import serialization
+from certs.models import UploadPreview, UploadPreviewEntry
+
+
+def stage_upload_preview(user, certs, key=None):
+    """Store a parsed upload until the user confirms the import.
+    Certificates are kept as DER and the private key as Fernet-encrypted PKCS8 DER. The preview
+    expires after UPLOAD_PREVIEW_TTL seconds.
+    Args:
+        user (User): The user who uploaded the file.
+        certs (list): x509.Certificate objects.
+        key (optional): The private key object found in the upload.
+    Returns:
+        tuple: (preview id as str, list of certificate temp ids, key temp id or None)
+    """
+    preview = UploadPreview(
+        user=user,
+        expires_at=timezone.now() + timedelta(seconds=settings.UPLOAD_PREVIEW_TTL),
+    )
+    entries = [
+        UploadPreviewEntry(
+            preview=preview,
+            temp_id=f"cert_{uuid.uuid4()}",
+            kind=UploadPreviewEntry.KIND_CERTIFICATE,
+            data=cert.public_bytes(serialization.Encoding.DER),
+        )
+        for cert in certs
+    ]
+    key_temp_id = None
+    if key:
+        key_temp_id = f"key_{uuid.uuid4()}"
+        entries.append(UploadPreviewEntry(
+            preview=preview,
+            temp_id=key_temp_id,
+            kind=UploadPreviewEntry.KIND_KEY,
+            data=settings.FERNET.encrypt(key.private_bytes(
+                encoding=serialization.Encoding.DER,
+                format=serialization.PrivateFormat.PKCS8,
+                encryption_algorithm=serialization.NoEncryption(),
+            )),
+        ))
+
+    with transaction.atomic():
+        preview.save()
+        UploadPreviewEntry.objects.bulk_create(entries)
+    cert_temp_ids = [entry.temp_id for entry in entries if entry.kind == UploadPreviewEntry.KIND_CERTIFICATE]
+    return str(preview.id), cert_temp_ids, key_temp_id
+
+
+def _parse_preview_id(preview_id):
+    try:
+        return uuid.UUID(str(preview_id))
+    except ValueError:
+        return None
+
+
+def upload_preview_exists(user, preview_id):
+    """Return True if the user owns a preview with this id that has not expired."""
+    preview_id = _parse_preview_id(preview_id)
+    return preview_id is not None and UploadPreview.objects.filter(
+        id=preview_id, user=user, expires_at__gt=timezone.now()
+    ).exists()
+
+
+def load_upload_preview(user, preview_id, temp_ids):
+    """Load the selected entries of a preview with a single indexed query.
+    Args:
+        user (User): The user who owns the preview.
+        preview_id (str): The id returned by stage_upload_preview.
+        temp_ids (Iterable[str]): The temp ids of the entries to load.
+    Returns:
+        dict: {"certs": {temp_id: x509.Certificate}, "key": {temp_id: private key}}. Expired or
+        unknown previews and entries are simply missing.
+    """
+    staged = {"certs": {}, "key": {}}
+    preview_id = _parse_preview_id(preview_id)
+    if preview_id is None:
+        return staged
+
+    rows = UploadPreviewEntry.objects.filter(
+        preview_id=preview_id,
+        preview__user=user,
+        preview__expires_at__gt=timezone.now(),
+        temp_id__in=list(temp_ids),
+    ).values_list("temp_id", "kind", "data")
+    for temp_id, kind, data in rows:
+        if kind == UploadPreviewEntry.KIND_CERTIFICATE:
+            staged["certs"][temp_id] = x509.load_der_x509_certificate(bytes(data))
+        else:
+            staged["key"][temp_id] = serialization.load_der_private_key(
+                settings.FERNET.decrypt(bytes(data)), password=None
+            )
+    return staged
+
+
+def discard_upload_preview(preview_id):
+    """Delete a preview and its entries once it has been imported."""
+    UploadPreview.objects.filter(id=preview_id).delete()
+
+
+def purge_expired_upload_previews():
+    """Delete every expired preview.
+    Returns:
+        int: The number of deleted previews.
+    """
+    _, deleted = UploadPreview.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted.get(UploadPreview._meta.label, 0)
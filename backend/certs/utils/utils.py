@@ -1,8 +1,11 @@
 from cryptography import x509
 from cryptography.x509.oid import NameOID
 from cryptography.hazmat.backends import default_backend
+from urllib.parse import quote
 from django.conf import settings
+from django.http import HttpResponse
 from cryptography.hazmat.primitives.serialization import load_pem_private_key, load_der_private_key
+from .chain_closure import get_certificate_ancestors, get_certificate_descendants
 
 def load_certificate_from_bytes(data: bytes) -> x509.Certificate:
     """
@@ -13,6 +16,38 @@ def load_certificate_from_bytes(data: bytes) -> x509.Certificate:
     except ValueError:
         return x509.load_der_x509_certificate(data, default_backend())
     
+def read_fieldfile_bytes(field_file):
+    """
+    Open the FileField, read all bytes, then close it.
+    Returns the raw bytes so ASN.1 parsing will see the full certificate/key.
+    """
+    field_file.open('rb')
+    data = field_file.read()
+    field_file.close()
+    return data
+
+def read_encrypted_key_bytes(private_key):
+    """
+    Return the Fernet-encrypted bytes of a PrivateKey, from the inline column when it is
+    populated and from the key file otherwise.
+    """
+    if private_key.encrypted_key is not None:
+        return bytes(private_key.encrypted_key)
+    return read_fieldfile_bytes(private_key.encrypted_key_file)
+
+def x_accel_redirect_response(field_file, filename, content_type):
+    """
+    Return an empty response telling nginx to send a stored file from the internal
+    X_ACCEL_REDIRECT_PREFIX location, or None when offloading is disabled.
+    Only call it once the user's access to the file has been checked.
+    """
+    if not settings.X_ACCEL_REDIRECT_PREFIX or not field_file:
+        return None
+    resp = HttpResponse(content_type=content_type)
+    resp['X-Accel-Redirect'] = f"{settings.X_ACCEL_REDIRECT_PREFIX.rstrip('/')}/{quote(field_file.name)}"
+    resp['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return resp
+
 def _load_and_decrypt_key(encrypted_data: bytes) -> object:
     """
     Decrypts with your FERNET, then loads a private key object.
@@ -40,41 +75,25 @@ def extract_common_name(subject):
     except IndexError:
         return "Unnamed Cert"
     
-def walk_certificate_chain(cert_obj, visited=None):
+def walk_certificate_chain(cert_obj):
     """
-    Recursively walks the .chain of a certificate and returns the full list in order.
+    Returns the issuers of a certificate in order (parent first, root last) with one query.
     """
-    if visited is None:
-        visited = set()
-    
-    chain = []
-
-    for next_cert in cert_obj.chain.all():
-        if next_cert.id in visited:
-            continue  # avoid circular loops
-        visited.add(next_cert.id)
-        chain.append(next_cert)
-        chain.extend(walk_certificate_chain(next_cert, visited))
+    return list(get_certificate_ancestors(cert_obj, include_self=False))
 
-    return chain
-
-def build_cert_chain_tree(cert_obj, visited=None):
+def build_cert_chain_tree(cert_obj):
     """
-    Recursively builds a tree-like dictionary of the certificate's trust chain.
+    Builds a tree-like dictionary of the certificate and everything it issued, with one query.
     """
-    if visited is None:
-        visited = set()
-    if cert_obj.id in visited:
-        return None  # prevent loops
-    visited.add(cert_obj.id)
+    rows = get_certificate_descendants(cert_obj, include_self=True).values("id", "subject", "issuer", "parent_id")
+
+    nodes = {}
+    for row in rows:
+        nodes[row["id"]] = {"id": row["id"], "subject": row["subject"], "issuer": row["issuer"], "chain": [], "parent_id": row["parent_id"]}
+
+    for node in nodes.values():
+        parent_id = node.pop("parent_id")
+        if node["id"] != cert_obj.id and parent_id in nodes:
+            nodes[parent_id]["chain"].append(node)
 
-    return {
-        "id": cert_obj.id,
-        "subject": cert_obj.subject,
-        "issuer": cert_obj.issuer,
-        "chain": [
-            build_cert_chain_tree(child, visited)
-            for child in cert_obj.chain.all()
-            if child.id not in visited
-        ]
-    }
\ No newline at end of file
+    return nodes.get(cert_obj.id)
@@ -1,18 +1,23 @@
 from .uploadCerts_views import MetaDataUploadView, FileUploadView
 from .detailCert_views  import CertificateListView, CertificateDetailView
 from .detailKey_views import PrivateKeyDetailView
-from .userManage_views import TeamListView, UserInfoView, MyTokenObtainPairView, UserListView
+from .userManage_views import TeamListView, UserInfoView, MyTokenObtainPairView, MyTokenRefreshView, UserListView
 from .processUploadedFileView import ProcessUploadedFileView
 from .certUploadPreviewView import UploadCertFilePreviewView
 from .ImportCertMetadataView import ImportCertMetadataView
+from .uploadJob_views import UploadJobDetailView
 from .deleteCerts_view import DeleteCertifiactesView
 from .detailKey_views import PrivateKeyListView
 from .deleteKeys_view import DeleteKeysView
 from .manageCert_view import ManageCertificatesView
 from .manageKey_view import ManageKeyView
-from .websites_view import CertificateWebsiteListCreateView, WebsiteDetailView,WebsiteListView
+from .websites_view import CertificateWebsiteListCreateView, WebsiteDetailView,WebsiteListView,CertificateWebsiteSuggestionsView
 from .certificateExport_view import CertificateExportView,CertificateTestView
-from .dashboard_views import certificates_overview,certificates_expiring_soon, certificates_list,certificates_top_expiry
+from .bulkExport_view import CertificateBulkExportView
+from .search_view import CertificateSearchView
+from .hostnameCoverage_view import CertificateHostnameLookupView
+from .certificateChain_views import CertificateDescendantsView
+from .dashboard_views import certificates_overview,certificates_expiring_soon, certificates_list,certificates_top_expiry,certificates_summary,certificates_expiry_forecast
 from .adminManagement_views import (
     CreateTeamView,
     CreateUserView,
@@ -23,5 +28,6 @@ from .adminManagement_views import (
     UserUpdateView,
     GenerateInviteView,
     RegisterFromInviteView,
-    TeamDetailView
+    TeamDetailView,
+    CertificateCacheStatsView
     )
\ No newline at end of file
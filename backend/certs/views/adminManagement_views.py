@@ -13,6 +13,7 @@ from certs.models import CustomUser, Team, InviteToken
 from certs.serializers import AdminUserCreateSerializer, AdminUserUpdateSerializer, RegistrationSerializer, TeamDetailSerializer, TeamSerializer
 from rest_framework import status, generics
 from django.shortcuts import get_object_or_404
+from certs.utils.certificate_cache import certificate_cache_stats
 
 class CreateUserView(generics.CreateAPIView):
     """View for creating a new user by an admin.
@@ -91,6 +92,8 @@ class TeamUpdateMembersView(APIView):
     pk).
     It retrieves the team object, updates its name and members based on the provided user IDs, 
     and saves the changes.
+    Added and removed members get a new membership version (Team.members m2m_changed signal), so
+    the team claims of their access tokens stop being trusted and the next refresh re-issues them.
     Only authenticated admins can access this view. 
     """
     permission_classes = [IsAuthenticated, IsAdminUser]
@@ -175,4 +178,14 @@ class TeamDetailView(RetrieveAPIView):
     queryset = Team.objects.all()
     serializer_class = TeamDetailSerializer
     permission_classes = [IsAuthenticated]
-    lookup_field = "pk"
\ No newline at end of file
+    lookup_field = "pk"
+
+class CertificateCacheStatsView(APIView):
+    """View exposing the hit/miss counters of the parsed certificate cache.
+    The counters belong to the worker process that serves the request.
+    Only authenticated admins can access this view.
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        return Response(certificate_cache_stats())
@@ -0,0 +1,93 @@
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from certs.utils import authorize_certificates, get_accessible_certificates, iter_certificate_archive
+from certs.utils.bulk_export import ARCHIVE_FORMATS, EXPORT_BATCH_SIZE
+
+
+def _filter_certificates(queryset, filters):
+    """Apply the bulk export filter object to a certificate queryset.
+    Supported keys: search (name), issuer, certificate_type, team (id), expired (bool),
+    expires_before / expires_after (ISO 8601 datetimes).
+    """
+    if filters.get("search"):
+        queryset = queryset.filter(name__icontains=filters["search"])
+    if filters.get("issuer"):
+        queryset = queryset.filter(issuer__icontains=filters["issuer"])
+    if filters.get("certificate_type"):
+        queryset = queryset.filter(certificate_type=filters["certificate_type"])
+    if filters.get("team"):
+        queryset = queryset.filter(access_teams__id=filters["team"])
+    if "expired" in filters:
+        expired = str(filters["expired"]).lower()
+        if expired not in ("true", "false"):
+            raise ValueError(f"Invalid boolean for expired: {filters['expired']}")
+        queryset = queryset.filter(is_expired=expired == "true")
+    for key, lookup in (("expires_before", "not_after__lt"), ("expires_after", "not_after__gte")):
+        if filters.get(key):
+            value = parse_datetime(str(filters[key]))
+            if value is None:
+                raise ValueError(f"Invalid datetime for {key}: {filters[key]}")
+            queryset = queryset.filter(**{lookup: value})
+    return queryset
+
+
+class CertificateBulkExportView(APIView):
+    """View for exporting many certificates as a single ZIP or tar archive.
+    POST /api/certificates/bulk-export/
+      {"ids": [1, 2, 3]} or {"filter": {"search": "...", "team": 1, "expires_before": "..."}}
+      "archive": "zip" | "tar"   (default zip)
+      "key": true | false        (add privkey.pem for keys the user can access)
+    Every certificate gets a "<name>-<id>/" folder with cert.pem, chain.pem and fullchain.pem.
+    The archive is streamed while it is being built, so memory use does not depend on the
+    number of exported certificates.
+    If any of the requested ids is not accessible to the user, it returns a 403 Forbidden response.
+    Only authenticated users can access this view.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        archive = str(request.data.get("archive", "zip")).lower()
+        include_keys = str(request.data.get("key", "false")).lower() == "true"
+        cert_ids = request.data.get("ids")
+        filters = request.data.get("filter")
+
+        if archive not in ARCHIVE_FORMATS:
+            return Response({"detail": f"Unsupported archive: {archive}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = get_accessible_certificates(request.user)
+        if cert_ids:
+            try:
+                cert_ids = {int(cert_id) for cert_id in cert_ids}
+            except (TypeError, ValueError):
+                return Response({"error": "ids must be a list of integers"}, status=status.HTTP_400_BAD_REQUEST)
+            allowed, denied = authorize_certificates(cert_ids, request.user)
+            if denied:
+                return Response(
+                    {"error": f"Not Authorized to export certificates {sorted(denied)}"},
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+            queryset = queryset.filter(id__in=allowed)
+        elif isinstance(filters, dict):
+            try:
+                queryset = _filter_certificates(queryset, filters)
+            except ValueError as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            return Response({"error": "No certificates selected"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not queryset.exists():
+            return Response({"error": "Certificates not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        mime, ext = ARCHIVE_FORMATS[archive]
+        ids = queryset.order_by("id").values_list("id", flat=True).iterator(chunk_size=EXPORT_BATCH_SIZE)
+        resp = StreamingHttpResponse(
+            iter_certificate_archive(ids, request.user, archive=archive, include_keys=include_keys),
+            content_type=mime,
+        )
+        resp["Content-Disposition"] = f'attachment; filename="certificates.{ext}"'
+        return resp
@@ -1,11 +1,9 @@
-from django.conf import settings
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
-from cryptography import x509
-from certs.utils import parse_uploaded_file, detect_file_format, parse_uploaded_content,extract_common_name
-import uuid
+from certs.utils import detect_file_format, extract_common_name, stage_upload_preview
+from certs.crypto_pool import parse_upload, CryptoJobError, CryptoPoolBusy
 import os
 
 
@@ -13,8 +11,8 @@ import os
 class UploadCertFilePreviewView(APIView):
     """View for uploading a certificate file and previewing its contents.
 This view handles the parsing of various certificate formats, including PEM, DER, PFX (PKCS12), and others.
-It extracts certificate and key information, checks for password requirements, and prepares a session for previewing
-the uploaded content.
+It extracts certificate and key information, checks for password requirements, and stages the parsed objects in the upload preview store
+(UploadPreview, expires after UPLOAD_PREVIEW_TTL) until they are imported.
     """
     permission_classes = [IsAuthenticated]
 
@@ -29,7 +27,7 @@ the uploaded content.
         file_name_without_extension = os.path.splitext(file.name)[0] 
 
         try:
-            parsed = parse_uploaded_content(file, password=password)
+            parsed = parse_upload(file, password=password)
 
             if parsed.get("password_required"):
                 return Response({
@@ -38,6 +36,10 @@ the uploaded content.
                     "format": "PKCS12",
                     "password_required": True
                 }, status=400)
+        except CryptoPoolBusy as e:
+            return Response({"error": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        except CryptoJobError as e:
+            return Response({"error": str(e)}, status=400)
         except Exception as e:
             # PKCS12 password failure — special case
             if file_format == "PKCS12":
@@ -50,13 +52,14 @@ the uploaded content.
             else:
                 return Response({"error": str(e)}, status=400)
 
-        session_key = f"upload_preview:{request.user.id}:{uuid.uuid4()}"
-        session_data = {"certs": {}, "key": {}}
+        # Stage the parsed objects (DER, encrypted key) until the import or the TTL expires
+        certs = parsed.get("certs", [])
+        key = parsed.get("key")
+        session_key, cert_temp_ids, key_temp_id = stage_upload_preview(request.user, certs, key)
+
         # Build a frontend-friendly preview list
         certs_metadata = []
-        for i, cert in enumerate(parsed.get("certs",[])):
-            temp_id = f"cert_{uuid.uuid4()}"
-            session_data["certs"][temp_id] = cert.public_bytes(encoding=settings.X509_ENCODING).decode("utf-8")
+        for temp_id, cert in zip(cert_temp_ids, certs):
             cert_name = extract_common_name(cert.subject)
             certs_metadata.append({
                 "filename": file_name_without_extension,
@@ -68,26 +71,13 @@ the uploaded content.
             })
 
         key_info = None
-        key = parsed.get("key")
         if key:
-            temp_id = f"key_{uuid.uuid4()}"
-            session_data["key"][temp_id] = key.private_bytes(
-                encoding=settings.X509_ENCODING,
-                format=settings.KEY_FORMAT,
-                encryption_algorithm=settings.KEY_ENCRYPTION_ALGO
-            ).decode("utf-8")
-
             key_info = {
-                "temp_id": temp_id,
+                "temp_id": key_temp_id,
                 "type": key.__class__.__name__,
                 "bit_length": getattr(key, 'key_size', None),
                 "filename":file_name_without_extension,
             }
-        request.session[session_key] = session_data
-        request.session.set_expiry(600)
-        request.session.modified = True
-        request.session.save()
-
 
         return Response({
             "status": "pars ed",
@@ -0,0 +1,29 @@
+from django.shortcuts import get_object_or_404
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from rest_framework import status
+from certs.models import Certificate
+from certs.serializers import CertificateMiniSerializer
+from certs.utils import user_can_access_certificate, get_accessible_certificates, get_certificate_descendants
+
+
+class CertificateDescendantsView(APIView):
+    """View listing every certificate issued below a CA certificate.
+    This answers "what is impacted if this CA is revoked" with a single query on the chain
+    closure table. Pass `?leaves=true` to only return end-entity certificates.
+    Only certificates the user can access are returned.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, cert_id):
+        cert = get_object_or_404(Certificate, pk=cert_id)
+
+        if not user_can_access_certificate(cert, request.user):
+            return Response({"error": "Not authorized to view this certificate"}, status=status.HTTP_403_FORBIDDEN)
+
+        leaves_only = request.query_params.get("leaves", "false").lower() == "true"
+        descendants = get_certificate_descendants(cert, leaves_only=leaves_only).filter(
+            id__in=get_accessible_certificates(request.user).values("id")
+        )
+        return Response(CertificateMiniSerializer(descendants, many=True).data)
@@ -11,17 +11,24 @@ from cryptography.hazmat.primitives.serialization import Encoding, BestAvailable
 from cryptography.hazmat.primitives.serialization.pkcs12 import serialize_key_and_certificates
 
 from certs.models import Certificate,PrivateKey
-from certs.utils.utils import load_certificate_from_bytes
-
-def read_fieldfile_bytes(field_file):
-    """
-    Open the FileField, read all bytes, then close it.
-    Returns the raw bytes so ASN.1 parsing will see the full certificate/key.
-    """
-    field_file.open('rb')
-    data = field_file.read()
-    field_file.close()
-    return data
+from certs.utils.utils import read_encrypted_key_bytes, x_accel_redirect_response
+from certs.utils.access_utils import user_can_access_certificate, user_can_access_key
+from certs.utils.certificate_cache import certificate_cache
+from certs.utils.chain_closure import get_certificate_ancestors
+from certs.utils.blob_store import content_hash
+from certs.utils.certificate_bundles import get_certificate_bundle
+from certs.utils.conditional import conditional_view, certificate_export_version
+
+def _stored_leaf_pem(cert_obj, bundle):
+    """Return the stored file of the certificate if it is exactly its leaf PEM, else None.
+    The blob key is the SHA-256 of the stored bytes, so it is compared to the hash of the PEM
+    that would be served; files stored before that keying, or raw DER uploads, never match."""
+    uploaded_file = cert_obj.file
+    if not uploaded_file or not uploaded_file.blob_id or not uploaded_file.file.name.endswith('.pem'):
+        return None
+    if uploaded_file.blob_id != content_hash(bytes(bundle.leaf_pem)):
+        return None
+    return uploaded_file.file
 
 
 class CertificateExportView(APIView):
@@ -33,13 +40,17 @@ class CertificateExportView(APIView):
       &key={true|false}
       &password=<pwd_for_pfx>
     """
+    @conditional_view(certificate_export_version)
     def get(self, request, cert_id):
-        cert_obj     = get_object_or_404(Certificate, pk=cert_id)
+        cert_obj     = get_object_or_404(Certificate.objects.select_related('private_key', 'bundle', 'file'), pk=cert_id)
         fmt          = request.query_params.get('fmt', 'pem').lower()
         include_chain= request.query_params.get('chain','false').lower() == 'true'
         include_key  = request.query_params.get('key','false').lower()   == 'true'
         pwd          = request.query_params.get('pwd','')
 
+        if not user_can_access_certificate(cert_obj, request.user):
+            return Response({"error": "Not authorized to export this certificate"}, status=status.HTTP_403_FORBIDDEN)
+
         # 1️⃣ Validate format/key combos
         if fmt not in {'pem','crt','pfx'}:
             return Response(
@@ -53,33 +64,32 @@ class CertificateExportView(APIView):
             )
         
 
-        # 2️⃣ Build the cert chain (leaf → ... → root)
-        seen = set()
-        chain_objs = []
-        node = cert_obj
-        while node and node.id not in seen:
-            chain_objs.append(node)
-            seen.add(node.id)
-            node = node.parent
-
-        # if someone ever injected a loop (parent=self or a cycle) we stop here
-        if include_chain:
-            final_chain = chain_objs
-        else:
-            final_chain = chain_objs[:1]   # leaf only
+        # 2️⃣ Leaf PEM stored as its own blob: nginx sends the file itself (X-Accel-Redirect)
+        if fmt == 'pem' and not include_chain and not include_key:
+            stored = _stored_leaf_pem(cert_obj, get_certificate_bundle(cert_obj))
+            resp = x_accel_redirect_response(stored, f"{cert_obj.name}.pem", 'application/x-pem-file')
+            if resp is not None:
+                return resp
+
+        # 3️⃣ PEM/CRT: serve the precomputed bundle bytes as they are (no x509 parsing)
+        if fmt in {'pem','crt'}:
+            bundle = get_certificate_bundle(cert_obj)
+            if fmt == 'pem':
+                cert_bytes = bytes(bundle.fullchain_pem if include_chain else bundle.leaf_pem)
+            else:
+                cert_bytes = bytes(bundle.fullchain_der if include_chain else bundle.leaf_der)
 
-        # 3️⃣ Load & serialize certificates
-        enc = Encoding.PEM if fmt=='pem' else Encoding.DER
-        cert_bytes = b''
-        for c in final_chain:
-            raw = read_fieldfile_bytes(c.file.file)
-            x509 = load_certificate_from_bytes(raw)
-            cert_bytes += x509.public_bytes(enc)
+        # 4️⃣ PFX: build the cert chain (leaf → ... → root) from the closure table in one query
+        #    (parsed objects come from the cert_hash cache, inline DER rows never touch the joined file)
+        else:
+            chain_objs = list(get_certificate_ancestors(cert_obj).select_related('file')) or [cert_obj]
+            final_chain = chain_objs if include_chain else chain_objs[:1]
+            parsed_chain = [certificate_cache.get(c)[0] for c in final_chain]
 
-        # 4️⃣ Handle private key if requested
+        # 5️⃣ Handle private key if requested
         key_bytes = b''
         if include_key:
-            # fetch & decrypt the stored key file
+            # fetch & decrypt the stored key (inline bytes or key file)
             try:
                 priv = cert_obj.private_key
             except PrivateKey.DoesNotExist:
@@ -87,7 +97,9 @@ class CertificateExportView(APIView):
                     {"detail": "No private key associated with this certificate."},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            raw_encrypted = read_fieldfile_bytes(priv.encrypted_key_file)
+            if not user_can_access_key(priv, request.user):
+                return Response({"error": "Not authorized to export this Private Key"}, status=status.HTTP_403_FORBIDDEN)
+            raw_encrypted = read_encrypted_key_bytes(priv)
             raw_decrypted = settings.FERNET.decrypt(raw_encrypted)
             priv_key = load_pem_private_key(raw_decrypted, password=None)
             
@@ -97,7 +109,7 @@ class CertificateExportView(APIView):
                 encryption_algorithm=settings.KEY_ENCRYPTION_ALGO
             )
 
-        # 5️⃣ Build the response blob
+        # 6️⃣ Build the response blob
         if fmt in {'pem','crt'} and not include_key:
             # cert(±chain) only
             data = cert_bytes
@@ -114,14 +126,8 @@ class CertificateExportView(APIView):
             # fmt=='pfx' and include_key==True
             # Note: serialize_key_and_certificates expects the leaf cert as `cert`,
             # and the rest of chain_objs[1:] as `cas`
-            leaf = load_certificate_from_bytes(read_fieldfile_bytes(chain_objs[0].file.file))
-            if include_chain:
-                cas = [
-                    load_certificate_from_bytes(read_fieldfile_bytes(c.file.file))
-                    for c in chain_objs[1:]
-                ]
-            else:
-                cas = None
+            leaf = parsed_chain[0]
+            cas = parsed_chain[1:] if include_chain else None
 
             if pwd:
                 enc_algo = BestAvailableEncryption(pwd.encode())
@@ -138,7 +144,7 @@ class CertificateExportView(APIView):
             mime = 'application/x-pkcs12'
             ext  = 'pfx'
 
-        # 6️⃣ Return as a file download
+        # 7️⃣ Return as a file download
         resp = HttpResponse(data, content_type=mime)
         resp['Content-Disposition'] = f'attachment; filename="{cert_obj.name}.{ext}"'
         return resp
@@ -1,27 +1,22 @@
 from rest_framework.decorators import api_view, permission_classes
-from django.db.models import Q
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.utils import timezone
 from datetime import timedelta
-from certs.models import Certificate
 from certs.serializers import CertificateMiniSerializer
-
-def get_accessible_certificates(user):
-    """Retrieve certificates accessible to the user based on their team memberships.
-    This function filters certificates that are either accessible to the user's teams or have no team restrictions. 
-    Args:
-        user (CustomUser): The user for whom to retrieve accessible certificates.
-    Returns:    
-        QuerySet: A queryset of Certificate objects that the user can access.
-    """
-    user_teams = user.teams.all()
-    return Certificate.objects.filter(
-        Q(access_teams__in=user_teams) | Q(access_teams__isnull=True)
-    ).distinct()
+from certs.utils import get_accessible_certificates, get_dashboard_summary, get_expiry_forecast
+from certs.utils.conditional import (
+    conditional_view,
+    dashboard_days,
+    dashboard_summary_version,
+    dashboard_version,
+    expiry_forecast_params,
+    expiry_forecast_version,
+)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_view(dashboard_version)
 def certificates_overview(request):
     """Overview of certificates accessible to the user.
     This view provides a summary of the total number of certificates,
@@ -45,6 +40,7 @@ def certificates_overview(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_view(dashboard_version)
 def certificates_expiring_soon(request):
     """Count of certificates expiring soon.
     This view counts the number of certificates that are expiring within a specified number of days.    
@@ -75,6 +71,7 @@ def certificates_expiring_soon(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_view(dashboard_version)
 def certificates_list(request):
     """List certificates based on their type.
     This view retrieves a list of certificates based on the type specified in the query parameters.
@@ -111,6 +108,7 @@ def certificates_list(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_view(dashboard_version)
 def certificates_top_expiry(request):
     """List the top certificates by expiry date.
     This view retrieves a limited number of certificates that are not expired, ordered by their expiry date.
@@ -124,4 +122,40 @@ def certificates_top_expiry(request):
     limit = int(request.GET.get('limit', 20))
     queryset = get_accessible_certificates(request.user).filter(is_expired=False).order_by('not_after')[:limit]
     data = CertificateMiniSerializer(queryset, many=True).data
-    return Response(data)
\ No newline at end of file
+    return Response(data)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@conditional_view(dashboard_summary_version)
+def certificates_summary(request):
+    """All the dashboard figures in one response.
+    Returns the total, expired, valid and expiring-within-`days` (default 30) counts of the
+    certificates accessible to the user, broken down per certificate type and per team.
+    The figures come from a snapshot shared by the users with the same teams: it is computed
+    with a single aggregate query, refreshed by Celery and dropped on certificate writes.
+    Args:
+        request (Request): The HTTP request object.
+    Returns:
+        Response: A JSON response containing the dashboard summary.
+    """
+    return Response(get_dashboard_summary(request.user, dashboard_days(request)))
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@conditional_view(expiry_forecast_version)
+def certificates_expiry_forecast(request):
+    """Number of certificates expiring per week or per month.
+    Query parameters: `bucket` ('week' or 'month', default 'week'), `periods` (number of buckets,
+    default 52 weeks / 12 months), and the optional filters `team` (team id), `issuer`
+    (case-insensitive substring) and `type` (certificate type).
+    The series is computed with one date_trunc GROUP BY query and cached like the dashboard
+    summary (at most DASHBOARD_SNAPSHOT_TIMEOUT seconds, dropped on certificate writes).
+    Args:
+        request (Request): The HTTP request object.
+    Returns:
+        Response: {"bucket", "start" (first bucket date), "counts" (one per bucket), "total", "generated_at"}.
+    """
+    params = expiry_forecast_params(request)
+    if params is None:
+        return Response({"detail": "Invalid bucket parameter."}, status=400)
+    return Response(get_expiry_forecast(request.user, **params))
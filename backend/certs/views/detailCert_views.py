@@ -3,33 +3,60 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
-from django.db.models import Q
-from certs.serializers import CertificateSerializer
+from django.db.models import Exists, OuterRef, Prefetch, Q
+from certs.serializers import CertificateSerializer, CertificateListSerializer, sparse_params
 from certs.models import (
-    Certificate
+    Certificate,
+    PrivateKey,
+    Team,
+    Website,
 )
-from certs.utils import user_can_access_certificate,get_accessible_certificates
+from certs.utils import user_can_access_certificate,get_accessible_certificates,refresh_chain_closure,conditional_view
+from certs.utils.conditional import certificate_list_version, certificate_detail_version
+from certs.utils.pagination import InvalidCursor, paginate_keyset
+
+
+def get_certificate_list_queryset(user):
+    """Accessible certificates with everything CertificateListSerializer reads loaded up front."""
+    return get_accessible_certificates(user).annotate(
+        has_key=Exists(PrivateKey.objects.filter(certificate=OuterRef('pk')))
+    ).prefetch_related(
+        Prefetch('access_teams', queryset=Team.objects.only('id', 'name')),
+        Prefetch('websites', queryset=Website.objects.only('id', 'url', 'domain', 'certificate_id')),
+    )
 
 class CertificateListView(APIView):
-    """View for listing all certificates accessible to the user.
-    This view retrieves all certificates that the user can access based on their team memberships.
-    It uses the `get_accessible_certificates` utility function to filter the certificates.
-    The response includes a serialized list of certificates.
+    """View for listing the certificates accessible to the user, one page at a time.
+    Certificates are ordered by (not_after, id) and paginated with a keyset cursor:
+    ?limit= sets the page size (default 100, max 500) and ?cursor= takes the "next" value of
+    the previous page. The response is {"results": [...], "next": cursor or null}.
+    ?fields= / ?expand= select the returned fields (see SparseFieldsetMixin).
+    Each page costs the same number of queries whatever its size.
     Only authenticated users can access this view.
     """
     permission_classes=[IsAuthenticated]
+    @conditional_view(certificate_list_version)
     def get(self,request):
-        user_teams = request.user.teams.all()
-        certs = get_accessible_certificates(request.user)
-        serializer = CertificateSerializer(certs,many=True)
-        return Response(serializer.data)
+        fields, expand = sparse_params(request)
+        if fields is None and expand is None:
+            queryset = get_certificate_list_queryset(request.user)
+        else:
+            queryset = CertificateListSerializer.sparse_queryset(
+                get_accessible_certificates(request.user), fields, expand, required=('id', 'not_after')
+            )
+        try:
+            certs, next_cursor = paginate_keyset(queryset, request, 'not_after')
+        except InvalidCursor as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = CertificateListSerializer(certs,many=True,fields=fields,expand=expand)
+        return Response({"results": serializer.data, "next": next_cursor})
     
 class CertificateDetailView(APIView):
     """View for retrieving, updating, or deleting a specific certificate.
     This view allows users to perform operations on a certificate identified by its primary key (cert_id).
     It checks if the user has the necessary permissions to access or modify the certificate based on their
     team memberships.
-    - GET: Retrieve the certificate details.
+    - GET: Retrieve the certificate details (?fields= / ?expand= select the returned fields).
     - DELETE: Delete the certificate.
     - PATCH: Update the certificate with partial data.
     If the user is not authorized to access or modify the certificate, it returns a 403
@@ -38,13 +65,15 @@ class CertificateDetailView(APIView):
     Only authenticated users can access this view.
     """
     permission_classes=[IsAuthenticated]
+    @conditional_view(certificate_detail_version)
     def get(self,request,cert_id):
-        cert = get_object_or_404(Certificate,pk=cert_id)
+        fields, expand = sparse_params(request)
+        cert = get_object_or_404(CertificateSerializer.sparse_queryset(Certificate.objects.all(), fields, expand),pk=cert_id)
 
         if not user_can_access_certificate(cert, request.user):
             return Response({"error": "Not authorized to modify this certificate"}, status=status.HTTP_403_FORBIDDEN)
         
-        serializer = CertificateSerializer(cert)
+        serializer = CertificateSerializer(cert,fields=fields,expand=expand)
         return Response(serializer.data)
     
     def delete(self,request,cert_id):
@@ -65,5 +94,7 @@ class CertificateDetailView(APIView):
         
         if serializer.is_valid():
             serializer.save()
+            if "parent" in serializer.validated_data:
+                refresh_chain_closure([cert.id])
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
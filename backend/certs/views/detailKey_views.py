@@ -3,27 +3,41 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
-from django.db.models import Q
-from certs.serializers import PrivateKeyDetailSerializer
+from django.db.models import Prefetch
+from certs.serializers import PrivateKeyDetailSerializer, PrivateKeyListSerializer, sparse_params
 from certs.models import (
-    PrivateKey
+    PrivateKey,
+    Team,
 )
+from certs.utils import get_accessible_keys
+from certs.utils.pagination import InvalidCursor, paginate_keyset
+from certs.utils.conditional import conditional_view, private_key_list_version
 
 class PrivateKeyListView(APIView):
-    """View for listing all private keys accessible to the user.
-    This view retrieves all private keys that the user can access based on their team memberships.
-    It uses the `PrivateKeyDetailSerializer` to serialize the private keys.
-    The response includes a serialized list of private keys.
+    """View for listing the private keys accessible to the user, one page at a time.
+    Keys are ordered by (created_at, id) and paginated with a keyset cursor (?limit=, ?cursor=),
+    the response is {"results": [...], "next": cursor or null}. The linked certificate is joined
+    and the access teams prefetched, so each page costs the same number of queries.
     Only authenticated users can access this view.
     """
     permission_classes=[IsAuthenticated]
+    @conditional_view(private_key_list_version)
     def get(self,request):
-        user_teams = request.user.teams.all()
-        privatekey = PrivateKey.objects.filter(
-            Q(access_teams__in=user_teams) | Q(access_teams=None)
-        ).distinct()
-        serializer = PrivateKeyDetailSerializer(privatekey,many=True)
-        return Response(serializer.data)
+        fields, expand = sparse_params(request)
+        if fields is None and expand is None:
+            privatekey = get_accessible_keys(request.user).select_related('certificate').defer(
+                'certificate__der'
+            ).prefetch_related(Prefetch('access_teams', queryset=Team.objects.only('id', 'name')))
+        else:
+            privatekey = PrivateKeyListSerializer.sparse_queryset(
+                get_accessible_keys(request.user), fields, expand, required=('id', 'created_at')
+            )
+        try:
+            keys, next_cursor = paginate_keyset(privatekey, request, 'created_at')
+        except InvalidCursor as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = PrivateKeyListSerializer(keys,many=True,fields=fields,expand=expand)
+        return Response({"results": serializer.data, "next": next_cursor})
     
 class PrivateKeyDetailView(APIView):
     """View for retrieving, updating, or deleting a specific private key.
@@ -31,7 +45,7 @@ class PrivateKeyDetailView(APIView):
     id).
     It checks if the user has the necessary permissions to access or modify the private key based on their
     team memberships.   
-    - GET: Retrieve the private key details.
+    - GET: Retrieve the private key details (?fields= / ?expand= select the returned fields).
     - DELETE: Delete the private key.
     - PATCH: Update the private key with partial data.
     If the user is not authorized to access or modify the private key, it returns a 403
@@ -41,12 +55,13 @@ class PrivateKeyDetailView(APIView):
     """
     permission_classes=[IsAuthenticated]
     def get(self, request, key_id):
-        key = get_object_or_404(PrivateKey,pk=key_id)
+        fields, expand = sparse_params(request)
+        key = get_object_or_404(PrivateKeyDetailSerializer.sparse_queryset(PrivateKey.objects.all(), fields, expand),pk=key_id)
 
         if not key.access_teams.filter(members=request.user).exists():
             return Response({"error": "Not authorized to view this Private Key"}, status=403)
         
-        serializer = PrivateKeyDetailSerializer(key)
+        serializer = PrivateKeyDetailSerializer(key,fields=fields,expand=expand)
         return Response(serializer.data)
     
     def delete(self, request, key_id):
@@ -0,0 +1,58 @@
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from certs.serializers import CertificateCoverageSerializer
+from certs.utils import find_covering_certificates, get_accessible_certificates
+
+MAX_LOOKUP_HOSTNAMES = 500
+
+
+class CertificateHostnameLookupView(APIView):
+    """View listing the certificates that cover hostnames.
+    A certificate covers a hostname when one of its SAN DNS names is the hostname itself
+    (exact) or the wildcard of its parent domain ("*.eu.example.com" covers "api.eu.example.com").
+    - GET /api/certificates/covering/?hostname=api.eu.example.com (repeatable, or comma separated)
+    - POST /api/certificates/covering/ with {"hostnames": [...]} for larger batches.
+    Returns {"results": {hostname: [certificate, ...]}} with exact matches first, limited to the
+    certificates accessible to the user. At most 500 hostnames per request.
+    Only authenticated users can access this view.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        hostnames = [
+            hostname
+            for value in request.query_params.getlist('hostname')
+            for hostname in value.split(',')
+        ]
+        return self._lookup(request, hostnames)
+
+    def post(self, request):
+        hostnames = request.data.get('hostnames')
+        if not isinstance(hostnames, list) or not all(isinstance(hostname, str) for hostname in hostnames):
+            return Response({"error": "hostnames must be a list of strings."}, status=status.HTTP_400_BAD_REQUEST)
+        return self._lookup(request, hostnames)
+
+    def _lookup(self, request, hostnames):
+        hostnames = list(dict.fromkeys(hostname.strip() for hostname in hostnames if hostname.strip()))
+        if not hostnames:
+            return Response({"error": "No hostname given."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(hostnames) > MAX_LOOKUP_HOSTNAMES:
+            return Response(
+                {"error": f"At most {MAX_LOOKUP_HOSTNAMES} hostnames per request."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        queryset = get_accessible_certificates(request.user).only(*CertificateCoverageSerializer.Meta.fields[:-1])
+        covering = find_covering_certificates(hostnames, queryset=queryset)
+        return Response({
+            "results": {
+                hostname: [
+                    CertificateCoverageSerializer(cert, context={"match": match}).data
+                    for cert, match in covering.get(hostname, [])
+                ]
+                for hostname in hostnames
+            }
+        })
@@ -0,0 +1,39 @@
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from certs.serializers import CertificateSearchSerializer
+from certs.utils import get_accessible_certificates, search_certificates
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+
+class CertificateSearchView(APIView):
+    """View for searching the certificates accessible to the user.
+    GET /api/certificates/search/?q=<term>&mode={search|autocomplete}&limit=<n>
+    - search (default): case-insensitive and fuzzy (trigram) matches on name, subject and issuer,
+      plus certificates whose SAN covers the term as a hostname, best matches first.
+    - autocomplete: names starting with the term, closest names first.
+    Only the best `limit` results are returned (default 20, max 100).
+    Only authenticated users can access this view.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        term = request.query_params.get('q', '').strip()
+        mode = request.query_params.get('mode', 'search').lower()
+        if not term:
+            return Response({"error": "Missing search term (q)."}, status=status.HTTP_400_BAD_REQUEST)
+        if mode not in {'search', 'autocomplete'}:
+            return Response({"error": f"Unsupported mode: {mode}"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = int(request.query_params.get('limit', DEFAULT_SEARCH_LIMIT))
+        except ValueError:
+            return Response({"error": "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+
+        queryset = get_accessible_certificates(request.user).only(*CertificateSearchSerializer.Meta.fields[:-1])
+        results = search_certificates(queryset, term, autocomplete=mode == 'autocomplete')[:limit]
+        return Response({"results": CertificateSearchSerializer(results, many=True).data})
@@ -0,0 +1,23 @@
+from django.shortcuts import get_object_or_404
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from certs.models import UploadJob
+from certs.serializers import UploadJobSerializer
+from certs.utils import get_upload_job_progress
+
+
+class UploadJobDetailView(APIView):
+    """View for polling an upload job.
+    Uploads are processed in the background; the upload endpoints return a job id and the
+    client polls this view for the progress (processed / total), the final status and the
+    outcome of every certificate (created or duplicate) and key in the upload.
+    Users can only see their own jobs.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id):
+        job = get_object_or_404(UploadJob, id=job_id, user=request.user)
+        data = UploadJobSerializer(job).data
+        data["processed"] = get_upload_job_progress(job)
+        return Response(data)
@@ -2,9 +2,9 @@ from rest_framework import generics,status
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.generics import RetrieveUpdateAPIView
 from rest_framework.filters import SearchFilter
-from rest_framework_simplejwt.views import TokenObtainPairView
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from certs.models import CustomUser, Team
-from certs.serializers import TeamSerializer, UserSerializer,MyTokenObtainPairSerializer
+from certs.serializers import TeamSerializer, UserSerializer,MyTokenObtainPairSerializer,MyTokenRefreshSerializer
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 
@@ -46,4 +46,8 @@ class MyTokenObtainPairView(TokenObtainPairView):
 
     serializer_class=MyTokenObtainPairSerializer
 
+class MyTokenRefreshView(TokenRefreshView):
+
+    serializer_class=MyTokenRefreshSerializer
+
         
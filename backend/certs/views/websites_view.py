@@ -1,13 +1,30 @@
 from rest_framework.generics import ListCreateAPIView, RetrieveUpdateDestroyAPIView
 from rest_framework.permissions import IsAuthenticated
-from rest_framework import generics
+from rest_framework import generics, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
 from certs.models import Certificate, Website
-from certs.serializers import WebsiteSerializer
+from certs.serializers import WebsiteSerializer, sparse_params
+from certs.utils import certificate_access_filter, suggest_websites, user_can_access_certificate
 from django.db.models import Q
 
 
-class CertificateWebsiteListCreateView(ListCreateAPIView):
+class SparseWebsiteMixin:
+    """Apply ?fields= / ?expand= to the WebsiteSerializer output and queryset of GET requests."""
+    def get_serializer(self, *args, **kwargs):
+        if self.request.method == 'GET':
+            kwargs['fields'], kwargs['expand'] = sparse_params(self.request)
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method == 'GET':
+            queryset = WebsiteSerializer.sparse_queryset(queryset, *sparse_params(self.request))
+        return queryset
+
+
+class CertificateWebsiteListCreateView(SparseWebsiteMixin, ListCreateAPIView):
     """
     GET  /api/certificates/{cert_id}/websites/  → list
     POST /api/certificates/{cert_id}/websites/  → create
@@ -25,7 +42,7 @@ class CertificateWebsiteListCreateView(ListCreateAPIView):
         # optional: check certificate.access_teams here…
         serializer.save(certificate=cert)
 
-class WebsiteDetailView(RetrieveUpdateDestroyAPIView):
+class WebsiteDetailView(SparseWebsiteMixin, RetrieveUpdateDestroyAPIView):
     """
     GET /api/websites/{pk}/     → retrieve one
     PUT /api/websites/{pk}/     → update
@@ -40,17 +57,28 @@ class WebsiteDetailView(RetrieveUpdateDestroyAPIView):
         
         return obj
     
-class WebsiteListView(generics.ListAPIView):
+class WebsiteListView(SparseWebsiteMixin, generics.ListAPIView):
     queryset = Website.objects.all()
     serializer_class = WebsiteSerializer
 
     def get_queryset(self):
         user = self.request.user
-        user_teams = user.teams.all()
-        # Q1: Certificate has no access_teams
-        q_no_teams = Q(certificate__access_teams=None)
-        # Q2: Certificate is accessible by user's teams
-        q_user_teams = Q(certificate__access_teams__in=user_teams)
+        # Websites without certificate, or whose certificate is accessible to the user
         return Website.objects.filter(
-            q_no_teams | q_user_teams
-        ).distinct()
\ No newline at end of file
+            Q(certificate__isnull=True) | certificate_access_filter(user, field='certificate')
+        )
+
+
+class CertificateWebsiteSuggestionsView(APIView):
+    """
+    GET /api/certificates/{cert_id}/website-suggestions/ → websites covered by the certificate SAN
+    that are not attached to it yet (e.g. still pointing to the certificate it renews).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, cert_id):
+        cert = get_object_or_404(Certificate.objects.only('id', 'san'), pk=cert_id)
+        if not user_can_access_certificate(cert, request.user):
+            return Response({"error": "Not authorized to access this certificate"}, status=status.HTTP_403_FORBIDDEN)
+        websites = suggest_websites([cert], user=request.user).get(cert.id, [])
+        return Response(WebsiteSerializer(websites, many=True).data)
@@ -23,4 +23,4 @@ else:
 END
 
 echo "Starting server..."
-exec gunicorn --bind 0.0.0.0:8000 -w 3 cerbyonvault.wsgi:application
\ No newline at end of file
+exec gunicorn --bind 0.0.0.0:8000 -w 3 --threads 4 cerbyonvault.wsgi:application
\ No newline at end of file
@@ -31,8 +31,16 @@ export default function CertificateList() {
   const [typeFilter, setTypeFilter] = useState<
     "all" | "leaf" | "root" | "intermediate"
   >("all");
-  const { fetchCerts, certs } = useItemFetch();
+  const {
+    fetchCerts,
+    certs,
+    loadMoreCerts,
+    hasMoreCerts,
+    fetchCert,
+    searchCerts,
+  } = useItemFetch();
   const [certificates, setCertificates] = useState<Certificate[]>([]);
+  const [searchResults, setSearchResults] = useState<Certificate[]>([]);
   const [showExportModal, setShowExportModal] = useState(false);
   const [exportCertName, setExportCertName] = useState<string>("");
   const [exportCertId, setExportCertId] = useState<number | null>(null);
@@ -85,26 +93,57 @@ export default function CertificateList() {
     setCertificates(certs);
   }, [certs]);
 
+  // Only the first pages are loaded, so searching goes through the search endpoint.
+  useEffect(() => {
+    if (searchTerm.trim() === "") {
+      setSearchResults([]);
+      return;
+    }
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      const results = await searchCerts(searchTerm);
+      if (!cancelled) setSearchResults(results);
+    }, 300);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [searchTerm]);
+
   useEffect(() => {
     if (
       location.state &&
       location.state.selectedCertId &&
       certificates.length > 0
     ) {
-      const certToSelect = certificates.find(
-        (cert) => cert.id === location.state.selectedCertId
-      );
-      if (certToSelect) {
-        handleSelect(
-          certToSelect,
-          { shiftKey: false, ctrlKey: false, metaKey: false } as any,
-          certificates
-        );
-        navigate("/certificates", { replace: true, state: {} });
-      }
+      const selectedCertId = location.state.selectedCertId;
+      navigate("/certificates", { replace: true, state: {} });
+      const loaded = certificates.find((cert) => cert.id === selectedCertId);
+      // The certificate may be on a page that is not loaded yet.
+      const certToSelect: Promise<Certificate | null> = loaded
+        ? Promise.resolve(loaded)
+        : fetchCert(selectedCertId);
+      certToSelect.then((cert) => {
+        if (cert) {
+          handleSelect(
+            cert,
+            { shiftKey: false, ctrlKey: false, metaKey: false } as any,
+            certificates
+          );
+        }
+      });
     }
   }, [location.state, certificates, navigate]);
 
+  const handleSelectSearchResult = async (
+    e: React.MouseEvent,
+    result: Certificate
+  ) => {
+    // Search results only carry the summary fields, the side panel needs the full certificate.
+    const cert = await fetchCert(result.id);
+    if (cert) handleSelect(cert, e, searchResults);
+  };
+
   const handleDeleteSelected = async () => {
     try {
       const selectedIds = selectedItems.map((item) => item.id);
@@ -223,26 +262,32 @@ export default function CertificateList() {
                         isFlat={false}
                       />
                     ))
-                  : filterCertificates(certs)
-                      .filter((cert) =>
-                        cert.name.toLowerCase().includes(searchTerm.toLowerCase())
-                      )
+                  : filterCertificates(searchResults)
                       .map((cert) => (
                         <TreeItem
                           key={cert.id}
                           cert={cert}
                           selectedIds={selectedItems.map((item) => item.id)}
-                          onClick={(e, cert) => handleSelect(cert, e, certificates)}
+                          onClick={handleSelectSearchResult}
                           onDoubleClick={(cert) => handleOpenDetails(cert)}
-                          onChildSelect={(e, cert) =>
-                            handleSelect(cert, e, certificates)
-                          }
+                          onChildSelect={handleSelectSearchResult}
                           onChildDoubleClick={() => handleOpenDetails(cert)}
                           onContextMenu={handleRightClick}
                           isFlat={true}
                         />
                       ))}
               </ul>
+              {searchTerm === "" && hasMoreCerts && (
+                <div className="flex justify-center my-4">
+                  <button
+                    type="button"
+                    className="btn btn-outline"
+                    onClick={loadMoreCerts}
+                  >
+                    Load more
+                  </button>
+                </div>
+              )}
             </div>
           </div>
           {contextMenu.visible && (
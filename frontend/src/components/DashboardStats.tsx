@@ -70,20 +70,21 @@ export const DashboardStats: React.FC = () => {
 
   useEffect(() => {
     setLoadingOverview(true);
-    axios
-      .get("/dashboard/certificates-overview/")
-      .then((res) => setOverview(res.data))
-      .catch(() => setOverview(null))
-      .finally(() => setLoadingOverview(false));
-  }, []);
-
-  useEffect(() => {
     setLoadingExpiring(true);
     axios
-      .get(`/dashboard/certificates-expiring-soon/?days=${days}`)
-      .then((res) => setExpiringSoon(res.data.expiring_soon_certificates))
-      .catch(() => setExpiringSoon(null))
-      .finally(() => setLoadingExpiring(false));
+      .get(`/dashboard/summary/?days=${days}`)
+      .then((res) => {
+        setOverview(res.data);
+        setExpiringSoon(res.data.expiring_soon_certificates);
+      })
+      .catch(() => {
+        setOverview(null);
+        setExpiringSoon(null);
+      })
+      .finally(() => {
+        setLoadingOverview(false);
+        setLoadingExpiring(false);
+      });
   }, [days]);
 
   const stats: StatConfig[] = [
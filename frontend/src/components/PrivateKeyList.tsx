@@ -18,7 +18,7 @@ export default function PrivateKeyList() {
   const { selectedItems, handleSelect, clearSelection, handleOpenDetails } =
     usePrivateKeySelection();
   const [searchTerm, setSearchTerm] = useState("");
-  const { fetchKeys, keys } = useItemFetch();
+  const { fetchKeys, keys, loadMoreKeys, hasMoreKeys } = useItemFetch();
   const {
     showPasswordModal,
     parsedData,
@@ -132,6 +132,17 @@ export default function PrivateKeyList() {
                   />
                 ))}
               </ul>
+              {hasMoreKeys && (
+                <div className="flex justify-center my-4">
+                  <button
+                    type="button"
+                    className="btn btn-outline"
+                    onClick={loadMoreKeys}
+                  >
+                    Load more
+                  </button>
+                </div>
+              )}
             </div>
           </div>
 
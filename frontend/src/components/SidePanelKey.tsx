@@ -13,7 +13,10 @@ import {
 } from "lucide-react";
 import { formatDate } from "../utils/utils";
 import { useItemFetch } from "../hooks/useItemFetch";
-import Select from "react-select";
+import AsyncSelect from "react-select/async";
+
+// The linked certificate as serialized with the key, search results fit it too.
+type LinkedCertificate = Pick<Certificate, "id" | "name">;
 
 interface SidePanelKeyProps {
   isOpen: boolean;
@@ -29,10 +32,11 @@ export default function SidePanelKey({
   onUpdated,
 }: SidePanelKeyProps) {
   const { updateKey } = useCertService();
-  const { fetchCerts, certs } = useItemFetch();
+  const { searchCerts } = useItemFetch();
   const [name, setName] = useState<string>(data?.privateKey?.name || "");
-  const [certsLoaded, setCertsLoaded] = useState(false);
-  const [selectedCert, setSelectedCert] = useState<Certificate | null>(null);
+  const [selectedCert, setSelectedCert] = useState<LinkedCertificate | null>(
+    data?.privateKey?.certificate || null
+  );
   const [comment, setComment] = useState<string>(
     data?.privateKey?.comment || ""
   );
@@ -40,29 +44,15 @@ export default function SidePanelKey({
     data.privateKey?.access_teams || []
   );
 
-  useEffect(() => {
-    if (!certsLoaded) {
-      fetchCerts().then(() => setCertsLoaded(true));
-    }
-  }, [certsLoaded]);
-
   useEffect(() => {
     if (data.privateKey) {
       setName(data.privateKey.name);
       setComment(data.privateKey.comment || "");
       setAccessTeams(data.privateKey.access_teams);
+      setSelectedCert(data.privateKey.certificate);
     }
   }, [data.privateKey]);
 
-  useEffect(() => {
-    if (data.privateKey && certsLoaded) {
-      const matchedCert = certs.find(
-        (c) => c.id === data.privateKey?.certificate?.id
-      );
-      setSelectedCert(matchedCert || null);
-    }
-  }, [certsLoaded, certs, data.privateKey]);
-
   if (!isOpen || !data.privateKey) return null;
 
   const handleUpdate = async () => {
@@ -115,10 +105,11 @@ export default function SidePanelKey({
         <Globe size={25} className="text-primary" />
         <div className="flex flex-col space-y-1 w-full">
           <label className="label">Associated Certificate</label>
-          <Select
+          <AsyncSelect<LinkedCertificate>
             value={selectedCert}
-            onChange={(value) => setSelectedCert(value as Certificate)}
-            options={certs}
+            onChange={(value) => setSelectedCert(value)}
+            loadOptions={(term) => searchCerts(term, "autocomplete")}
+            noOptionsMessage={() => "Type to search certificates"}
             getOptionLabel={(c) => c.name}
             getOptionValue={(c) => c.id.toString()}
             placeholder="Select certificate"
@@ -3,16 +3,48 @@ import { Certificate, PrivateKey } from "../types";
 import useAxios from "../axios/useAxios";
 import { useToast } from "../components/ToastProvider";
 
+interface Page<T> {
+  results: T[];
+  next: string | null;
+}
+
+const PAGE_SIZE = 100;
+
 export function useItemFetch() {
   const axiosInstance = useAxios()
   const { notify } = useToast();
   const [keys, setKeys] = useState<PrivateKey[]>([]);
   const [certs, setCerts] = useState<Certificate[]>([]);
+  const [keysCursor, setKeysCursor] = useState<string | null>(null);
+  const [certsCursor, setCertsCursor] = useState<string | null>(null);
+
+  // List endpoints are keyset-paginated: load one page, the "next" cursor fetches the following one on demand.
+  async function fetchPage<T>(url: string, cursor: string | null): Promise<Page<T>> {
+    const res = await axiosInstance.get<Page<T>>(url, {
+      params: { limit: PAGE_SIZE, ...(cursor ? { cursor } : {}) },
+    });
+    return {
+      results: Array.isArray(res.data.results) ? res.data.results : [],
+      next: res.data.next,
+    };
+  }
 
   async function fetchKeys() {
     try {
-      const res = await axiosInstance.get<PrivateKey[]>("/keys");
-      setKeys(Array.isArray(res.data) ? res.data : []);
+      const page = await fetchPage<PrivateKey>("/keys/", null);
+      setKeys(page.results);
+      setKeysCursor(page.next);
+    } catch {
+      notify("❌ Failed to load private keys.","error");
+    }
+  }
+
+  async function loadMoreKeys() {
+    if (!keysCursor) return;
+    try {
+      const page = await fetchPage<PrivateKey>("/keys/", keysCursor);
+      setKeys((prev) => [...prev, ...page.results]);
+      setKeysCursor(page.next);
     } catch {
       notify("❌ Failed to load private keys.","error");
     }
@@ -20,17 +52,60 @@ export function useItemFetch() {
 
   async function fetchCerts() {
     try {
-      const res = await axiosInstance.get<Certificate[]>("/certificates");
-      setCerts(Array.isArray(res.data) ? res.data : []);
+      const page = await fetchPage<Certificate>("/certificates/", null);
+      setCerts(page.results);
+      setCertsCursor(page.next);
+    } catch {
+      notify("❌ Failed to load certificates.","error");
+    }
+  }
+
+  async function loadMoreCerts() {
+    if (!certsCursor) return;
+    try {
+      const page = await fetchPage<Certificate>("/certificates/", certsCursor);
+      setCerts((prev) => [...prev, ...page.results]);
+      setCertsCursor(page.next);
     } catch {
       notify("❌ Failed to load certificates.","error");
     }
   }
 
+  // Certificates that are not in the loaded pages (search results, links) are fetched one by one.
+  async function fetchCert(id: number): Promise<Certificate | null> {
+    try {
+      const res = await axiosInstance.get<Certificate>(`/certificates/${id}/`);
+      return res.data;
+    } catch {
+      notify("❌ Failed to load certificate.","error");
+      return null;
+    }
+  }
+
+  // Search all accessible certificates server-side, not only the loaded pages.
+  async function searchCerts(term: string, mode: "search" | "autocomplete" = "search") {
+    if (!term.trim()) return [];
+    try {
+      const res = await axiosInstance.get<{ results: Certificate[] }>("/certificates/search/", {
+        params: { q: term, mode, limit: PAGE_SIZE },
+      });
+      return Array.isArray(res.data.results) ? res.data.results : [];
+    } catch {
+      notify("❌ Failed to search certificates.","error");
+      return [];
+    }
+  }
+
   return {
     certs,
     keys,
     fetchCerts,
     fetchKeys,
+    loadMoreCerts,
+    loadMoreKeys,
+    hasMoreCerts: certsCursor !== null,
+    hasMoreKeys: keysCursor !== null,
+    fetchCert,
+    searchCerts,
   };
 };
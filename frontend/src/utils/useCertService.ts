@@ -6,12 +6,27 @@ export function useCertService() {
   const axiosInstance = useAxios()
   const { notify } = useToast();
 
+  // Poll an upload job until the backend has finished processing it
+  const waitForUploadJob = async (jobId: string, interval = 1000) => {
+    while (true) {
+      const res = await axiosInstance.get(`/upload-jobs/${jobId}/`);
+      if (res.data.status === "succeeded") {
+        return res.data;
+      }
+      if (res.data.status === "failed") {
+        // Same shape as an axios error so callers can read err.response.data.error
+        throw { response: { data: { error: res.data.error || "Import failed." } } };
+      }
+      await new Promise((resolve) => setTimeout(resolve, interval));
+    }
+  };
+
   // API call for importing certificates
   const importCertificates = async (payload: any) => {
     const res = await axiosInstance.post("/import-cert-metadata/", payload, {
       withCredentials: true,
     });
-    return res.data;
+    return waitForUploadJob(res.data.job_id);
   };
 
 
@@ -136,6 +151,7 @@ export function useCertService() {
     exportCertWithKey,
     exportCertPfx,
     importCertificates,
+    waitForUploadJob,
     uploadCertFile,
     deleteCertificates,
     deletePrivateKeys,
@@ -27,6 +27,7 @@ DJANGO_DEBUG=False
 DJANGO_ALLOWED_HOSTS=localhost
 DJANGO_CORS_ALLOWED_ORIGINS=http://localhost,http://localhost:5173
 KEY_ENCRYPTION_SECRET="{key_encryption_secret}"
+X_ACCEL_REDIRECT_PREFIX=/protected-media/
 
 DJANGO_SECRET_KEY='{django_secret_key}'
 